@@ -2,7 +2,7 @@
 Assessment Agent - Creates quizzes and evaluates understanding
 """
 
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterator, Union
 from agents.base_agent import BaseAgent
 from core.llm_service import LLMService, Message
 from core.memory import Memory
@@ -20,6 +20,8 @@ class AssessmentAgent(BaseAgent):
     - Tracking learning progress
     """
     
+    history_count = 4
+    
     SYSTEM_PROMPT = """You are an assessment expert who creates engaging, educational coding challenges.
 
 Your approach:
@@ -71,31 +73,31 @@ Remember:
     def process(
         self,
         user_input: str,
-        context: Optional[Dict[str, Any]] = None
-    ) -> str:
+        context: Optional[Dict[str, Any]] = None,
+        stream: bool = False
+    ) -> Union[str, Iterator[str]]:
         """
         Process assessment request
         
         Args:
             user_input: User's request or answer
             context: Additional context
+            stream: Return an iterator of text chunks instead of a string
             
         Returns:
             Assessment response
         """
-        messages = self._build_messages(user_input, include_history=True, history_count=4)
+        messages = self._build_messages(user_input, include_history=True)
         
-        response = self.llm_service.generate(
-            messages=messages,
+        return self._respond(
+            user_input,
+            messages,
+            agent_type="assessment",
             system_prompt=self.SYSTEM_PROMPT,
             temperature=0.6,
-            max_tokens=1500
+            max_tokens=1500,
+            stream=stream
         )
-        
-        self.memory.add_message("user", user_input, agent_type="assessment")
-        self.memory.add_message("assistant", response, agent_type="assessment")
-        
-        return response
     
     def create_quiz(
         self,
@@ -181,7 +183,8 @@ Include one correct answer and three plausible distractors for each question."""
         self,
         problem: str,
         code: str,
-        test_cases: Optional[List[Dict[str, Any]]] = None
+        test_cases: Optional[List[Dict[str, Any]]] = None,
+        review: bool = True
     ) -> Dict[str, Any]:
         """
         Evaluate code submission
@@ -189,13 +192,19 @@ Include one correct answer and three plausible distractors for each question."""
         Args:
             problem: Problem description
             code: Submitted code
-            test_cases: Optional test cases with input/expected_output
+            test_cases: Optional test cases with input/expected_output, where
+                input is an expression such as "add(2, 3)"
+            review: Ask the LLM for a code review; with test cases this can be
+                turned off to grade deterministically without an LLM call
             
         Returns:
             Evaluation with feedback
         """
-        # First, try to execute the code
-        execution_result = self.code_sandbox.execute(code)
+        # Execute the code, running all test cases in the same sandbox call
+        if test_cases:
+            execution_result = self.code_sandbox.run_tests(code, test_cases)
+        else:
+            execution_result = self.code_sandbox.execute(code)
         
         feedback = {
             "executes": execution_result.success,
@@ -205,15 +214,15 @@ Include one correct answer and three plausible distractors for each question."""
             "total_tests": 0
         }
         
-        # Run test cases if provided and code executes
-        if test_cases and execution_result.success:
-            # This is simplified - in production, would need proper test execution
-            feedback["total_tests"] = len(test_cases)
-            # For now, mark as needing manual review
-            feedback["needs_manual_review"] = True
+        if test_cases:
+            feedback["passed_tests"] = execution_result.passed
+            feedback["total_tests"] = execution_result.total
+            feedback["test_results"] = [case.to_dict() for case in execution_result.cases]
+            feedback["score"] = round(10 * execution_result.passed / execution_result.total)
         
-        # Get LLM-based code review
-        review_prompt = f"""Problem: {problem}
+        if review:
+            # Get LLM-based code review
+            review_prompt = f"""Problem: {problem}
 
 Submitted Code:
 ```python
@@ -223,7 +232,12 @@ Submitted Code:
 Execution Result:
 - Success: {execution_result.success}
 - Output: {execution_result.output or 'None'}
-- Error: {execution_result.error or 'None'}
+- Error: {execution_result.error or 'None'}"""
+            
+            if test_cases:
+                review_prompt += f"\n- Tests passed: {feedback['passed_tests']}/{feedback['total_tests']}"
+            
+            review_prompt += """
 
 Please review this code submission:
 1. Does it solve the problem?
@@ -231,14 +245,14 @@ Please review this code submission:
 3. Efficiency considerations
 4. Specific suggestions for improvement
 5. Overall score out of 10"""
-        
-        code_review = self.process(review_prompt)
-        feedback["review"] = code_review
-        
-        # Extract score
-        score_match = re.search(r'(\d+)/10', code_review)
-        if score_match:
-            feedback["score"] = int(score_match.group(1))
+            
+            code_review = self.process(review_prompt)
+            feedback["review"] = code_review
+            
+            # Extract score (test results take precedence when available)
+            score_match = re.search(r'(\d+)/10', code_review)
+            if score_match and "score" not in feedback:
+                feedback["score"] = int(score_match.group(1))
         
         # Update learning metrics
         topic = self.memory.get_user_profile().current_topic if self.memory.get_user_profile() else "general"
@@ -3,9 +3,21 @@ Base Agent Class - Foundation for all specialized agents
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
-from core.llm_service import LLMService, Message
-from core.memory import Memory
+from typing import List, Dict, Any, Optional, Iterator, Union, TYPE_CHECKING
+from core.llm_service import LLMService, Message, SystemPrompt
+from core.memory import Memory, MessageRecord
+
+if TYPE_CHECKING:
+    from core.summarizer import ConversationSummarizer
+
+
+def _truncate(content: str, tokens: int, max_tokens: int) -> str:
+    """Shorten content to about max_tokens, keeping its head and tail"""
+    keep = len(content) * max_tokens // tokens
+    head = keep * 3 // 4
+    tail = keep - head
+    omitted = content[head:len(content) - tail].count("\n") + 1
+    return f"{content[:head]}\n[... {omitted} lines omitted ...]\n{content[len(content) - tail:]}"
 
 
 class BaseAgent(ABC):
@@ -13,6 +25,15 @@ class BaseAgent(ABC):
     Abstract base class for all agents in the system
     """
     
+    # Recent exchanges (message pairs) sent verbatim with each request
+    history_count: int = 5
+    # Token budget for conversation history sent with each request
+    history_token_budget: int = 2000
+    # Older messages longer than this are truncated before being resent
+    max_message_tokens: int = 500
+    # Folds older turns into Memory.summary (set by the Orchestrator)
+    summarizer: Optional["ConversationSummarizer"] = None
+    
     def __init__(
         self,
         name: str,
@@ -26,16 +47,22 @@ class BaseAgent(ABC):
         self.system_prompt = system_prompt
     
     @abstractmethod
-    def process(self, user_input: str, context: Optional[Dict[str, Any]] = None) -> str:
+    def process(
+        self,
+        user_input: str,
+        context: Optional[Dict[str, Any]] = None,
+        stream: bool = False
+    ) -> Union[str, Iterator[str]]:
         """
         Process user input and return response
         
         Args:
             user_input: User's message
             context: Additional context information
-            
+            stream: Return an iterator of text chunks instead of a string
+        
         Returns:
-            Agent's response
+            Agent's response (or chunk iterator when streaming)
         """
         pass
     
@@ -43,27 +70,60 @@ class BaseAgent(ABC):
         self,
         user_input: str,
         include_history: bool = True,
-        history_count: int = 5
-    ) -> List[Message]:
+        history_count: Optional[int] = None
+    ) -> List[MessageRecord]:
         """
         Build message list for LLM including history
         
+        History is packed newest-first until history_token_budget is spent.
+        Entries over max_message_tokens are sent as truncated copies; all
+        others are passed through as-is (LLMService only reads role and
+        content). Token counts are cached on each record.
+        
         Args:
             user_input: Current user input
             include_history: Whether to include conversation history
-            history_count: Number of historical messages to include
-            
+            history_count: Maximum number of exchanges (message pairs) to
+                include (defaults to the agent's history_count)
+        
         Returns:
-            List of Message objects
+            List of MessageRecord objects
         """
         messages = []
         
         if include_history:
-            history = self.memory.get_conversation_history(last_n=history_count * 2)
-            for msg in history:
-                messages.append(Message(role=msg.role, content=msg.content))
+            if history_count is None:
+                history_count = self.history_count
+            window = list(self.memory.get_recent_messages(history_count * 2))
+            uncounted = [record for record in window if record.token_count is None]
+            if uncounted:
+                counts = self.llm_service.count_tokens_many([record.content for record in uncounted])
+                for record, count in zip(uncounted, counts):
+                    record.token_count = count
+            
+            budget = self.history_token_budget
+            for record in reversed(window):
+                tokens = record.token_count
+                if tokens > self.max_message_tokens:
+                    record = MessageRecord(
+                        record.role,
+                        _truncate(record.content, tokens, self.max_message_tokens),
+                        record.timestamp,
+                        record.agent_type
+                    )
+                    tokens = self.max_message_tokens
+                
+                if tokens > budget:
+                    break
+                budget -= tokens
+                messages.append(record)
+            
+            messages.reverse()
+            # Providers expect the conversation to open with a user turn
+            while messages and messages[0].role != "user":
+                messages.pop(0)
         
-        messages.append(Message(role="user", content=user_input))
+        messages.append(MessageRecord("user", user_input))
         return messages
     
     def _generate_response(
@@ -79,7 +139,7 @@ class BaseAgent(ABC):
             messages: Conversation messages
             temperature: Temperature for generation
             max_tokens: Maximum tokens
-            
+        
         Returns:
             Generated response
         """
@@ -90,6 +150,81 @@ class BaseAgent(ABC):
             max_tokens=max_tokens
         )
     
+    def _respond(
+        self,
+        user_input: str,
+        messages: List[Message],
+        agent_type: str,
+        system_prompt: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        stream: bool = False
+    ) -> Union[str, Iterator[str]]:
+        """
+        Generate a response and record the exchange in memory
+        
+        Args:
+            user_input: Original user message to store
+            messages: Conversation messages sent to the LLM
+            agent_type: Agent type tag for stored messages
+            system_prompt: System prompt (defaults to the agent's prompt)
+            temperature: Temperature for generation
+            max_tokens: Maximum tokens
+            stream: Return an iterator of text chunks instead of a string
+        
+        Returns:
+            Generated response, or a chunk iterator when streaming
+        """
+        request = dict(
+            messages=messages,
+            system_prompt=self._with_summary(system_prompt if system_prompt is not None else self.system_prompt),
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        
+        if stream:
+            return self._record_stream(user_input, agent_type, self.llm_service.stream(**request))
+        
+        response = self.llm_service.generate(**request)
+        self._record_exchange(user_input, response, agent_type)
+        return response
+    
+    def _with_summary(self, system_prompt: str) -> str:
+        """
+        Append the rolling summary of earlier turns to the system prompt
+        
+        The summary changes every few turns, so it goes in the volatile
+        suffix and the agent's prompt stays a cacheable prefix.
+        """
+        summary = self.memory.summary
+        if not summary:
+            return system_prompt
+        if not isinstance(system_prompt, SystemPrompt):
+            system_prompt = SystemPrompt(system_prompt)
+        return system_prompt.with_suffix(f"\n\nSUMMARY OF THE EARLIER CONVERSATION:\n{summary}")
+    
+    def _record_exchange(self, user_input: str, response: str, agent_type: str) -> None:
+        """Store the exchange in memory and let the summarizer catch up"""
+        self.memory.add_message("user", user_input, agent_type=agent_type)
+        self.memory.add_message("assistant", response, agent_type=agent_type)
+        
+        if self.summarizer is not None:
+            self.summarizer.maybe_update(self.memory)
+    
+    def _record_stream(
+        self,
+        user_input: str,
+        agent_type: str,
+        chunks: Iterator[str]
+    ) -> Iterator[str]:
+        """Pass chunks through and store the exchange once the stream completes"""
+        parts = []
+        for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+        
+        self._record_exchange(user_input, "".join(parts), agent_type)
+    
     def get_user_context(self) -> Dict[str, Any]:
         """Get relevant user context from memory"""
         context = {}
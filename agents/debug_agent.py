@@ -2,7 +2,7 @@
 Debug Agent - Helps identify and fix code errors
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Iterator, Union
 from agents.base_agent import BaseAgent
 from core.llm_service import LLMService, Message
 from core.memory import Memory
@@ -18,6 +18,8 @@ class DebugAgent(BaseAgent):
     - Explaining error messages
     """
     
+    history_count = 3
+    
     SYSTEM_PROMPT = """You are a patient debugging expert helping learners understand and fix their code errors.
 
 Your approach:
@@ -64,34 +66,33 @@ Remember:
     def process(
         self,
         user_input: str,
-        context: Optional[Dict[str, Any]] = None
-    ) -> str:
+        context: Optional[Dict[str, Any]] = None,
+        stream: bool = False
+    ) -> Union[str, Iterator[str]]:
         """
         Process debugging request
         
         Args:
             user_input: User's code or error description
             context: Additional context (code, error message, etc.)
+            stream: Return an iterator of text chunks instead of a string
             
         Returns:
             Debugging guidance
         """
         # Build messages with context
-        messages = self._build_messages(user_input, include_history=True, history_count=3)
+        messages = self._build_messages(user_input, include_history=True)
         
-        # Generate response
-        response = self.llm_service.generate(
-            messages=messages,
+        # Generate response and store in memory
+        return self._respond(
+            user_input,
+            messages,
+            agent_type="debug",
             system_prompt=self.SYSTEM_PROMPT,
             temperature=0.5,  # Lower temperature for more focused debugging
-            max_tokens=1200
+            max_tokens=1200,
+            stream=stream
         )
-        
-        # Store in memory
-        self.memory.add_message("user", user_input, agent_type="debug")
-        self.memory.add_message("assistant", response, agent_type="debug")
-        
-        return response
     
     def analyze_error(
         self,
@@ -0,0 +1,223 @@
+"""
+Intent Router - Embedding-based routing of learner messages to agents
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.embeddings import HashedNgramEmbedder
+from core.keyword_matcher import KeywordMatcher
+
+# Labelled examples per agent; labels match AgentType values
+INTENT_EXAMPLES: Dict[str, List[str]] = {
+    "debug": [
+        "why does my test fail",
+        "my code throws an error",
+        "I get a TypeError when I run this",
+        "this function returns the wrong output",
+        "why is my loop not working",
+        "help me fix this bug",
+        "I keep getting an IndexError: list index out of range",
+        "my program crashes with a traceback",
+        "why does this raise a KeyError",
+        "the output is None instead of the list",
+        "what is wrong with my code",
+        "my recursion never stops",
+        "why does my unit test fail with an assertion error",
+        "it says NameError name is not defined",
+        "my function doesn't return anything",
+        "the code runs but prints the wrong result",
+        "SyntaxError invalid syntax on line 3",
+        "why am I getting an infinite loop",
+        "my while loop runs forever",
+        "my tests are failing after I changed the function",
+        "can you debug this for me",
+        "how do I fix this error",
+        "how do I solve this ValueError",
+        "how can I make this exception go away",
+        "I'm stuck on this bug",
+        "I am stuck on an error message I don't understand",
+        "stuck on a traceback in my code",
+    ],
+    "assessment": [
+        "give me a quiz on loops",
+        "test my knowledge of python functions",
+        "can I have a practice exercise",
+        "give me a coding challenge",
+        "quiz me on list comprehensions",
+        "evaluate my solution",
+        "review my code and grade it",
+        "check my answer to the exercise",
+        "I want to practice recursion",
+        "give me some practice problems about dictionaries",
+        "how well did I do on this problem",
+        "assess my understanding of classes",
+        "give me a harder challenge",
+        "can you give me an exercise to try",
+        "make a multiple choice quiz about strings",
+        "is my solution correct and efficient",
+    ],
+    "motivation": [
+        "I'm so frustrated with this",
+        "I feel stuck and want to give up",
+        "this is too hard for me",
+        "I don't think I'm smart enough to code",
+        "I'm confused and overwhelmed",
+        "yay I finally got it working",
+        "I solved it",
+        "I figured it out",
+        "how am I doing so far",
+        "show me my progress",
+        "I need some motivation",
+        "I've been at this for hours and nothing works, I'm exhausted",
+        "programming is so difficult I want to quit",
+        "I'm proud I finished the lesson",
+        "I'm losing confidence",
+        "I feel like I'm not making progress",
+    ],
+    "tutor": [
+        "explain what a list comprehension is",
+        "what is a decorator",
+        "how do for loops work",
+        "teach me about classes in python",
+        "what's the difference between a list and a tuple",
+        "why do we use functions",
+        "show me an example of recursion",
+        "how does inheritance work",
+        "what does the yield keyword do",
+        "can you explain dictionaries",
+        "I want to learn about exceptions",
+        "what is big O notation",
+        "how do I read a file in python",
+        "when should I use a while loop",
+        "what are lambda functions",
+        "how do I write a unit test",
+        "what is the difference between == and is",
+        "explain how a hash map works",
+    ],
+}
+
+# Keyword rules, highest priority first. Intent categories match AgentType
+# values; the emotion categories drive MotivationAgent.detect_emotion_from_message
+ROUTING_KEYWORDS: Dict[str, List[str]] = {
+    "debug": [
+        'error', 'bug', 'broken', 'not working', 'wrong output',
+        'debug', 'fix', 'mistake', 'traceback', 'exception'
+    ],
+    "assessment": [
+        'quiz', 'test', 'exercise', 'practice', 'challenge',
+        'evaluate', 'check my', 'review my code', 'assessment'
+    ],
+    "motivation": [
+        'frustrated', 'stuck', 'giving up', 'progress', 'motivation',
+        'difficult', 'hard', 'confused', 'don\'t understand', 'help!',
+        'yay', 'got it', 'solved', 'figured out'
+    ],
+    "tutor": [
+        'explain', 'what is', 'how do', 'teach me', 'learn',
+        'understand', 'why', 'example', 'show me'
+    ],
+    "frustration": ['frustrated', 'stuck', 'confused', 'don\'t understand', 'giving up'],
+    "excitement": ['got it', 'works', 'solved', 'figured out', 'yay', 'yes!'],
+}
+
+INTENT_CATEGORIES = ("debug", "assessment", "motivation", "tutor")
+EMOTION_CATEGORIES = ("frustration", "excitement")
+
+# Compiled once per process and shared by all keyword call sites
+KEYWORD_MATCHER = KeywordMatcher(ROUTING_KEYWORDS)
+
+_CODE_BLOCK = re.compile(r"```.*?(```|$)", re.DOTALL)
+
+
+class IntentRouter:
+    """
+    Nearest-centroid intent classifier over hashed n-gram embeddings
+    
+    Each label's examples are embedded once and averaged into a unit
+    centroid, so classifying a message is one small embedding plus a
+    (labels x dim) matrix-vector product, well under a millisecond.
+    Low-confidence messages are left for the caller's fallback rules.
+    """
+    
+    def __init__(
+        self,
+        examples: Optional[Dict[str, List[str]]] = None,
+        embedder: Optional[HashedNgramEmbedder] = None,
+        threshold: float = 0.2,
+        margin: float = 0.05
+    ):
+        """
+        Args:
+            examples: Example messages by label (defaults to INTENT_EXAMPLES)
+            embedder: Text embedder
+            threshold: Minimum cosine similarity to the best centroid
+            margin: Minimum lead of the best label over the runner-up
+        """
+        examples = examples or INTENT_EXAMPLES
+        self.embedder = embedder or HashedNgramEmbedder()
+        self.threshold = threshold
+        self.margin = margin
+        self.labels = list(examples)
+        
+        centroids = np.vstack([
+            self.embedder.embed_many(examples[label]).mean(axis=0)
+            for label in self.labels
+        ])
+        centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+        self.centroids = centroids.astype(np.float32)
+    
+    def scores(self, text: str) -> Dict[str, float]:
+        """
+        Cosine similarity of text to each label centroid
+        
+        Args:
+            text: Learner message
+        
+        Returns:
+            Similarity by label
+        """
+        # Code says little about intent and would swamp the prose
+        prose = _CODE_BLOCK.sub(" ", text)
+        similarities = self.centroids @ self.embedder.embed(prose)
+        return dict(zip(self.labels, similarities.tolist()))
+    
+    def classify(self, text: str) -> Tuple[str, float]:
+        """
+        Best label for text, regardless of confidence
+        
+        Args:
+            text: Learner message
+        
+        Returns:
+            (label, similarity)
+        """
+        scores = self.scores(text)
+        label = max(scores, key=scores.get)
+        return label, scores[label]
+    
+    def route(self, text: str) -> Optional[str]:
+        """
+        Confident label for text
+        
+        Args:
+            text: Learner message
+        
+        Returns:
+            Label, or None when the match is too weak or too close to call
+        """
+        scores = sorted(self.scores(text).items(), key=lambda item: item[1], reverse=True)
+        label, best = scores[0]
+        runner_up = scores[1][1] if len(scores) > 1 else -1.0
+        if best < self.threshold or best - runner_up < self.margin:
+            return None
+        return label
+
+
+@lru_cache(maxsize=1)
+def get_intent_router() -> IntentRouter:
+    """Get the process-wide router built from INTENT_EXAMPLES"""
+    return IntentRouter()
@@ -2,8 +2,9 @@
 Motivation Agent - Keeps learners engaged and encouraged
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Iterator, Union
 from agents.base_agent import BaseAgent
+from agents.intent_router import EMOTION_CATEGORIES, KEYWORD_MATCHER
 from core.llm_service import LLMService
 from core.memory import Memory
 from datetime import datetime
@@ -19,6 +20,8 @@ class MotivationAgent(BaseAgent):
     - Setting achievable goals
     """
     
+    history_count = 3
+    
     SYSTEM_PROMPT = """You are an encouraging learning coach focused on motivation and emotional support.
 
 Your mission:
@@ -68,31 +71,31 @@ Remember:
     def process(
         self,
         user_input: str,
-        context: Optional[Dict[str, Any]] = None
-    ) -> str:
+        context: Optional[Dict[str, Any]] = None,
+        stream: bool = False
+    ) -> Union[str, Iterator[str]]:
         """
         Process motivation-related interaction
         
         Args:
             user_input: User's message or situation
             context: Additional context
+            stream: Return an iterator of text chunks instead of a string
             
         Returns:
             Motivational response
         """
-        messages = self._build_messages(user_input, include_history=True, history_count=3)
+        messages = self._build_messages(user_input, include_history=True)
         
-        response = self.llm_service.generate(
-            messages=messages,
+        return self._respond(
+            user_input,
+            messages,
+            agent_type="motivation",
             system_prompt=self.SYSTEM_PROMPT,
             temperature=0.8,  # Higher temperature for more varied, engaging responses
-            max_tokens=800
+            max_tokens=800,
+            stream=stream
         )
-        
-        self.memory.add_message("user", user_input, agent_type="motivation")
-        self.memory.add_message("assistant", response, agent_type="motivation")
-        
-        return response
     
     def celebrate_achievement(
         self,
@@ -200,15 +203,11 @@ Give me an encouraging progress update!"""
         Returns:
             Emotion-aware response
         """
-        # Simple keyword detection
-        frustration_keywords = ['frustrated', 'stuck', 'confused', 'don\'t understand', 'giving up']
-        excitement_keywords = ['got it', 'works', 'solved', 'figured out', 'yay', 'yes!']
-        
-        message_lower = message.lower()
+        emotion = KEYWORD_MATCHER.best(message, EMOTION_CATEGORIES)
         
-        if any(keyword in message_lower for keyword in frustration_keywords):
+        if emotion == "frustration":
             return self.handle_frustration(message)
-        elif any(keyword in message_lower for keyword in excitement_keywords):
+        elif emotion == "excitement":
             return self.celebrate_achievement(message)
         else:
             return self.process(message)
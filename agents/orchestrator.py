@@ -2,15 +2,27 @@
 Orchestrator - Coordinates all agents and routes requests
 """
 
-from typing import Dict, Any, Optional
+import copy
+import logging
+import os
+import threading
+from typing import Dict, Any, List, Optional, Tuple
 from enum import Enum
+from functools import lru_cache
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait
 from core.llm_service import LLMService, Message
-from core.memory import Memory
+from core.memory import Memory, MessageRecord
 from core.code_sandbox import CodeSandbox
+from core.semantic_cache import SemanticCache
+from core.summarizer import ConversationSummarizer
 from agents.tutor_agent import TutorAgent
 from agents.debug_agent import DebugAgent
 from agents.assessment_agent import AssessmentAgent
 from agents.motivation_agent import MotivationAgent
+from agents.base_agent import BaseAgent
+from agents.intent_router import INTENT_CATEGORIES, KEYWORD_MATCHER, IntentRouter, get_intent_router
+
+logger = logging.getLogger(__name__)
 
 
 class AgentType(str, Enum):
@@ -21,6 +33,20 @@ class AgentType(str, Enum):
     AUTO = "auto"  # Let orchestrator decide
 
 
+@lru_cache(maxsize=1)
+def get_agent_executor() -> ThreadPoolExecutor:
+    """
+    Get the process-wide thread pool for concurrent agent calls
+    
+    Shared by every session so the number of agent threads stays bounded
+    (AGENT_POOL_SIZE, default 16) however many sessions are open.
+    """
+    return ThreadPoolExecutor(
+        max_workers=int(os.getenv("AGENT_POOL_SIZE", "16")),
+        thread_name_prefix="codementor-agent"
+    )
+
+
 class Orchestrator:
     """
     Orchestrator coordinates multiple agents to provide comprehensive learning support
@@ -35,14 +61,27 @@ class Orchestrator:
         self,
         llm_service: LLMService,
         memory: Memory,
-        code_sandbox: Optional[CodeSandbox] = None
+        code_sandbox: Optional[CodeSandbox] = None,
+        max_concurrency: int = 4,
+        agent_timeout: Optional[float] = 60.0,
+        summarizer: Optional[ConversationSummarizer] = None,
+        intent_router: Optional[IntentRouter] = None,
+        semantic_cache: Optional[SemanticCache] = None
     ):
         self.llm_service = llm_service
         self.memory = memory
         self.code_sandbox = code_sandbox or CodeSandbox()
+        # Precomputed centroid index, shared by every session in the process
+        self.intent_router = intent_router or get_intent_router()
+        
+        # Concurrent fan-out settings for multi-agent calls; the threads
+        # come from the shared pool, max_concurrency caps this session
+        self.max_concurrency = max_concurrency
+        self.agent_timeout = agent_timeout
+        self._slots = threading.BoundedSemaphore(max_concurrency)
         
         # Initialize all agents
-        self.tutor = TutorAgent(llm_service, memory)
+        self.tutor = TutorAgent(llm_service, memory, semantic_cache)
         self.debugger = DebugAgent(llm_service, memory, self.code_sandbox)
         self.assessor = AssessmentAgent(llm_service, memory, self.code_sandbox)
         self.motivator = MotivationAgent(llm_service, memory)
@@ -53,12 +92,22 @@ class Orchestrator:
             AgentType.ASSESSMENT: self.assessor,
             AgentType.MOTIVATION: self.motivator
         }
+        
+        # Shared rolling summary of turns older than the longest history
+        # window, so no agent is sent a turn both verbatim and summarized
+        self.summarizer = summarizer or ConversationSummarizer(
+            llm_service,
+            window=2 * max(agent.history_count for agent in self.agents.values())
+        )
+        for agent in self.agents.values():
+            agent.summarizer = self.summarizer
     
     def process(
         self,
         user_input: str,
         agent_type: AgentType = AgentType.AUTO,
-        context: Optional[Dict[str, Any]] = None
+        context: Optional[Dict[str, Any]] = None,
+        stream: bool = False
     ) -> Dict[str, Any]:
         """
         Process user input with appropriate agent(s)
@@ -67,6 +116,8 @@ class Orchestrator:
             user_input: User's message
             agent_type: Which agent to use (AUTO for automatic detection)
             context: Additional context
+            stream: Make "response" an iterator of text chunks; the
+                exchange is stored in memory once it is fully consumed
             
         Returns:
             Response dictionary with agent output and metadata
@@ -79,7 +130,7 @@ class Orchestrator:
         agent = self.agents[agent_type]
         
         # Process with the agent
-        response = agent.process(user_input, context)
+        response = agent.process(user_input, context, stream=stream)
         
         return {
             "response": response,
@@ -87,6 +138,51 @@ class Orchestrator:
             "agent_name": agent.name
         }
     
+    def _submit_detached(
+        self,
+        agent: BaseAgent,
+        user_input: str,
+        context: Optional[Dict[str, Any]],
+        abandoned: threading.Event
+    ) -> "Future[Tuple[str, List[MessageRecord]]]":
+        """
+        Run an agent in the shared pool against a snapshot of the conversation
+        
+        The agent sees the history as it is now and records its exchange in
+        the snapshot, not in the session; the caller copies the exchange
+        back with _record_detached once it has collected the results. Calls
+        still waiting for a slot when `abandoned` is set never reach the LLM.
+        
+        Returns:
+            Future of (response, messages the agent recorded)
+        """
+        snapshot = self.memory.snapshot()
+        detached = copy.copy(agent)
+        detached.memory = snapshot
+        # The session's summary is updated once the exchange is merged
+        detached.summarizer = None
+        
+        def run():
+            with self._slots:
+                if abandoned.is_set():
+                    return None, []
+                start = snapshot.message_count
+                response = detached.process(user_input, context)
+                added = snapshot.message_count - start
+                return response, list(snapshot.get_recent_messages(added))
+        
+        return get_agent_executor().submit(run)
+    
+    def _record_detached(self, records: List[MessageRecord]) -> None:
+        """Append exchanges recorded by detached agents to the session"""
+        if not records:
+            return
+        with self.memory.lock:
+            for record in records:
+                self.memory.add_message(record.role, record.content, agent_type=record.agent_type)
+        if self.summarizer is not None:
+            self.summarizer.maybe_update(self.memory)
+    
     def _detect_intent(
         self,
         user_input: str,
@@ -102,43 +198,26 @@ class Orchestrator:
         Returns:
             Detected agent type
         """
-        user_lower = user_input.lower()
+        label = self.intent_router.route(user_input)
+        if label is not None:
+            return AgentType(label)
         
+        # Not confident: fall back to keyword rules
+        return self._detect_intent_keywords(user_input, context)
+    
+    def _detect_intent_keywords(
+        self,
+        user_input: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> AgentType:
+        """Keyword-based intent detection used when the router is unsure"""
         # Check for code blocks (likely debug or assessment)
         has_code = '```' in user_input or context and context.get('has_code')
         
-        # Debug keywords
-        debug_keywords = [
-            'error', 'bug', 'broken', 'not working', 'wrong output',
-            'debug', 'fix', 'mistake', 'traceback', 'exception'
-        ]
-        if any(keyword in user_lower for keyword in debug_keywords):
-            return AgentType.DEBUG
-        
-        # Assessment keywords
-        assessment_keywords = [
-            'quiz', 'test', 'exercise', 'practice', 'challenge',
-            'evaluate', 'check my', 'review my code', 'assessment'
-        ]
-        if any(keyword in user_lower for keyword in assessment_keywords):
-            return AgentType.ASSESSMENT
-        
-        # Motivation keywords
-        motivation_keywords = [
-            'frustrated', 'stuck', 'giving up', 'progress', 'motivation',
-            'difficult', 'hard', 'confused', 'don\'t understand', 'help!',
-            'yay', 'got it', 'solved', 'figured out'
-        ]
-        if any(keyword in user_lower for keyword in motivation_keywords):
-            return AgentType.MOTIVATION
-        
-        # Learning/teaching keywords (default to tutor)
-        tutor_keywords = [
-            'explain', 'what is', 'how do', 'teach me', 'learn',
-            'understand', 'why', 'example', 'show me'
-        ]
-        if any(keyword in user_lower for keyword in tutor_keywords):
-            return AgentType.TUTOR
+        # One scan finds every category; debug > assessment > motivation > tutor
+        category = KEYWORD_MATCHER.best(user_input, INTENT_CATEGORIES)
+        if category is not None:
+            return AgentType(category)
         
         # If code is present but no clear debug intent, might be for assessment
         if has_code:
@@ -191,7 +270,8 @@ class Orchestrator:
     def multi_agent_response(
         self,
         user_input: str,
-        agent_types: list[AgentType]
+        agent_types: list[AgentType],
+        parallel: bool = True
     ) -> Dict[str, str]:
         """
         Get responses from multiple agents
@@ -199,14 +279,50 @@ class Orchestrator:
         Args:
             user_input: User message
             agent_types: List of agents to consult
+            parallel: Query agents concurrently (up to max_concurrency at a
+                time); agents that fail or miss agent_timeout are left out
             
         Returns:
             Dictionary of agent responses
+        
+        In parallel mode every agent sees the history as it was before the
+        call, and the exchanges are stored afterwards in the requested
+        order. Agents that fail or time out store nothing; one already waiting on
+        the LLM finishes that call in the background, queued ones are
+        never started.
         """
+        if not parallel or len(agent_types) < 2:
+            responses = {}
+            for agent_type in agent_types:
+                agent = self.agents[agent_type]
+                responses[agent_type.value] = agent.process(user_input)
+            return responses
+        
+        abandoned = threading.Event()
+        futures = {
+            agent_type: self._submit_detached(self.agents[agent_type], user_input, None, abandoned)
+            for agent_type in agent_types
+        }
+        wait(futures.values(), timeout=self.agent_timeout)
+        abandoned.set()
+        
+        # Keep the requested order; skip agents that failed or are still running
         responses = {}
-        for agent_type in agent_types:
-            agent = self.agents[agent_type]
-            responses[agent_type.value] = agent.process(user_input)
+        records = []
+        for agent_type, future in futures.items():
+            if not future.done():
+                future.cancel()
+            elif future.exception() is not None:
+                logger.warning(
+                    "%s agent failed; leaving it out of the response",
+                    agent_type.value,
+                    exc_info=future.exception()
+                )
+            else:
+                response, recorded = future.result()
+                responses[agent_type.value] = response
+                records.extend(recorded)
+        self._record_detached(records)
         return responses
     
     def smart_assist(
@@ -224,9 +340,29 @@ class Orchestrator:
         Returns:
             Comprehensive response with multiple perspectives if needed
         """
-        # Primary agent response
-        primary_result = self.process(user_input, AgentType.AUTO, context)
-        primary_agent = AgentType(primary_result["agent"])
+        primary_agent = self._detect_intent(user_input, context)
+        
+        # Debugging can be frustrating, so fetch encouragement alongside
+        # the primary response instead of after it
+        encouragement_future = None
+        abandoned = threading.Event()
+        if primary_agent == AgentType.DEBUG:
+            encouragement_future = self._submit_detached(
+                self.motivator,
+                "I'm working on debugging some code",
+                {"situation": "debugging"},
+                abandoned
+            )
+        
+        # Primary agent response; on failure the encouragement is dropped
+        # before it takes a slot or reaches the LLM
+        try:
+            primary_result = self.process(user_input, primary_agent, context)
+        except Exception:
+            abandoned.set()
+            if encouragement_future is not None:
+                encouragement_future.cancel()
+            raise
         
         result = {
             "primary_response": primary_result["response"],
@@ -234,14 +370,19 @@ class Orchestrator:
             "additional_support": {}
         }
         
-        # Add motivational support if user seems frustrated
-        if primary_agent == AgentType.DEBUG:
-            # Debugging can be frustrating, add encouragement
-            encouragement = self.motivator.process(
-                "I'm working on debugging some code",
-                context={"situation": "debugging"}
-            )
-            result["additional_support"]["encouragement"] = encouragement
+        # Add motivational support if user seems frustrated; it is stored
+        # after the primary exchange, as if it had run second
+        if encouragement_future is not None:
+            try:
+                encouragement, recorded = encouragement_future.result(timeout=self.agent_timeout)
+                result["additional_support"]["encouragement"] = encouragement
+                self._record_detached(recorded)
+            except FutureTimeoutError:
+                abandoned.set()
+                encouragement_future.cancel()
+            except Exception:
+                # Encouragement is optional; never fail the primary response
+                logger.warning("Encouragement failed; leaving it out", exc_info=True)
         
         # Add assessment suggestion if learning a concept
         if primary_agent == AgentType.TUTOR:
@@ -2,10 +2,12 @@
 Tutor Agent - Main teaching agent for explaining concepts
 """
 
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from typing import Dict, Any, Optional, Iterator, Tuple, Union
 from agents.base_agent import BaseAgent
-from core.llm_service import LLMService, Message
+from core.llm_service import LLMService, Message, SystemPrompt
 from core.memory import Memory
+from core.semantic_cache import SemanticCache
 
 
 class TutorAgent(BaseAgent):
@@ -60,7 +62,8 @@ Always:
     def __init__(
         self,
         llm_service: LLMService,
-        memory: Memory
+        memory: Memory,
+        semantic_cache: Optional[SemanticCache] = None
     ):
         super().__init__(
             name="Tutor",
@@ -68,18 +71,25 @@ Always:
             memory=memory,
             system_prompt=self.SYSTEM_PROMPT
         )
+        # Shared across learners: near-duplicate requests reuse explanations
+        self.semantic_cache = semantic_cache
     
     def process(
         self,
         user_input: str,
-        context: Optional[Dict[str, Any]] = None
-    ) -> str:
+        context: Optional[Dict[str, Any]] = None,
+        stream: bool = False,
+        topic: Optional[str] = None
+    ) -> Union[str, Iterator[str]]:
         """
         Process user's learning request
         
         Args:
             user_input: User's question or request
             context: Additional context (topic, difficulty, etc.)
+            stream: Return an iterator of text chunks instead of a string
+            topic: What user_input asks about, when it is built from a
+                prompt template; the semantic cache is keyed on it
             
         Returns:
             Teaching response
@@ -87,71 +97,126 @@ Always:
         # Get user context for personalization
         user_context = self.get_user_context()
         
+        # Stand-alone requests from learners with the same profile get the
+        # same explanation, however they are phrased
+        bucket = self._profile_bucket(user_context)
+        if topic:
+            # Only the topic is compared; the template has to match exactly
+            bucket += (user_input.replace(topic, "{topic}"),)
+        cache_key = topic or user_input
+        use_cache = self.semantic_cache is not None and not context
+        if use_cache:
+            cached = self.semantic_cache.get(cache_key, bucket)
+            if cached is not None:
+                self._record_exchange(user_input, cached, "tutor")
+                return iter([cached]) if stream else cached
+        
         # Enhance system prompt with user context
         enhanced_prompt = self._enhance_prompt_with_context(user_context, context)
         
         # Build messages
-        messages = self._build_messages(user_input, include_history=True, history_count=5)
+        messages = self._build_messages(user_input, include_history=True)
         
-        # Generate response
-        response = self.llm_service.generate(
-            messages=messages,
+        # Generate response and store in memory
+        response = self._respond(
+            user_input,
+            messages,
+            agent_type="tutor",
             system_prompt=enhanced_prompt,
             temperature=0.7,
-            max_tokens=1500
+            max_tokens=1500,
+            stream=stream
         )
         
-        # Store in memory
-        self.memory.add_message("user", user_input, agent_type="tutor")
-        self.memory.add_message("assistant", response, agent_type="tutor")
-        
+        if not use_cache:
+            return response
+        if stream:
+            return self._cache_stream(cache_key, bucket, response)
+        self.semantic_cache.put(cache_key, response, bucket)
         return response
     
+    def _cache_stream(self, cache_key: str, bucket: Tuple, chunks: Iterator[str]) -> Iterator[str]:
+        """Pass chunks through and cache the response once the stream completes"""
+        parts = []
+        for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+        
+        self.semantic_cache.put(cache_key, "".join(parts), bucket)
+    
+    @staticmethod
+    def _profile_bucket(user_context: Dict[str, Any]) -> Tuple:
+        """Profile settings that change how an explanation is written"""
+        return (
+            user_context.get('learning_style'),
+            user_context.get('pace'),
+            tuple(sorted(user_context.get('accessibility_needs') or ())),
+            user_context.get('current_language')
+        )
+    
     def _enhance_prompt_with_context(
         self,
         user_context: Dict[str, Any],
         request_context: Optional[Dict[str, Any]]
-    ) -> str:
-        """Enhance system prompt with user-specific context"""
-        
-        enhanced = self.SYSTEM_PROMPT
-        
-        # Add learning style guidance
-        if user_context.get('learning_style'):
-            style = user_context['learning_style']
-            if style == 'visual':
-                enhanced += "\n\nThis learner is VISUAL - use diagrams, analogies, and visual metaphors."
-            elif style == 'auditory':
-                enhanced += "\n\nThis learner is AUDITORY - use verbal explanations, talk through concepts."
-            elif style == 'kinesthetic':
-                enhanced += "\n\nThis learner is KINESTHETIC - provide hands-on exercises and interactive examples."
+    ) -> SystemPrompt:
+        """
+        Enhance system prompt with user-specific context
         
-        # Add pace preference
-        if user_context.get('pace'):
-            pace = user_context['pace']
-            if pace == 'slow':
-                enhanced += "\n\nTeach at a SLOW pace with extra detail and repetition."
-            elif pace == 'fast':
-                enhanced += "\n\nThis learner prefers a FASTER pace - be concise but thorough."
+        Profile guidance only takes a few distinct values, so that part is
+        built once per combination and reused as the cacheable prefix;
+        per-learner topic lines form the suffix.
+        """
+        needs = user_context.get('accessibility_needs') or ()
+        prefix = self._profile_prompt(
+            user_context.get('learning_style'),
+            user_context.get('pace'),
+            tuple(need for need in ('adhd', 'dyslexia', 'autism') if need in needs)
+        )
         
-        # Add accessibility needs
-        if user_context.get('accessibility_needs'):
-            needs = user_context['accessibility_needs']
-            if 'adhd' in needs:
-                enhanced += "\n\nLearner has ADHD - keep responses focused and structured."
-            if 'dyslexia' in needs:
-                enhanced += "\n\nLearner has dyslexia - use simple sentences and clear formatting."
-            if 'autism' in needs:
-                enhanced += "\n\nLearner is on autism spectrum - be explicit and literal."
+        suffix = ""
         
         # Add current topic context
         if user_context.get('current_topic'):
-            enhanced += f"\n\nCurrent topic focus: {user_context['current_topic']}"
+            suffix += f"\n\nCurrent topic focus: {user_context['current_topic']}"
         
         # Add weak topics for targeted support
         if user_context.get('weak_topics'):
             weak = ', '.join(user_context['weak_topics'][:3])
-            enhanced += f"\n\nTopics needing more practice: {weak}"
+            suffix += f"\n\nTopics needing more practice: {weak}"
+        
+        return SystemPrompt(prefix, suffix)
+    
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def _profile_prompt(
+        style: Optional[str],
+        pace: Optional[str],
+        needs: Tuple[str, ...]
+    ) -> str:
+        """System prompt plus learning style, pace and accessibility guidance"""
+        enhanced = TutorAgent.SYSTEM_PROMPT
+        
+        # Add learning style guidance
+        if style == 'visual':
+            enhanced += "\n\nThis learner is VISUAL - use diagrams, analogies, and visual metaphors."
+        elif style == 'auditory':
+            enhanced += "\n\nThis learner is AUDITORY - use verbal explanations, talk through concepts."
+        elif style == 'kinesthetic':
+            enhanced += "\n\nThis learner is KINESTHETIC - provide hands-on exercises and interactive examples."
+        
+        # Add pace preference
+        if pace == 'slow':
+            enhanced += "\n\nTeach at a SLOW pace with extra detail and repetition."
+        elif pace == 'fast':
+            enhanced += "\n\nThis learner prefers a FASTER pace - be concise but thorough."
+        
+        # Add accessibility needs
+        if 'adhd' in needs:
+            enhanced += "\n\nLearner has ADHD - keep responses focused and structured."
+        if 'dyslexia' in needs:
+            enhanced += "\n\nLearner has dyslexia - use simple sentences and clear formatting."
+        if 'autism' in needs:
+            enhanced += "\n\nLearner is on autism spectrum - be explicit and literal."
         
         return enhanced
     
@@ -177,7 +242,7 @@ Always:
         elif detail_level == "detailed":
             prompt += " in detail, covering all important aspects and edge cases."
         
-        return self.process(prompt)
+        return self.process(prompt, topic=concept)
     
     def provide_example(
         self,
@@ -195,4 +260,4 @@ Always:
             Code example with explanation
         """
         prompt = f"Show me a clear code example of {concept} in {language}, with explanatory comments."
-        return self.process(prompt)
+        return self.process(prompt, topic=concept)
@@ -9,6 +9,9 @@ import re
 from dotenv import load_dotenv
 
 from core.llm_service import create_llm_service
+from core.llm_router import create_llm_router
+from core.response_cache import InMemoryResponseCache, SQLiteResponseCache, TieredResponseCache
+from core.semantic_cache import SemanticCache
 from core.code_sandbox import CodeSandbox
 from core.memory import Memory, UserProfile
 from agents.orchestrator import Orchestrator, AgentType
@@ -166,22 +169,55 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+@st.cache_resource
+def get_response_cache():
+    """Process-wide LLM response cache shared by all sessions"""
+    memory_cache = InMemoryResponseCache(max_entries=2048, ttl=6 * 3600)
+    
+    # Optional disk tier shared by every worker process on this host
+    cache_path = os.getenv("LLM_CACHE_PATH")
+    if cache_path:
+        return TieredResponseCache(
+            memory_cache,
+            SQLiteResponseCache(cache_path),
+            warm_start=512
+        )
+    return memory_cache
+
+
+@st.cache_resource
+def get_semantic_cache():
+    """Process-wide near-duplicate cache for tutor explanations"""
+    return SemanticCache(threshold=0.9, max_entries=4096, n_lists=16)
+
+
+@st.cache_resource
+def get_llm_router():
+    """Process-wide provider router, so latency and error stats are shared"""
+    return create_llm_router(cache=get_response_cache())
+
+
 def initialize_session_state():
     """Initialize session state variables"""
     if "memory" not in st.session_state:
         st.session_state.memory = Memory()
     
     if "llm_service" not in st.session_state:
-        st.session_state.llm_service = create_llm_service()
+        if os.getenv("LLM_FALLBACK_PROVIDERS"):
+            st.session_state.llm_service = get_llm_router()
+        else:
+            st.session_state.llm_service = create_llm_service(cache=get_response_cache())
     
     if "code_sandbox" not in st.session_state:
-        st.session_state.code_sandbox = CodeSandbox()
+        # Run learner code in resource-limited worker processes
+        st.session_state.code_sandbox = CodeSandbox(backend="process")
     
     if "orchestrator" not in st.session_state:
         st.session_state.orchestrator = Orchestrator(
             st.session_state.llm_service,
             st.session_state.memory,
-            st.session_state.code_sandbox
+            st.session_state.code_sandbox,
+            semantic_cache=get_semantic_cache()
         )
     
     if "messages" not in st.session_state:
@@ -478,9 +514,27 @@ def main():
             st.markdown(prompt)
         
         with st.chat_message("assistant"):
-            with st.spinner("🤔 Thinking..."):
-                agent_mode = st.session_state.get("agent_mode", "auto")
+            agent_mode = st.session_state.get("agent_mode", "auto")
+            is_general_chat = not (
+                "quiz" in prompt.lower() or "explain" in prompt.lower()
+                or agent_mode in ("assessment", "tutor", "debug", "motivation")
+            )
+            
+            if is_general_chat:
+                # Stream general chat so the first tokens render right away
+                result = st.session_state.orchestrator.process(prompt, stream=True)
+                agent_type = result["agent"]
+                st.markdown(render_agent_badge(agent_type), unsafe_allow_html=True)
+                response = st.write_stream(result["response"])
                 
+                st.session_state.messages.append({
+                    "role": "assistant",
+                    "content": response,
+                    "agent": agent_type
+                })
+                return
+            
+            with st.spinner("🤔 Thinking..."):
                 # Enhanced prompts for better responses
                 if "quiz" in prompt.lower() or agent_mode == "assessment":
                     enhanced_prompt = f"{prompt}\n\nIMPORTANT: Format each question EXACTLY like this:\nQuestion 1: [Question text]\nA) [Option A]\nB) [Option B]\nC) [Option C]\nD) [Option D]"
@@ -493,12 +547,9 @@ def main():
                 elif agent_mode == "debug":
                     response = st.session_state.orchestrator.debug_code(prompt)
                     agent_type = "debug"
-                elif agent_mode == "motivation":
+                else:
                     response = st.session_state.orchestrator.get_progress_update()
                     agent_type = "motivation"
-                else:
-                    response = st.session_state.orchestrator.chat(prompt)
-                    agent_type = "tutor"
                 
                 st.markdown(render_agent_badge(agent_type), unsafe_allow_html=True)
                 
@@ -0,0 +1,86 @@
+"""
+Benchmark cold vs warm provider clients for new sessions
+
+"Cold" is the previous behaviour: every new session builds its own
+provider client (and connection pool). "Warm" reuses the process-wide
+ClientRegistry, as create_llm_service now does.
+
+Session setup time is measured offline with a dummy key. First-request
+latency, which includes DNS, TCP and TLS setup on a cold client, is only
+measured when the provider's real API key is set in the environment.
+
+Run from the repository root:
+    python -m benchmarks.bench_clients
+"""
+
+import os
+import statistics
+import time
+import warnings
+
+from core.client_registry import ClientRegistry
+from core.llm_service import Message, create_llm_service
+
+warnings.filterwarnings("ignore", category=FutureWarning)
+
+SESSIONS = 200
+REQUESTS = 5
+KEY_VARS = {"gemini": "GOOGLE_API_KEY", "openai": "OPENAI_API_KEY", "anthropic": "ANTHROPIC_API_KEY"}
+
+
+def time_session_setup(provider: str) -> tuple:
+    start = time.perf_counter()
+    for _ in range(SESSIONS):
+        create_llm_service(provider=provider, clients=ClientRegistry())
+    cold = (time.perf_counter() - start) / SESSIONS * 1e3
+    
+    shared = ClientRegistry()
+    create_llm_service(provider=provider, clients=shared)
+    start = time.perf_counter()
+    for _ in range(SESSIONS):
+        create_llm_service(provider=provider, clients=shared)
+    warm = (time.perf_counter() - start) / SESSIONS * 1e3
+    return cold, warm
+
+
+def first_request_ms(service) -> float:
+    start = time.perf_counter()
+    service.generate([Message(role="user", content="Reply with OK")], max_tokens=5, use_cache=False)
+    return (time.perf_counter() - start) * 1e3
+
+
+def time_first_request(provider: str) -> tuple:
+    cold = [
+        first_request_ms(create_llm_service(provider=provider, clients=ClientRegistry()))
+        for _ in range(REQUESTS)
+    ]
+    
+    shared = ClientRegistry()
+    first_request_ms(create_llm_service(provider=provider, clients=shared))
+    warm = [
+        first_request_ms(create_llm_service(provider=provider, clients=shared))
+        for _ in range(REQUESTS)
+    ]
+    return statistics.median(cold), statistics.median(warm)
+
+
+def main():
+    provider = os.getenv("LLM_PROVIDER", "gemini")
+    live = bool(os.getenv(KEY_VARS.get(provider, "")))
+    if not live:
+        os.environ.setdefault(KEY_VARS.get(provider, "GOOGLE_API_KEY"), "dummy")
+    
+    cold, warm = time_session_setup(provider)
+    print(f"provider: {provider}")
+    print(f"{'':<22} {'cold (ms)':>10} {'warm (ms)':>10}")
+    print(f"{'session setup':<22} {cold:>10.3f} {warm:>10.3f}")
+    
+    if live:
+        cold, warm = time_first_request(provider)
+        print(f"{'first request (p50)':<22} {cold:>10.1f} {warm:>10.1f}")
+    else:
+        print(f"first request: skipped, set {KEY_VARS.get(provider)} to measure against the API")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark keyword routing over short messages and long pasted code
+
+Compares the previous approach (one `keyword in text` scan per keyword,
+per category, at both call sites) with a single KeywordMatcher scan that
+returns every category hit. The second table grows the keyword list to
+show how each approach scales with the number of keywords.
+
+Run from the repository root:
+    python -m benchmarks.bench_keywords
+"""
+
+import time
+
+from agents.intent_router import ROUTING_KEYWORDS
+from core.keyword_matcher import KeywordMatcher
+
+CODE = (
+    "def moving_average(values, window):\n"
+    "    total = sum(values[:window])\n"
+    "    result = [total / window]\n"
+    "    for i in range(window, len(values)):\n"
+    "        total += values[i] - values[i - window]\n"
+    "        result.append(total / window)\n"
+    "    return result\n\n"
+)
+
+INPUTS = {
+    "message": "I wrote a function to compute a moving average, can you take a look at it?",
+    "code 2KB": "Here is my code:\n```python\n" + CODE * 8 + "```",
+    "code 20KB": "Here is my code:\n```python\n" + CODE * 80 + "```",
+}
+
+
+def keyword_scans(text: str, categories: dict) -> set:
+    """Previous behaviour, without early exit (no keyword matches)"""
+    lower = text.lower()
+    return {
+        category for category, keywords in categories.items()
+        if any(keyword in lower for keyword in keywords)
+    }
+
+
+def time_per_call(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def scaled_keywords(factor: int) -> dict:
+    """ROUTING_KEYWORDS plus `factor - 1` made-up variants of every keyword"""
+    suffixes = [""] + [f"_{i}" for i in range(1, factor)]
+    return {
+        category: [keyword + suffix for keyword in keywords for suffix in suffixes]
+        for category, keywords in ROUTING_KEYWORDS.items()
+    }
+
+
+def main():
+    matcher = KeywordMatcher(ROUTING_KEYWORDS)
+    
+    print(f"{'input':<10} {'scans (us)':>11} {'matcher (us)':>13}")
+    for name, text in INPUTS.items():
+        iterations = 20000 if len(text) < 1000 else 200
+        scans = time_per_call(lambda: keyword_scans(text, ROUTING_KEYWORDS), iterations)
+        single = time_per_call(lambda: matcher.categories(text), iterations)
+        print(f"{name:<10} {scans:>11.1f} {single:>13.1f}")
+    
+    text = INPUTS["code 20KB"]
+    print(f"\n{'keywords':<10} {'scans (us)':>11} {'matcher (us)':>13}")
+    for factor in (1, 4, 16):
+        categories = scaled_keywords(factor)
+        count = sum(len(keywords) for keywords in categories.values())
+        scaled = KeywordMatcher(categories)
+        scans = time_per_call(lambda: keyword_scans(text, categories), 50)
+        single = time_per_call(lambda: scaled.categories(text), 50)
+        print(f"{count:<10} {scans:>11.1f} {single:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
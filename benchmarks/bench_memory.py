@@ -0,0 +1,80 @@
+"""
+Benchmark conversation history appends
+
+Compares the previous list append + re-slice strategy with the deque ring
+buffer now used by Memory, for 1M appends at several max_history sizes,
+plus the cost of reading the last-N window from the deque (copying it
+into a list and slicing vs iterating a HistoryTail view).
+
+Run from the repository root:
+    python -m benchmarks.bench_memory
+"""
+
+import time
+from collections import deque
+
+from core.memory import HistoryTail, MessageRecord
+
+APPENDS = 1_000_000
+MAX_HISTORY_SIZES = [10, 50, 500, 5000]
+WINDOW = 10
+
+
+def list_reslice(message, max_history: int) -> float:
+    """Previous behaviour: append, then rebuild the list on overflow"""
+    history = []
+    start = time.perf_counter()
+    for _ in range(APPENDS):
+        history.append(message)
+        if len(history) > max_history:
+            history = history[-max_history:]
+    return time.perf_counter() - start
+
+
+def ring_buffer(message, max_history: int) -> float:
+    history = deque(maxlen=max_history)
+    start = time.perf_counter()
+    for _ in range(APPENDS):
+        history.append(message)
+    return time.perf_counter() - start
+
+
+def window_reads(max_history: int, reads: int = 100_000) -> tuple:
+    """Time reading the last WINDOW messages: copy-and-slice vs tail view"""
+    message = MessageRecord("user", "hello")
+    as_deque = deque([message] * max_history, maxlen=max_history)
+    
+    start = time.perf_counter()
+    for _ in range(reads):
+        for _msg in list(as_deque)[-WINDOW:]:
+            pass
+    sliced = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for _ in range(reads):
+        for _msg in HistoryTail(as_deque, WINDOW):
+            pass
+    viewed = time.perf_counter() - start
+    
+    return sliced, viewed
+
+
+def main():
+    message = MessageRecord("user", "hello")
+    
+    print(f"{APPENDS:,} appends")
+    print(f"{'max_history':>11} {'list+slice (s)':>15} {'ring buffer (s)':>16}")
+    for max_history in MAX_HISTORY_SIZES:
+        old = list_reslice(message, max_history)
+        new = ring_buffer(message, max_history)
+        print(f"{max_history:>11} {old:>15.3f} {new:>16.3f}")
+    
+    print(f"\nlast-{WINDOW} window reads (100,000 reads)")
+    print(f"{'max_history':>11} {'copy+slice (s)':>15} {'tail view (s)':>14}")
+    for max_history in MAX_HISTORY_SIZES:
+        sliced, viewed = window_reads(max_history)
+        print(f"{max_history:>11} {sliced:>15.3f} {viewed:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark message construction on the request hot path
+
+Compares the previous pydantic path (a ConversationMessage per stored
+message plus a Message per history entry per request) with slotted
+MessageRecords that are stored once and passed through to the LLM.
+
+Run from the repository root:
+    python -m benchmarks.bench_messages
+"""
+
+import time
+import tracemalloc
+
+from core.llm_service import Message
+from core.memory import ConversationMessage, MessageRecord
+
+MESSAGES = 100_000
+REQUESTS = 20_000
+HISTORY = 10
+
+
+def time_construction() -> tuple:
+    start = time.perf_counter()
+    for _ in range(MESSAGES):
+        ConversationMessage(role="user", content="hello", agent_type="tutor")
+    pydantic_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for _ in range(MESSAGES):
+        MessageRecord("user", "hello", agent_type="tutor")
+    record_time = time.perf_counter() - start
+    
+    return pydantic_time, record_time
+
+
+def measure_allocation(factory) -> float:
+    """Bytes allocated per message while keeping MESSAGES alive"""
+    tracemalloc.start()
+    messages = [factory(f"message {i}") for i in range(MESSAGES)]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del messages
+    return allocated / MESSAGES
+
+
+def time_request_building() -> tuple:
+    """Build the LLM message list for REQUESTS requests over HISTORY entries"""
+    stored_models = [ConversationMessage(role="user", content="hello") for _ in range(HISTORY)]
+    stored_records = [MessageRecord("user", "hello") for _ in range(HISTORY)]
+    
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        messages = [Message(role=msg.role, content=msg.content) for msg in stored_models]
+        messages.append(Message(role="user", content="next question"))
+    pydantic_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        messages = list(stored_records)
+        messages.append(MessageRecord("user", "next question"))
+    record_time = time.perf_counter() - start
+    
+    return pydantic_time, record_time
+
+
+def main():
+    pydantic_time, record_time = time_construction()
+    print(f"Construct {MESSAGES:,} messages")
+    print(f"  ConversationMessage: {pydantic_time:.3f}s")
+    print(f"  MessageRecord:       {record_time:.3f}s ({pydantic_time / record_time:.1f}x faster)")
+    
+    pydantic_bytes = measure_allocation(lambda text: ConversationMessage(role="user", content=text))
+    record_bytes = measure_allocation(lambda text: MessageRecord("user", text))
+    print("\nAllocated per live message (incl. content string)")
+    print(f"  ConversationMessage: {pydantic_bytes:.0f} bytes")
+    print(f"  MessageRecord:       {record_bytes:.0f} bytes")
+    
+    pydantic_time, record_time = time_request_building()
+    print(f"\nBuild {REQUESTS:,} request message lists ({HISTORY} history entries)")
+    print(f"  pydantic Message copies: {pydantic_time:.3f}s")
+    print(f"  MessageRecord reuse:     {record_time:.3f}s ({pydantic_time / record_time:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark per-execution sandbox overhead
+
+Compares building the restricted globals on every run (the previous
+behaviour) with cloning the prebuilt template, in-process and through
+the warm worker pool. Uses the tiny snippets from tests/test_core.py.
+
+Run from the repository root:
+    python -m benchmarks.bench_sandbox
+"""
+
+import time
+import warnings
+from unittest.mock import patch
+from RestrictedPython import compile_restricted
+
+from core.code_sandbox import build_restricted_globals, run_restricted
+from core.sandbox_pool import SandboxWorkerPool
+
+warnings.filterwarnings("ignore", category=SyntaxWarning)
+
+SNIPPETS = {
+    "print": "print('Hello, World!')",
+    "math": "import math\nresult = math.sqrt(16)\nprint(result)",
+    "assign": "x = 10\ny = x * 2",
+}
+
+ALLOWED_MODULES = ['math', 'random', 'datetime', 'json']
+
+
+def time_per_call(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    iterations = 5000
+    pool = SandboxWorkerPool(size=1)
+    
+    print(f"{'snippet':<8} {'rebuild (us)':>14} {'template (us)':>14} {'warm pool (us)':>15}")
+    for name, code in SNIPPETS.items():
+        byte_code = compile_restricted(code, filename='<user_code>', mode='exec')
+        
+        # Previous behaviour: rebuild builtins and re-import modules per run
+        with patch("core.code_sandbox.get_globals_template", build_restricted_globals):
+            rebuild = time_per_call(lambda: run_restricted(byte_code, ALLOWED_MODULES), iterations)
+        template = time_per_call(lambda: run_restricted(byte_code, ALLOWED_MODULES), iterations)
+        warm_pool = time_per_call(lambda: pool.run(byte_code), iterations // 10)
+        
+        print(f"{name:<8} {rebuild:>14.1f} {template:>14.1f} {warm_pool:>15.1f}")
+    
+    pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Client Registry - Process-wide, connection-pooled LLM provider clients
+"""
+
+import asyncio
+import inspect
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_POOL_SIZE = 20
+
+# Idle keep-alive connections are kept this long (seconds) so that a
+# learner arriving between requests still finds a warm TLS connection
+KEEPALIVE_EXPIRY = 60.0
+
+
+def default_pool_size() -> int:
+    """Connections per provider client, from LLM_POOL_SIZE"""
+    return int(os.getenv("LLM_POOL_SIZE", DEFAULT_POOL_SIZE))
+
+
+def _limits(pool_size: int):
+    import httpx
+    return httpx.Limits(
+        max_connections=pool_size,
+        max_keepalive_connections=pool_size,
+        keepalive_expiry=KEEPALIVE_EXPIRY
+    )
+
+
+def _provider_name(provider) -> str:
+    # Accept LLMProvider members as well as plain strings
+    return getattr(provider, "value", provider)
+
+
+async def _close_clients(clients) -> None:
+    for client in clients:
+        close = getattr(client, "close", None)
+        if close is not None:
+            result = close()
+            if inspect.isawaitable(result):
+                await result
+
+
+def _api_key(provider: str) -> Optional[str]:
+    return os.getenv({
+        "openai": "OPENAI_API_KEY",
+        "anthropic": "ANTHROPIC_API_KEY",
+        "gemini": "GOOGLE_API_KEY",
+    }[provider])
+
+
+class ClientRegistry:
+    """
+    Shares provider SDK clients across sessions and threads
+    
+    Building a client is slow and each one owns its own connection pool,
+    so a client per session means a TLS handshake per new learner. The
+    registry hands every LLMService the same client for a provider, API
+    key and pool size. The OpenAI and Anthropic clients are thread-safe;
+    Gemini's GenerativeModel is stateless between calls.
+    
+    Async clients are also keyed by event loop, because httpx.AsyncClient
+    connections and the gRPC channel behind Gemini's *_async methods
+    belong to the loop that opened them. A loop's clients are closed when
+    asyncio.run shuts it down (or on clear()); loops closed some other way
+    are dropped on the next lookup.
+    """
+    
+    def __init__(self):
+        self._clients: Dict[Tuple, Any] = {}
+        # loop -> (clients by key, task that closes them at shutdown)
+        self._async_clients: Dict[asyncio.AbstractEventLoop, Tuple[Dict[Tuple, Any], asyncio.Task]] = {}
+        self._lock = threading.Lock()
+        self.created = 0
+    
+    @staticmethod
+    def _key(provider: str, model: str, pool_size: int) -> Tuple:
+        provider = _provider_name(provider)
+        # A GenerativeModel is bound to its model; HTTP clients serve any model
+        return (provider, _api_key(provider), model if provider == "gemini" else None, pool_size)
+    
+    def get_client(self, provider: str, model: str, pool_size: Optional[int] = None) -> Any:
+        """
+        Get the shared synchronous client for a provider
+        
+        Args:
+            provider: LLM provider name
+            model: Model name
+            pool_size: Maximum pooled connections (defaults to LLM_POOL_SIZE)
+        
+        Returns:
+            openai.OpenAI, anthropic.Anthropic or genai.GenerativeModel
+        """
+        pool_size = pool_size or default_pool_size()
+        key = self._key(provider, model, pool_size)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._build_client(_provider_name(provider), model, pool_size)
+                self._clients[key] = client
+                self.created += 1
+            return client
+    
+    def get_async_client(self, provider: str, model: str, pool_size: Optional[int] = None) -> Any:
+        """
+        Get the shared async client for a provider on the running event loop
+        
+        Args:
+            provider: LLM provider name
+            model: Model name
+            pool_size: Maximum pooled connections (defaults to LLM_POOL_SIZE)
+        
+        Returns:
+            openai.AsyncOpenAI, anthropic.AsyncAnthropic or genai.GenerativeModel
+        """
+        pool_size = pool_size or default_pool_size()
+        key = self._key(provider, model, pool_size)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if loop not in self._async_clients:
+                # Loops closed without cancelling their tasks never ran the closer
+                for closed in [other for other in self._async_clients if other.is_closed()]:
+                    del self._async_clients[closed]
+                new_clients: Dict[Tuple, Any] = {}
+                closer = loop.create_task(self._close_on_shutdown(loop, new_clients))
+                self._async_clients[loop] = (new_clients, closer)
+            clients, _ = self._async_clients[loop]
+            client = clients.get(key)
+            if client is None:
+                client = self._build_async_client(_provider_name(provider), model, pool_size)
+                clients[key] = client
+                self.created += 1
+            return client
+    
+    async def _close_on_shutdown(self, loop: asyncio.AbstractEventLoop, clients: Dict[Tuple, Any]) -> None:
+        # Pending until the loop cancels its remaining tasks on shutdown
+        try:
+            await loop.create_future()
+        finally:
+            with self._lock:
+                entry = self._async_clients.get(loop)
+                if entry is not None and entry[0] is clients:
+                    del self._async_clients[loop]
+            await _close_clients(list(clients.values()))
+    
+    @staticmethod
+    def _build_client(provider: str, model: str, pool_size: int) -> Any:
+        if provider == "openai":
+            import httpx
+            import openai
+            return openai.OpenAI(
+                api_key=_api_key(provider),
+                http_client=httpx.Client(limits=_limits(pool_size))
+            )
+        if provider == "anthropic":
+            import httpx
+            import anthropic
+            return anthropic.Anthropic(
+                api_key=_api_key(provider),
+                http_client=httpx.Client(limits=_limits(pool_size))
+            )
+        if provider == "gemini":
+            import google.generativeai as genai
+            genai.configure(api_key=_api_key(provider))
+            return genai.GenerativeModel(model)
+        raise ValueError(f"Unsupported LLM provider: {provider}")
+    
+    @staticmethod
+    def _build_async_client(provider: str, model: str, pool_size: int) -> Any:
+        if provider == "openai":
+            import httpx
+            import openai
+            return openai.AsyncOpenAI(
+                api_key=_api_key(provider),
+                http_client=httpx.AsyncClient(limits=_limits(pool_size))
+            )
+        if provider == "anthropic":
+            import httpx
+            import anthropic
+            return anthropic.AsyncAnthropic(
+                api_key=_api_key(provider),
+                http_client=httpx.AsyncClient(limits=_limits(pool_size))
+            )
+        if provider == "gemini":
+            # The model opens its async channel lazily on first use
+            import google.generativeai as genai
+            genai.configure(api_key=_api_key(provider))
+            return genai.GenerativeModel(model)
+        raise ValueError(f"Unsupported LLM provider: {provider}")
+    
+    def clear(self) -> None:
+        """Drop all clients; the next request builds (and connects) afresh"""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+            loops = self._async_clients
+            self._async_clients = {}
+        for loop, (_, closer) in loops.items():
+            # Async clients are closed on their own loop
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(closer.cancel)
+        for client in clients:
+            close = getattr(client, "close", None)
+            if close is not None:
+                close()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "clients": len(self._clients),
+                "async_loops": len(self._async_clients),
+                "created": self.created
+            }
+
+
+_registry = ClientRegistry()
+
+
+def get_client_registry() -> ClientRegistry:
+    """Get the process-wide client registry"""
+    return _registry
@@ -5,12 +5,24 @@ Uses RestrictedPython for basic safety, with planned Docker integration
 
 import sys
 import io
+import hashlib
+import operator
+import threading
 import traceback
 import time
-from typing import Dict, Any, Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
 from contextlib import redirect_stdout, redirect_stderr
-from RestrictedPython import compile_restricted, safe_globals
-from RestrictedPython.Guards import guarded_iter_unpack_sequence, safer_getattr
+from RestrictedPython import compile_restricted, safe_globals, PrintCollector
+from RestrictedPython.Eval import default_guarded_getitem, default_guarded_getiter
+from RestrictedPython.Guards import (
+    full_write_guard,
+    guarded_iter_unpack_sequence,
+    guarded_unpack_sequence,
+    safer_getattr
+)
 
 
 class ExecutionResult:
@@ -40,13 +52,392 @@ class ExecutionResult:
         }
 
 
+class CaseResult:
+    """Result of a single test case"""
+    
+    def __init__(
+        self,
+        index: int,
+        input: str,
+        expected_output: Any,
+        passed: bool,
+        actual_output: Optional[str] = None,
+        error: Optional[str] = None,
+        execution_time: float = 0.0
+    ):
+        self.index = index
+        self.input = input
+        self.expected_output = expected_output
+        self.passed = passed
+        self.actual_output = actual_output
+        self.error = error
+        self.execution_time = execution_time
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "input": self.input,
+            "expected_output": self.expected_output,
+            "passed": self.passed,
+            "actual_output": self.actual_output,
+            "error": self.error,
+            "execution_time": self.execution_time
+        }
+
+
+class SuiteResult(ExecutionResult):
+    """Result of running a submission against a batch of test cases"""
+    
+    def __init__(self, cases: Optional[List[CaseResult]] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.cases = cases or []
+    
+    @property
+    def passed(self) -> int:
+        return sum(1 for case in self.cases if case.passed)
+    
+    @property
+    def total(self) -> int:
+        return len(self.cases)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        data = super().to_dict()
+        data["passed_tests"] = self.passed
+        data["total_tests"] = self.total
+        data["test_results"] = [case.to_dict() for case in self.cases]
+        return data
+
+
+_INPLACE_OPERATORS = {
+    '+=': operator.iadd,
+    '-=': operator.isub,
+    '*=': operator.imul,
+    '/=': operator.itruediv,
+    '//=': operator.ifloordiv,
+    '%=': operator.imod,
+    '**=': operator.ipow,
+    '<<=': operator.ilshift,
+    '>>=': operator.irshift,
+    '&=': operator.iand,
+    '|=': operator.ior,
+    '^=': operator.ixor,
+}
+
+
+class _StdoutPrintCollector(PrintCollector):
+    """Print collector that writes to (captured) stdout instead of `printed`"""
+    
+    def _call_print(self, *objects, **kwargs):
+        if kwargs.get('file', None) is not None:
+            self._getattr_(kwargs['file'], 'write')
+        print(*objects, **kwargs)
+
+
+def _inplacevar(op: str, x: Any, y: Any) -> Any:
+    """Implement augmented assignment (x += y) for restricted code"""
+    if op not in _INPLACE_OPERATORS:
+        raise SyntaxError(f"Operator {op} is not allowed")
+    return _INPLACE_OPERATORS[op](x, y)
+
+
+def _make_guarded_import(allowed_modules: list):
+    """Build an __import__ that only admits allowed top-level modules"""
+    allowed = set(allowed_modules)
+    
+    def _guarded_import(name, globals=None, locals=None, fromlist=(), level=0):
+        if level != 0 or name.split('.')[0] not in allowed:
+            raise ImportError(f"Import of '{name}' is not allowed in the sandbox")
+        return __import__(name, globals, locals, fromlist, level)
+    
+    return _guarded_import
+
+
+def build_restricted_globals(allowed_modules: list) -> Dict[str, Any]:
+    """
+    Build the globals namespace restricted code runs in
+    
+    Args:
+        allowed_modules: Modules user code may import
+        
+    Returns:
+        Fresh globals dictionary
+    """
+    # Set up safe globals
+    builtins = dict(safe_globals['__builtins__'])
+    builtins['__import__'] = _make_guarded_import(allowed_modules)
+    
+    safe_builtins = {'__builtins__': builtins}
+    safe_builtins['__name__'] = '__main__'
+    safe_builtins['__metaclass__'] = type
+    safe_builtins['_getiter_'] = default_guarded_getiter
+    safe_builtins['_getitem_'] = default_guarded_getitem
+    safe_builtins['_iter_unpack_sequence_'] = guarded_iter_unpack_sequence
+    safe_builtins['_unpack_sequence_'] = guarded_unpack_sequence
+    safe_builtins['_getattr_'] = safer_getattr
+    safe_builtins['_write_'] = full_write_guard
+    safe_builtins['_inplacevar_'] = _inplacevar
+    safe_builtins['_print_'] = _StdoutPrintCollector
+    
+    # Add allowed modules
+    for module_name in allowed_modules:
+        try:
+            safe_builtins[module_name] = __import__(module_name)
+        except ImportError:
+            pass
+    
+    # Add safe built-in functions
+    safe_builtins['print'] = print
+    safe_builtins['range'] = range
+    safe_builtins['len'] = len
+    safe_builtins['str'] = str
+    safe_builtins['int'] = int
+    safe_builtins['float'] = float
+    safe_builtins['list'] = list
+    safe_builtins['dict'] = dict
+    safe_builtins['tuple'] = tuple
+    safe_builtins['set'] = set
+    safe_builtins['abs'] = abs
+    safe_builtins['min'] = min
+    safe_builtins['max'] = max
+    safe_builtins['sum'] = sum
+    safe_builtins['sorted'] = sorted
+    safe_builtins['enumerate'] = enumerate
+    safe_builtins['zip'] = zip
+    safe_builtins['map'] = map
+    safe_builtins['filter'] = filter
+    
+    return safe_builtins
+
+
+@lru_cache(maxsize=16)
+def _globals_template(allowed_modules: tuple) -> Dict[str, Any]:
+    return build_restricted_globals(list(allowed_modules))
+
+
+def get_globals_template(allowed_modules: list) -> Dict[str, Any]:
+    """
+    Get the prebuilt globals template for a set of allowed modules
+    
+    The template (builtins, guards and imported modules) is built once per
+    process and must not be mutated; each run executes in a shallow copy.
+    Restricted code cannot reach the shared `__builtins__` dict because
+    underscore names are rejected at compile time.
+    
+    Args:
+        allowed_modules: Modules user code may import
+        
+    Returns:
+        Shared globals template
+    """
+    return _globals_template(tuple(allowed_modules))
+
+
+def run_restricted(byte_code, allowed_modules: list) -> ExecutionResult:
+    """
+    Execute compiled restricted code and capture its output
+    
+    Args:
+        byte_code: Code object from compile_restricted
+        allowed_modules: Modules user code may import
+        
+    Returns:
+        ExecutionResult with output/errors
+    """
+    # Only the top-level namespace is per-run; everything else is shared
+    return _exec_captured(byte_code, dict(get_globals_template(allowed_modules)))
+
+
+def _exec_captured(byte_code, safe_builtins: Dict[str, Any]) -> ExecutionResult:
+    """Execute code in the given namespace, capturing output and errors"""
+    # Capture output
+    stdout_capture = io.StringIO()
+    stderr_capture = io.StringIO()
+    
+    start_time = time.time()
+    
+    try:
+        with redirect_stdout(stdout_capture), redirect_stderr(stderr_capture):
+            exec(byte_code, safe_builtins)
+        
+        execution_time = time.time() - start_time
+        output = stdout_capture.getvalue()
+        
+        return ExecutionResult(
+            success=True,
+            output=output,
+            execution_time=execution_time
+        )
+        
+    except Exception as e:
+        execution_time = time.time() - start_time
+        error_output = stderr_capture.getvalue()
+        
+        # Get detailed traceback
+        exc_type, exc_value, exc_traceback = sys.exc_info()
+        tb_lines = traceback.format_exception(exc_type, exc_value, exc_traceback)
+        error_message = ''.join(tb_lines)
+        
+        return ExecutionResult(
+            success=False,
+            output=stdout_capture.getvalue(),
+            error=error_message if error_message else str(e),
+            execution_time=execution_time
+        )
+
+
+def _outputs_match(actual: Any, printed: str, expected: Any) -> bool:
+    """Compare a test case result (or what it printed) with the expectation"""
+    if actual == expected:
+        return True
+    if isinstance(expected, str):
+        if actual is not None and str(actual) == expected:
+            return True
+        # Functions that print instead of returning
+        return actual is None and printed.strip() == expected.strip()
+    return False
+
+
+def run_test_cases(byte_code, cases: List[tuple], allowed_modules: list) -> SuiteResult:
+    """
+    Execute a submission once, then evaluate every test case against it
+    
+    Args:
+        byte_code: Code object for the submission
+        cases: (index, input, case_code, expected_output) tuples, where
+            case_code is a compiled 'eval' code object or an error string
+        allowed_modules: Modules user code may import
+        
+    Returns:
+        SuiteResult with per-case pass/fail and timing
+    """
+    namespace = dict(get_globals_template(allowed_modules))
+    submission = _exec_captured(byte_code, namespace)
+    
+    results = []
+    for index, case_input, case_code, expected in cases:
+        if not submission.success or isinstance(case_code, str):
+            results.append(CaseResult(
+                index=index,
+                input=case_input,
+                expected_output=expected,
+                passed=False,
+                error=case_code if isinstance(case_code, str) else "Submission failed to run"
+            ))
+            continue
+        
+        stdout_capture = io.StringIO()
+        start_time = time.perf_counter()
+        try:
+            with redirect_stdout(stdout_capture):
+                actual = eval(case_code, namespace)
+            printed = stdout_capture.getvalue()
+            results.append(CaseResult(
+                index=index,
+                input=case_input,
+                expected_output=expected,
+                passed=_outputs_match(actual, printed, expected),
+                actual_output=printed.strip() if actual is None and printed else repr(actual),
+                execution_time=time.perf_counter() - start_time
+            ))
+        except Exception as e:
+            results.append(CaseResult(
+                index=index,
+                input=case_input,
+                expected_output=expected,
+                passed=False,
+                error=f"{type(e).__name__}: {e}",
+                execution_time=time.perf_counter() - start_time
+            ))
+    
+    return SuiteResult(
+        success=submission.success,
+        output=submission.output,
+        error=submission.error,
+        execution_time=submission.execution_time,
+        cases=results
+    )
+
+
+class CompileCache:
+    """
+    Bounded LRU cache of compile_restricted results keyed by source hash
+    
+    Successful compiles store the code object; failures store the
+    SyntaxError arguments so invalid snippets are not re-parsed either.
+    """
+    
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def compile(self, code: str, mode: str = 'exec'):
+        """
+        Compile restricted code, reusing a cached result when possible
+        
+        Args:
+            code: Source code
+            mode: 'exec' or 'eval'
+            
+        Returns:
+            Code object
+            
+        Raises:
+            SyntaxError: If the code does not compile under the restrictions
+        """
+        key = (mode, hashlib.sha256(code.encode('utf-8')).hexdigest())
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        
+        if entry is None:
+            try:
+                entry = (compile_restricted(code, filename='<user_code>', mode=mode), None)
+            except SyntaxError as e:
+                entry = (None, e.args)
+            
+            with self._lock:
+                self.misses += 1
+                self._entries[key] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        
+        byte_code, error_args = entry
+        if error_args is not None:
+            raise SyntaxError(*error_args)
+        return byte_code
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss statistics"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "hit_rate": self.hits / total if total else 0.0
+        }
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Shared by validation and execution across all sandboxes in the process
+compile_cache = CompileCache()
+
+
 class CodeSandbox:
     """
     Safe code execution sandbox
     
     Features:
     - Restricted Python execution
-    - Timeout enforcement
+    - Timeout enforcement (process backend)
     - Output capture
     - Error handling
     """
@@ -54,10 +445,25 @@ class CodeSandbox:
     def __init__(
         self,
         timeout: int = 30,
-        allowed_modules: Optional[list] = None
+        allowed_modules: Optional[list] = None,
+        backend: str = "inprocess",
+        pool=None
     ):
+        """
+        Args:
+            timeout: Wall-clock limit in seconds (enforced by the process backend)
+            allowed_modules: Modules user code may import
+            backend: "inprocess" to exec in the calling thread, or "process"
+                to run in a pool of resource-limited worker processes
+            pool: Optional SandboxWorkerPool (defaults to a shared pool)
+        """
+        if backend not in ("inprocess", "process"):
+            raise ValueError(f"Unsupported sandbox backend: {backend}")
+        
         self.timeout = timeout
         self.allowed_modules = allowed_modules or ['math', 'random', 'datetime', 'json']
+        self.backend = backend
+        self.pool = pool
         
     def execute(
         self,
@@ -85,87 +491,99 @@ class CodeSandbox:
     def _execute_python(self, code: str) -> ExecutionResult:
         """Execute Python code with restrictions"""
         
-        # Compile with RestrictedPython
+        # Compile with RestrictedPython (cached by source hash)
         try:
-            byte_code = compile_restricted(
-                code,
-                filename='<user_code>',
-                mode='exec'
-            )
+            byte_code = compile_cache.compile(code)
         except SyntaxError as e:
             return ExecutionResult(
                 success=False,
                 error=f"Syntax Error: {str(e)}"
             )
         
-        # Set up safe globals
-        safe_builtins = safe_globals.copy()
-        safe_builtins['_getiter_'] = safe_globals['_iter_']
-        safe_builtins['_iter_unpack_sequence_'] = guarded_iter_unpack_sequence
-        safe_builtins['_getattr_'] = safer_getattr
+        if self.backend == "process":
+            return self._get_pool().run(byte_code, timeout=self.timeout)
         
-        # Add allowed modules
-        for module_name in self.allowed_modules:
-            try:
-                safe_builtins[module_name] = __import__(module_name)
-            except ImportError:
-                pass
-        
-        # Add safe built-in functions
-        safe_builtins['print'] = print
-        safe_builtins['range'] = range
-        safe_builtins['len'] = len
-        safe_builtins['str'] = str
-        safe_builtins['int'] = int
-        safe_builtins['float'] = float
-        safe_builtins['list'] = list
-        safe_builtins['dict'] = dict
-        safe_builtins['tuple'] = tuple
-        safe_builtins['set'] = set
-        safe_builtins['abs'] = abs
-        safe_builtins['min'] = min
-        safe_builtins['max'] = max
-        safe_builtins['sum'] = sum
-        safe_builtins['sorted'] = sorted
-        safe_builtins['enumerate'] = enumerate
-        safe_builtins['zip'] = zip
-        safe_builtins['map'] = map
-        safe_builtins['filter'] = filter
-        
-        # Capture output
-        stdout_capture = io.StringIO()
-        stderr_capture = io.StringIO()
+        return run_restricted(byte_code, self.allowed_modules)
+    
+    def run_tests(
+        self,
+        code: str,
+        test_cases: List[Dict[str, Any]],
+        chunk_size: int = 25
+    ) -> SuiteResult:
+        """
+        Run a submission against input/expected_output test cases
         
-        start_time = time.time()
+        The submission is executed once per sandbox invocation and every
+        case's `input` expression (e.g. "add(2, 3)") is evaluated in its
+        namespace. With the process backend, suites larger than chunk_size
+        are split across pool workers and run in parallel.
         
-        try:
-            with redirect_stdout(stdout_capture), redirect_stderr(stderr_capture):
-                exec(byte_code, safe_builtins)
-            
-            execution_time = time.time() - start_time
-            output = stdout_capture.getvalue()
-            
-            return ExecutionResult(
-                success=True,
-                output=output,
-                execution_time=execution_time
-            )
-            
-        except Exception as e:
-            execution_time = time.time() - start_time
-            error_output = stderr_capture.getvalue()
-            
-            # Get detailed traceback
-            exc_type, exc_value, exc_traceback = sys.exc_info()
-            tb_lines = traceback.format_exception(exc_type, exc_value, exc_traceback)
-            error_message = ''.join(tb_lines)
+        Args:
+            code: Submitted code
+            test_cases: Dicts with "input" (expression) and "expected_output"
+            chunk_size: Maximum cases per sandbox invocation
             
-            return ExecutionResult(
+        Returns:
+            SuiteResult with per-case pass/fail and timing
+        """
+        try:
+            byte_code = compile_cache.compile(code)
+        except SyntaxError as e:
+            return SuiteResult(
                 success=False,
-                output=stdout_capture.getvalue(),
-                error=error_message if error_message else str(e),
-                execution_time=execution_time
+                error=f"Syntax Error: {str(e)}",
+                cases=[
+                    CaseResult(
+                        index=i,
+                        input=str(case.get("input", "")),
+                        expected_output=case.get("expected_output"),
+                        passed=False,
+                        error="Submission failed to compile"
+                    )
+                    for i, case in enumerate(test_cases)
+                ]
             )
+        
+        cases = []
+        for i, case in enumerate(test_cases):
+            case_input = str(case.get("input", ""))
+            try:
+                case_code = compile_cache.compile(case_input, mode='eval')
+            except SyntaxError as e:
+                case_code = f"Syntax Error in test input: {str(e)}"
+            cases.append((i, case_input, case_code, case.get("expected_output")))
+        
+        if self.backend != "process":
+            return run_test_cases(byte_code, cases, self.allowed_modules)
+        
+        pool = self._get_pool()
+        chunks = [cases[i:i + chunk_size] for i in range(0, len(cases), chunk_size)] or [[]]
+        if len(chunks) == 1:
+            return pool.run_tests(byte_code, chunks[0], timeout=self.timeout)
+        
+        with ThreadPoolExecutor(max_workers=min(len(chunks), pool.size)) as executor:
+            partials = list(executor.map(
+                lambda chunk: pool.run_tests(byte_code, chunk, timeout=self.timeout),
+                chunks
+            ))
+        
+        merged_cases = [case for partial in partials for case in partial.cases]
+        first_failure = next((partial for partial in partials if not partial.success), None)
+        return SuiteResult(
+            success=first_failure is None,
+            output=partials[0].output,
+            error=first_failure.error if first_failure else None,
+            execution_time=max(partial.execution_time for partial in partials),
+            cases=merged_cases
+        )
+    
+    def _get_pool(self):
+        """Get the worker pool used by the process backend"""
+        if self.pool is None:
+            from core.sandbox_pool import get_shared_pool
+            self.pool = get_shared_pool(self.allowed_modules)
+        return self.pool
     
     def validate_syntax(self, code: str, language: str = "python") -> tuple[bool, Optional[str]]:
         """
@@ -182,7 +600,7 @@ class CodeSandbox:
             return False, f"Language {language} not supported"
         
         try:
-            compile_restricted(code, filename='<string>', mode='exec')
+            compile_cache.compile(code)
             return True, None
         except SyntaxError as e:
             return False, str(e)
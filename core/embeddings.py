@@ -0,0 +1,111 @@
+"""
+Embeddings - Cheap offline text embeddings from hashed n-grams
+"""
+
+import re
+import zlib
+from functools import lru_cache
+from typing import Iterable, List
+
+import numpy as np
+
+_WORD = re.compile(r"[a-z0-9_']+")
+
+# Relative weights of the feature families; character n-grams make
+# "failing"/"fails"/"failed" land close together, words and word pairs
+# carry most of the meaning
+WORD_WEIGHT = 1.0
+BIGRAM_WEIGHT = 0.8
+CHAR_WEIGHT = 0.35
+
+
+@lru_cache(maxsize=65536)
+def _bucket(feature: str, dim: int):
+    # crc32 is stable across processes, unlike hash() on str
+    h = zlib.crc32(feature.encode("utf-8"))
+    return h % dim, 1.0 if (h >> 31) & 1 else -1.0
+
+
+class HashedNgramEmbedder:
+    """
+    Maps text to a fixed-size unit vector without a model or network
+    
+    Word unigrams, word bigrams and character n-grams of each word are
+    hashed into `dim` buckets with a random sign (the hashing trick), so
+    similar wording gives a high cosine similarity. Useful wherever a
+    rough semantic match is enough and latency matters more than quality.
+    """
+    
+    def __init__(self, dim: int = 1024, char_ngrams: tuple = (3, 4)):
+        """
+        Args:
+            dim: Embedding size
+            char_ngrams: Character n-gram lengths taken from each word
+        """
+        self.dim = dim
+        self.char_ngrams = char_ngrams
+    
+    def features(self, text: str) -> List[tuple]:
+        """
+        Extract weighted features from text
+        
+        Args:
+            text: Input text
+        
+        Returns:
+            (feature, weight) pairs
+        """
+        words = _WORD.findall(text.lower())
+        features = [(f"w:{word}", WORD_WEIGHT) for word in words]
+        features.extend(
+            (f"b:{first} {second}", BIGRAM_WEIGHT)
+            for first, second in zip(words, words[1:])
+        )
+        for word in words:
+            padded = f"<{word}>"
+            for n in self.char_ngrams:
+                features.extend(
+                    (f"c:{padded[i:i + n]}", CHAR_WEIGHT)
+                    for i in range(len(padded) - n + 1)
+                )
+        return features
+    
+    def embed(self, text: str) -> np.ndarray:
+        """
+        Embed one text
+        
+        Args:
+            text: Input text
+        
+        Returns:
+            L2-normalised float32 vector (all zeros for empty text)
+        """
+        features = self.features(text)
+        if not features:
+            return np.zeros(self.dim, dtype=np.float32)
+        
+        indices = np.empty(len(features), dtype=np.int64)
+        weights = np.empty(len(features), dtype=np.float64)
+        for i, (feature, weight) in enumerate(features):
+            index, sign = _bucket(feature, self.dim)
+            indices[i] = index
+            weights[i] = sign * weight
+        
+        vector = np.bincount(indices, weights=weights, minlength=self.dim).astype(np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    
+    def embed_many(self, texts: Iterable[str]) -> np.ndarray:
+        """
+        Embed several texts
+        
+        Args:
+            texts: Input texts
+        
+        Returns:
+            (len(texts), dim) matrix of unit rows
+        """
+        rows = [self.embed(text) for text in texts]
+        if not rows:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.vstack(rows)
@@ -0,0 +1,139 @@
+"""
+Keyword Matcher - Single-pass multi-keyword search with categories and priorities
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Set
+
+
+class KeywordMatch:
+    """One keyword occurrence in a scanned text"""
+    
+    __slots__ = ("category", "keyword", "start", "end", "priority")
+    
+    def __init__(self, category: str, keyword: str, start: int, end: int, priority: int):
+        self.category = category
+        self.keyword = keyword
+        self.start = start
+        self.end = end
+        self.priority = priority
+    
+    def __repr__(self) -> str:
+        return f"KeywordMatch({self.category!r}, {self.keyword!r}, {self.start}, {self.end})"
+
+
+_END = ""
+
+
+class KeywordMatcher:
+    """
+    Finds every occurrence of many keywords in one pass over the text
+    
+    Keywords are compiled once into a trie and, from it, a single regular
+    expression whose alternation branches on one character at a time, so
+    the scan runs inside the C regex engine instead of one substring
+    search per keyword. Matching is case-insensitive substring matching,
+    the same as `keyword in text.lower()`.
+    
+    Categories are given in priority order: the first category has
+    priority 0 and wins ties in `best`.
+    """
+    
+    def __init__(self, categories: Dict[str, Iterable[str]]):
+        """
+        Args:
+            categories: Keywords by category, highest priority first
+        """
+        self.priorities = {category: i for i, category in enumerate(categories)}
+        self._trie: dict = {}
+        self._max_length = 0
+        
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                keyword = keyword.lower()
+                node = self._trie
+                for ch in keyword:
+                    node = node.setdefault(ch, {})
+                node.setdefault(_END, []).append(category)
+                self._max_length = max(self._max_length, len(keyword))
+        
+        self._pattern = re.compile(self._trie_pattern(self._trie) or r"(?!)")
+    
+    @classmethod
+    def _trie_pattern(cls, node: dict) -> str:
+        """Regex matching the keywords below node, longest first"""
+        branches = [
+            re.escape(ch) + cls._trie_pattern(child)
+            for ch, child in sorted(node.items())
+            if ch != _END
+        ]
+        if not branches:
+            return ""
+        if len(branches) == 1 and _END not in node:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if _END in node else group
+    
+    def _walk(self, text: str, start: int, matches: List[KeywordMatch]) -> None:
+        """Record every keyword starting at `start`"""
+        node = self._trie
+        for end in range(start, min(len(text), start + self._max_length)):
+            node = node.get(text[end])
+            if node is None:
+                return
+            for category in node.get(_END, ()):
+                matches.append(KeywordMatch(
+                    category, text[start:end + 1], start, end + 1, self.priorities[category]
+                ))
+    
+    def scan(self, text: str) -> List[KeywordMatch]:
+        """
+        Find all keyword occurrences, including overlapping ones
+        
+        Args:
+            text: Text to search
+        
+        Returns:
+            Matches ordered by start position, then length; positions
+            index into text.lower()
+        """
+        text = text.lower()
+        matches: List[KeywordMatch] = []
+        # The regex jumps to each region where some keyword matches; keywords
+        # that start inside that region (overlaps) are picked up by the walk
+        for match in self._pattern.finditer(text):
+            for start in range(match.start(), match.end()):
+                self._walk(text, start, matches)
+        return matches
+    
+    def categories(self, text: str) -> Set[str]:
+        """
+        Categories with at least one keyword in text
+        
+        Args:
+            text: Text to search
+        
+        Returns:
+            Set of category names
+        """
+        return {match.category for match in self.scan(text)}
+    
+    def best(self, text: str, categories: Optional[Iterable[str]] = None) -> Optional[str]:
+        """
+        Highest-priority category found in text
+        
+        Args:
+            text: Text to search
+            categories: Only consider these categories
+        
+        Returns:
+            Category name, or None if no keyword matched
+        """
+        allowed = set(categories) if categories is not None else None
+        found = [
+            match for match in self.scan(text)
+            if allowed is None or match.category in allowed
+        ]
+        if not found:
+            return None
+        return min(found, key=lambda match: match.priority).category
@@ -0,0 +1,669 @@
+"""
+LLM Router - Latency, error and cost aware routing across LLM providers
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from core.llm_service import LLMService, Message
+from core.request_scheduler import Priority
+from core.response_cache import ResponseCache, make_cache_key
+
+
+class ProviderStats:
+    """
+    Rolling health and latency statistics for one provider
+    
+    Consecutive failures open a circuit breaker that keeps the provider
+    out of rotation for `cooldown` seconds; the next request after the
+    cooldown acts as a probe.
+    """
+    
+    def __init__(
+        self,
+        window: int = 50,
+        alpha: float = 0.2,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0
+    ):
+        """
+        Args:
+            window: Number of recent latencies kept for percentiles
+            alpha: Smoothing factor for the latency and error-rate averages
+            failure_threshold: Consecutive failures that open the circuit
+            cooldown: Seconds an open circuit stays open
+        """
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.latencies = deque(maxlen=window)
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self._lock = threading.Lock()
+    
+    def record_success(self, latency: float) -> None:
+        """Record a completed request and its latency in seconds"""
+        with self._lock:
+            self.requests += 1
+            self.latencies.append(latency)
+            if self.latency is None:
+                self.latency = latency
+            else:
+                self.latency += self.alpha * (latency - self.latency)
+            self.error_rate *= 1 - self.alpha
+            self.consecutive_failures = 0
+            self.open_until = 0.0
+    
+    def record_failure(self) -> None:
+        """Record a failed request, opening the circuit if failures persist"""
+        with self._lock:
+            self.requests += 1
+            self.failures += 1
+            self.error_rate += self.alpha * (1 - self.error_rate)
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= self.failure_threshold:
+                self.open_until = time.monotonic() + self.cooldown
+    
+    @property
+    def available(self) -> bool:
+        """False while the circuit breaker is open"""
+        return time.monotonic() >= self.open_until
+    
+    def percentile(self, fraction: float, min_samples: int = 5) -> Optional[float]:
+        """
+        Latency percentile over the recent window
+        
+        Args:
+            fraction: Percentile as a fraction, e.g. 0.95
+            min_samples: Samples needed before a value is reported
+        
+        Returns:
+            Latency in seconds, or None with too few samples
+        """
+        with self._lock:
+            samples = sorted(self.latencies)
+        if len(samples) < min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "error_rate": round(self.error_rate, 3),
+            "latency": round(self.latency, 3) if self.latency is not None else None,
+            "p95": self.percentile(0.95),
+            "available": self.available
+        }
+
+
+class LLMRouter:
+    """
+    Routes each request to the best of several LLM services
+    
+    Features:
+    - Ranking by smoothed latency, error rate and configured cost
+    - Failover to the next provider when a call fails
+    - Circuit breaker that skips providers that keep failing
+    - Hedged interactive requests: a second provider is started when the
+      first has not answered within its p95 latency; the first answer wins
+    
+    Exposes the same generate/agenerate/stream/astream interface as
+    LLMService, so agents can use either.
+    """
+    
+    def __init__(
+        self,
+        services: List[LLMService],
+        costs: Optional[Dict[str, float]] = None,
+        cache: Optional[ResponseCache] = None,
+        hedge: bool = True,
+        hedge_percentile: float = 0.95,
+        cost_weight: float = 1.0,
+        error_weight: float = 4.0,
+        default_latency: float = 2.0,
+        max_workers: int = 8
+    ):
+        """
+        Args:
+            services: One LLMService per provider, in order of preference
+            costs: Price per 1K output tokens (USD) by provider name
+            cache: Optional response cache checked before routing
+            hedge: Hedge interactive requests across providers
+            hedge_percentile: Latency percentile after which to hedge
+            cost_weight: Seconds of latency one USD per 1K tokens is worth
+            error_weight: Latency multiplier per unit of error rate
+            default_latency: Assumed latency for providers not yet measured
+            max_workers: Threads used for hedged synchronous requests
+        """
+        if not services:
+            raise ValueError("LLMRouter needs at least one LLM service")
+        
+        self.services = list(services)
+        self.costs = costs or {}
+        self.cache = cache
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.cost_weight = cost_weight
+        self.error_weight = error_weight
+        self.default_latency = default_latency
+        self.max_workers = max_workers
+        self.stats: Dict[str, ProviderStats] = {
+            self._name(service): ProviderStats() for service in self.services
+        }
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+    
+    @staticmethod
+    def _provider_name(service: LLMService) -> str:
+        # Accept LLMProvider members as well as plain strings
+        return getattr(service.provider, "value", service.provider)
+    
+    @classmethod
+    def _name(cls, service: LLMService) -> str:
+        return f"{cls._provider_name(service)}:{service.model}"
+    
+    @property
+    def provider(self) -> str:
+        """Provider of the preferred service"""
+        return self.services[0].provider
+    
+    @property
+    def model(self) -> str:
+        """Model of the preferred service"""
+        return self.services[0].model
+    
+    def _score(self, service: LLMService) -> float:
+        """Expected cost of a request in seconds; lower is better"""
+        stats = self.stats[self._name(service)]
+        latency = stats.latency if stats.latency is not None else self.default_latency
+        cost = self.costs.get(self._provider_name(service), 0.0)
+        return latency * (1 + self.error_weight * stats.error_rate) + self.cost_weight * cost
+    
+    def ranked(self) -> List[LLMService]:
+        """
+        Services in the order they should be tried
+        
+        Returns:
+            Available services by score, followed by services whose
+            circuit is open (tried only if every other provider fails)
+        """
+        order = sorted(
+            range(len(self.services)),
+            key=lambda i: (self._score(self.services[i]), i)
+        )
+        services = [self.services[i] for i in order]
+        available = [s for s in services if self.stats[self._name(s)].available]
+        return available + [s for s in services if s not in available]
+    
+    def _hedge_delay(self, service: LLMService, priority: int) -> Optional[float]:
+        """Seconds to wait before hedging, or None to not hedge"""
+        if not self.hedge or priority != Priority.INTERACTIVE or len(self.services) < 2:
+            return None
+        return self.stats[self._name(service)].percentile(self.hedge_percentile)
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="llm-hedge"
+                )
+            return self._executor
+    
+    def _cache_key(
+        self,
+        messages: List[Message],
+        system_prompt: Optional[str],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        use_cache: bool,
+        **kwargs
+    ) -> Optional[str]:
+        """Cache key shared by all providers, or None when caching is off"""
+        if self.cache is None or not use_cache:
+            return None
+        preferred = self.services[0]
+        return make_cache_key(
+            "router",
+            ",".join(self.stats),
+            system_prompt,
+            messages,
+            temperature if temperature is not None else preferred.temperature,
+            max_tokens if max_tokens is not None else preferred.max_tokens,
+            **kwargs
+        )
+    
+    def _timed(self, service: LLMService, fn: Callable[[], Any]) -> Any:
+        """Run fn against service, recording its latency or failure"""
+        stats = self.stats[self._name(service)]
+        start = time.monotonic()
+        try:
+            result = fn()
+        except Exception:
+            stats.record_failure()
+            raise
+        stats.record_success(time.monotonic() - start)
+        return result
+    
+    async def _atimed(self, service: LLMService, fn: Callable[[], Any]) -> Any:
+        stats = self.stats[self._name(service)]
+        start = time.monotonic()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            # A cancelled hedge says nothing about the provider's health
+            raise
+        except Exception:
+            stats.record_failure()
+            raise
+        stats.record_success(time.monotonic() - start)
+        return result
+    
+    def generate(
+        self,
+        messages: List[Message],
+        system_prompt: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        use_cache: bool = True,
+        priority: int = Priority.INTERACTIVE,
+        **kwargs
+    ) -> str:
+        """
+        Generate a response from the best available provider
+        
+        Args:
+            messages: List of conversation messages
+            system_prompt: Optional system prompt
+            temperature: Override default temperature
+            max_tokens: Override default max tokens
+            use_cache: Set to False to bypass the response cache for this call
+            priority: Scheduling priority; only interactive calls are hedged
+        
+        Returns:
+            Generated text response
+        
+        Raises:
+            Exception: The last provider error if every provider fails
+        """
+        cache_key = self._cache_key(messages, system_prompt, temperature, max_tokens, use_cache, **kwargs)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        def request(service: LLMService) -> Callable[[], str]:
+            return lambda: service.generate(
+                messages,
+                system_prompt=system_prompt,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                use_cache=False,
+                priority=priority,
+                **kwargs
+            )
+        
+        candidates = self.ranked()
+        hedge_after = self._hedge_delay(candidates[0], priority)
+        if hedge_after is None:
+            response = self._failover(candidates, request)
+        else:
+            response = self._hedged(candidates, request, hedge_after)
+        
+        if cache_key is not None and response:
+            self.cache.set(cache_key, response)
+        return response
+    
+    def _failover(self, candidates: List[LLMService], request) -> str:
+        """Try candidates one at a time in the caller's thread"""
+        last_error = None
+        for service in candidates:
+            try:
+                return self._timed(service, request(service))
+            except Exception as e:
+                last_error = e
+        raise last_error
+    
+    def _hedged(self, candidates: List[LLMService], request, hedge_after: float) -> str:
+        """Race a second candidate against a slow first one, failing over on errors"""
+        executor = self._get_executor()
+        remaining = iter(candidates)
+        pending = set()
+        hedged = False
+        last_error = None
+        
+        def launch() -> bool:
+            service = next(remaining, None)
+            if service is None:
+                return False
+            pending.add(executor.submit(self._timed, service, request(service)))
+            return True
+        
+        launch()
+        while pending:
+            done, _ = wait(
+                pending,
+                timeout=None if hedged else hedge_after,
+                return_when=FIRST_COMPLETED
+            )
+            if not done:
+                # Slower than usual: start the hedge, keep waiting on both
+                hedged = True
+                launch()
+                continue
+            
+            for future in done:
+                pending.discard(future)
+                try:
+                    # Losing requests finish in the background; their
+                    # latency still feeds the provider statistics
+                    return future.result()
+                except Exception as e:
+                    last_error = e
+            if not pending:
+                launch()
+        raise last_error
+    
+    async def agenerate(
+        self,
+        messages: List[Message],
+        system_prompt: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        use_cache: bool = True,
+        request_timeout: Optional[float] = None,
+        priority: int = Priority.INTERACTIVE,
+        **kwargs
+    ) -> str:
+        """
+        Async version of generate; a losing hedge is cancelled
+        
+        Args:
+            messages: List of conversation messages
+            system_prompt: Optional system prompt
+            temperature: Override default temperature
+            max_tokens: Override default max tokens
+            use_cache: Set to False to bypass the response cache for this call
+            request_timeout: Per-provider timeout in seconds
+            priority: Scheduling priority; only interactive calls are hedged
+        
+        Returns:
+            Generated text response
+        """
+        cache_key = self._cache_key(messages, system_prompt, temperature, max_tokens, use_cache, **kwargs)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        def request(service: LLMService):
+            return lambda: service.agenerate(
+                messages,
+                system_prompt=system_prompt,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                use_cache=False,
+                request_timeout=request_timeout,
+                priority=priority,
+                **kwargs
+            )
+        
+        candidates = self.ranked()
+        hedge_after = self._hedge_delay(candidates[0], priority)
+        remaining = iter(candidates)
+        pending = set()
+        hedged = hedge_after is None
+        last_error = None
+        
+        def launch() -> bool:
+            service = next(remaining, None)
+            if service is None:
+                return False
+            pending.add(asyncio.ensure_future(self._atimed(service, request(service))))
+            return True
+        
+        launch()
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=None if hedged else hedge_after,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    hedged = True
+                    launch()
+                    continue
+                
+                for task in done:
+                    pending.discard(task)
+                    if task.exception() is None:
+                        response = task.result()
+                        if cache_key is not None and response:
+                            self.cache.set(cache_key, response)
+                        return response
+                    last_error = task.exception()
+                if not pending:
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+        raise last_error
+    
+    def stream(
+        self,
+        messages: List[Message],
+        system_prompt: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        use_cache: bool = True,
+        priority: int = Priority.INTERACTIVE,
+        **kwargs
+    ) -> Iterator[str]:
+        """
+        Stream a response, failing over until a provider produces output
+        
+        Once the first chunk has been yielded the stream is committed to
+        that provider; streams are not hedged.
+        
+        Args:
+            messages: List of conversation messages
+            system_prompt: Optional system prompt
+            temperature: Override default temperature
+            max_tokens: Override default max tokens
+            use_cache: Set to False to bypass the response cache for this call
+            priority: Scheduling priority (interactive chat before background jobs)
+        
+        Yields:
+            Text chunks in the order the provider produces them
+        """
+        cache_key = self._cache_key(messages, system_prompt, temperature, max_tokens, use_cache, **kwargs)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+        
+        last_error = None
+        for service in self.ranked():
+            stats = self.stats[self._name(service)]
+            start = time.monotonic()
+            chunks = service.stream(
+                messages,
+                system_prompt=system_prompt,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                use_cache=False,
+                priority=priority,
+                **kwargs
+            )
+            try:
+                first = next(chunks, None)
+            except Exception as e:
+                stats.record_failure()
+                last_error = e
+                continue
+            
+            parts = []
+            try:
+                if first is not None:
+                    parts.append(first)
+                    yield first
+                    for chunk in chunks:
+                        parts.append(chunk)
+                        yield chunk
+            except Exception:
+                stats.record_failure()
+                raise
+            stats.record_success(time.monotonic() - start)
+            
+            if cache_key is not None and parts:
+                self.cache.set(cache_key, "".join(parts))
+            return
+        raise last_error
+    
+    async def astream(
+        self,
+        messages: List[Message],
+        system_prompt: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        use_cache: bool = True,
+        priority: int = Priority.INTERACTIVE,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Async version of stream
+        
+        Args:
+            messages: List of conversation messages
+            system_prompt: Optional system prompt
+            temperature: Override default temperature
+            max_tokens: Override default max tokens
+            use_cache: Set to False to bypass the response cache for this call
+            priority: Scheduling priority (interactive chat before background jobs)
+        
+        Yields:
+            Text chunks in the order the provider produces them
+        """
+        cache_key = self._cache_key(messages, system_prompt, temperature, max_tokens, use_cache, **kwargs)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+        
+        last_error = None
+        for service in self.ranked():
+            stats = self.stats[self._name(service)]
+            start = time.monotonic()
+            chunks = service.astream(
+                messages,
+                system_prompt=system_prompt,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                use_cache=False,
+                priority=priority,
+                **kwargs
+            )
+            try:
+                first = await chunks.__anext__()
+            except StopAsyncIteration:
+                first = None
+            except Exception as e:
+                stats.record_failure()
+                last_error = e
+                continue
+            
+            parts = []
+            try:
+                if first is not None:
+                    parts.append(first)
+                    yield first
+                    async for chunk in chunks:
+                        parts.append(chunk)
+                        yield chunk
+            except Exception:
+                stats.record_failure()
+                raise
+            stats.record_success(time.monotonic() - start)
+            
+            if cache_key is not None and parts:
+                self.cache.set(cache_key, "".join(parts))
+            return
+        raise last_error
+    
+    def count_tokens(self, text: str) -> int:
+        """Estimate token count with the preferred provider's counter"""
+        return self.services[0].count_tokens(text)
+    
+    def count_tokens_many(self, texts: List[str]) -> List[int]:
+        """Estimate token counts with the preferred provider's counter"""
+        return self.services[0].count_tokens_many(texts)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: stats.to_dict() for name, stats in self.stats.items()}
+
+
+def _env_costs() -> Dict[str, float]:
+    """Parse LLM_PROVIDER_COSTS, e.g. "gemini=0.0003,openai=0.03" """
+    costs = {}
+    for item in os.getenv("LLM_PROVIDER_COSTS", "").split(","):
+        name, _, value = item.partition("=")
+        if value:
+            costs[name.strip()] = float(value)
+    return costs
+
+
+def create_llm_router(
+    providers: Optional[List[str]] = None,
+    models: Optional[Dict[str, str]] = None,
+    costs: Optional[Dict[str, float]] = None,
+    cache: Optional[ResponseCache] = None,
+    **kwargs
+) -> LLMRouter:
+    """
+    Create a router over several providers
+    
+    Args:
+        providers: Provider names in order of preference; defaults to
+            LLM_PROVIDER followed by LLM_FALLBACK_PROVIDERS
+        models: Model name by provider; the first provider also honours
+            MODEL_NAME, the others use LLMService.DEFAULT_MODELS
+        costs: Price per 1K output tokens by provider; defaults to
+            LLM_PROVIDER_COSTS
+        cache: Optional response cache shared by all providers
+        **kwargs: Passed to each LLMService
+    
+    Returns:
+        LLMRouter instance
+    """
+    if providers is None:
+        fallbacks = os.getenv("LLM_FALLBACK_PROVIDERS", "")
+        providers = [os.getenv("LLM_PROVIDER", "gemini")]
+        providers += [p.strip() for p in fallbacks.split(",") if p.strip() and p.strip() not in providers]
+    models = models or {}
+    
+    services = []
+    for i, provider in enumerate(providers):
+        model = models.get(provider)
+        if model is None and i > 0:
+            # MODEL_NAME names the primary provider's model only
+            model = LLMService.DEFAULT_MODELS.get(provider)
+        services.append(LLMService(provider=provider, model=model, **kwargs))
+    
+    return LLMRouter(
+        services,
+        costs=costs if costs is not None else _env_costs(),
+        cache=cache
+    )
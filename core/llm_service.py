@@ -2,11 +2,16 @@
 LLM Service - Unified interface for OpenAI, Anthropic, and Google Gemini
 """
 
+import asyncio
 import os
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator, AsyncIterator
 from enum import Enum
 from pydantic import BaseModel
 from dotenv import load_dotenv
+from core.client_registry import ClientRegistry, default_pool_size, get_client_registry
+from core.request_scheduler import Priority, RequestScheduler, get_scheduler
+from core.response_cache import ResponseCache, make_cache_key
+from core.token_counter import TokenCounter
 
 load_dotenv()
 
@@ -18,42 +23,88 @@ class LLMProvider(str, Enum):
 
 
 class Message(BaseModel):
+    """
+    Chat message for LLM requests
+    
+    LLMService only reads role and content, so lightweight records such
+    as core.memory.MessageRecord are accepted as well.
+    """
     role: str
     content: str
 
 
+class SystemPrompt(str):
+    """
+    System prompt split into a stable prefix and a volatile suffix
+    
+    Behaves as the full prompt text everywhere a str is expected. The
+    prefix is what prompt caching can reuse across requests: Anthropic
+    requests mark it with cache_control once it is long enough to be
+    cached, and OpenAI's automatic prefix caching picks it up because it
+    always leads the system message.
+    """
+    
+    def __new__(cls, prefix: str, suffix: str = ""):
+        prompt = super().__new__(cls, prefix + suffix)
+        prompt.prefix = prefix
+        prompt.suffix = suffix
+        return prompt
+    
+    def with_suffix(self, extra: str) -> "SystemPrompt":
+        """Return a copy with `extra` appended to the volatile part"""
+        return SystemPrompt(self.prefix, self.suffix + extra)
+
+
 class LLMService:
     """Unified LLM service supporting multiple providers"""
     
+    # Model used when neither `model` nor MODEL_NAME is set
+    DEFAULT_MODELS = {
+        LLMProvider.OPENAI: "gpt-4-turbo-preview",
+        LLMProvider.ANTHROPIC: "claude-3-sonnet-20240229",
+        LLMProvider.GEMINI: "gemini-2.5-flash",  # Free tier model
+    }
+    
     def __init__(
         self,
         provider: Optional[str] = None,
         model: Optional[str] = None,
         temperature: float = 0.7,
-        max_tokens: int = 2000
+        max_tokens: int = 2000,
+        cache: Optional[ResponseCache] = None,
+        request_timeout: Optional[float] = 60.0,
+        pool_size: Optional[int] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        clients: Optional[ClientRegistry] = None
     ):
         self.provider = provider or os.getenv("LLM_PROVIDER", "gemini")  # Default to FREE Gemini!
         self.temperature = temperature
         self.max_tokens = max_tokens
+        self.cache = cache
+        self.request_timeout = request_timeout
+        self.pool_size = pool_size or default_pool_size()
+        # Clients and their connection pools are shared by every session
+        self.clients = clients or get_client_registry()
         
         if self.provider == LLMProvider.OPENAI:
-            import openai
-            self.client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-            self.model = model or os.getenv("MODEL_NAME", "gpt-4-turbo-preview")
+            self.model = model or os.getenv("MODEL_NAME", self.DEFAULT_MODELS[LLMProvider.OPENAI])
         elif self.provider == LLMProvider.ANTHROPIC:
-            import anthropic
-            self.client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-            self.model = model or os.getenv("MODEL_NAME", "claude-3-sonnet-20240229")
+            self.model = model or os.getenv("MODEL_NAME", self.DEFAULT_MODELS[LLMProvider.ANTHROPIC])
         elif self.provider == LLMProvider.GEMINI:
-            import google.generativeai as genai
-            api_key = os.getenv("GOOGLE_API_KEY")
-            if not api_key:
+            if not os.getenv("GOOGLE_API_KEY"):
                 raise ValueError("GOOGLE_API_KEY not found. Get a free key at: https://makersuite.google.com/app/apikey")
-            genai.configure(api_key=api_key)
-            self.model = model or os.getenv("MODEL_NAME", "gemini-2.5-flash")  # Free tier model
-            self.client = genai.GenerativeModel(self.model)
+            self.model = model or os.getenv("MODEL_NAME", self.DEFAULT_MODELS[LLMProvider.GEMINI])
         else:
             raise ValueError(f"Unsupported LLM provider: {self.provider}")
+        
+        self.client = self.clients.get_client(self.provider, self.model, self.pool_size)
+        self.token_counter = TokenCounter(self.provider, self.model)
+        # Rate limits and retries are shared by every service for this model
+        self.scheduler = scheduler or get_scheduler(self.provider, self.model)
+        
+        # Anthropic prompt cache usage, in input tokens
+        self.prompt_cache_reads = 0
+        self.prompt_cache_writes = 0
     
     def generate(
         self,
@@ -61,6 +112,8 @@ class LLMService:
         system_prompt: Optional[str] = None,
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
+        use_cache: bool = True,
+        priority: int = Priority.INTERACTIVE,
         **kwargs
     ) -> str:
         """
@@ -71,6 +124,8 @@ class LLMService:
             system_prompt: Optional system prompt
             temperature: Override default temperature
             max_tokens: Override default max tokens
+            use_cache: Set to False to bypass the response cache for this call
+            priority: Scheduling priority (interactive chat before background jobs)
             
         Returns:
             Generated text response
@@ -78,22 +133,76 @@ class LLMService:
         temp = temperature if temperature is not None else self.temperature
         tokens = max_tokens if max_tokens is not None else self.max_tokens
         
+        cache_key = self._cache_key(messages, system_prompt, temp, tokens, use_cache, **kwargs)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        response = self.scheduler.call(
+            lambda: self._call_provider(messages, system_prompt, temp, tokens, **kwargs),
+            priority=priority,
+            tokens=self._estimate_input_tokens(messages, system_prompt)
+        )
+        self._charge_output(response)
+        
+        if cache_key is not None and response:
+            self.cache.set(cache_key, response)
+        
+        return response
+    
+    def _call_provider(
+        self,
+        messages: List[Message],
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        **kwargs
+    ) -> str:
+        """Make one synchronous request to the configured provider"""
         if self.provider == LLMProvider.OPENAI:
-            return self._generate_openai(messages, system_prompt, temp, tokens, **kwargs)
+            return self._generate_openai(messages, system_prompt, temperature, max_tokens, **kwargs)
         elif self.provider == LLMProvider.ANTHROPIC:
-            return self._generate_anthropic(messages, system_prompt, temp, tokens, **kwargs)
+            return self._generate_anthropic(messages, system_prompt, temperature, max_tokens, **kwargs)
         elif self.provider == LLMProvider.GEMINI:
-            return self._generate_gemini(messages, system_prompt, temp, tokens, **kwargs)
+            return self._generate_gemini(messages, system_prompt, temperature, max_tokens, **kwargs)
     
-    def _generate_openai(
+    def _estimate_input_tokens(self, messages: List[Message], system_prompt: Optional[str]) -> int:
+        """Input token estimate for the scheduler's token bucket (0 when unlimited)"""
+        if not self.scheduler.limits_tokens:
+            return 0
+        texts = [msg["content"] if isinstance(msg, dict) else msg.content for msg in messages]
+        if system_prompt:
+            texts.append(system_prompt)
+        return sum(self.count_tokens_many(texts))
+    
+    def _charge_output(self, response: str) -> None:
+        """Charge generated tokens to the scheduler's token bucket"""
+        if self.scheduler.limits_tokens and response:
+            self.scheduler.charge(self.count_tokens(response))
+    
+    def _cache_key(
         self,
         messages: List[Message],
         system_prompt: Optional[str],
         temperature: float,
         max_tokens: int,
+        use_cache: bool,
         **kwargs
-    ) -> str:
-        """Generate using OpenAI API"""
+    ) -> Optional[str]:
+        """Return the cache key for a request, or None when caching is off"""
+        if self.cache is None or not use_cache:
+            return None
+        return make_cache_key(
+            self.provider, self.model, system_prompt, messages, temperature, max_tokens, **kwargs
+        )
+    
+    def _format_openai_messages(
+        self,
+        messages: List[Message],
+        system_prompt: Optional[str]
+    ) -> List[Dict[str, str]]:
+        """Format messages for the OpenAI chat API"""
         formatted_messages = []
         
         if system_prompt:
@@ -103,51 +212,49 @@ class LLMService:
             {"role": msg.role, "content": msg.content}
             for msg in messages
         ])
-        
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=formatted_messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            **kwargs
-        )
-        
-        return response.choices[0].message.content
+        return formatted_messages
     
-    def _generate_anthropic(
-        self,
-        messages: List[Message],
-        system_prompt: Optional[str],
-        temperature: float,
-        max_tokens: int,
-        **kwargs
-    ) -> str:
-        """Generate using Anthropic API"""
-        formatted_messages = [
+    def _format_anthropic_messages(self, messages: List[Message]) -> List[Dict[str, str]]:
+        """Format messages for the Anthropic messages API"""
+        return [
             {"role": msg.role, "content": msg.content}
             for msg in messages
         ]
+    
+    @property
+    def min_cacheable_tokens(self) -> int:
+        """Shortest prefix Anthropic will cache for this model"""
+        return 2048 if "haiku" in self.model else 1024
+    
+    def _anthropic_system(self, system_prompt: Optional[str]):
+        """System parameter for Anthropic, caching the stable prefix when it qualifies"""
+        if not system_prompt:
+            return ""
+        if not isinstance(system_prompt, SystemPrompt):
+            return system_prompt
+        # Shorter prefixes are never cached; marking them only costs a write
+        if self.token_counter.count(system_prompt.prefix) < self.min_cacheable_tokens:
+            return str(system_prompt)
         
-        response = self.client.messages.create(
-            model=self.model,
-            max_tokens=max_tokens,
-            temperature=temperature,
-            system=system_prompt if system_prompt else "",
-            messages=formatted_messages,
-            **kwargs
-        )
-        
-        return response.content[0].text
+        blocks = [{"type": "text", "text": system_prompt.prefix, "cache_control": {"type": "ephemeral"}}]
+        if system_prompt.suffix:
+            blocks.append({"type": "text", "text": system_prompt.suffix})
+        return blocks
     
-    def _generate_gemini(
+    def _record_cache_usage(self, usage) -> None:
+        """Add an Anthropic response's prompt cache reads and writes to the totals"""
+        self.prompt_cache_reads += getattr(usage, "cache_read_input_tokens", None) or 0
+        self.prompt_cache_writes += getattr(usage, "cache_creation_input_tokens", None) or 0
+    
+    def _prepare_gemini_chat(
         self,
         messages: List[Message],
         system_prompt: Optional[str],
         temperature: float,
         max_tokens: int,
-        **kwargs
-    ) -> str:
-        """Generate using Google Gemini API"""
+        client=None
+    ):
+        """Build (chat, final_message, generation_config) on client (default: the sync model)"""
         import google.generativeai as genai
         
         # Configure generation settings
@@ -173,7 +280,7 @@ class LLMService:
                 })
         
         # Start chat with history
-        chat = self.client.start_chat(history=chat_history)
+        chat = (client or self.client).start_chat(history=chat_history)
         
         # Prepare the final message
         final_message = messages[-1].content
@@ -182,6 +289,61 @@ class LLMService:
         if system_prompt:
             final_message = f"{system_prompt}\n\n{final_message}"
         
+        return chat, final_message, generation_config
+    
+    def _generate_openai(
+        self,
+        messages: List[Message],
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        **kwargs
+    ) -> str:
+        """Generate using OpenAI API"""
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=self._format_openai_messages(messages, system_prompt),
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **kwargs
+        )
+        
+        return response.choices[0].message.content
+    
+    def _generate_anthropic(
+        self,
+        messages: List[Message],
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        **kwargs
+    ) -> str:
+        """Generate using Anthropic API"""
+        response = self.client.messages.create(
+            model=self.model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            system=self._anthropic_system(system_prompt),
+            messages=self._format_anthropic_messages(messages),
+            **kwargs
+        )
+        
+        self._record_cache_usage(response.usage)
+        return response.content[0].text
+    
+    def _generate_gemini(
+        self,
+        messages: List[Message],
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        **kwargs
+    ) -> str:
+        """Generate using Google Gemini API"""
+        chat, final_message, generation_config = self._prepare_gemini_chat(
+            messages, system_prompt, temperature, max_tokens
+        )
+        
         # Generate response
         response = chat.send_message(
             final_message,
@@ -190,46 +352,437 @@ class LLMService:
         
         return response.text
     
+    def _get_async_client(self):
+        """
+        Get the shared native async client for the provider
+        
+        One client (and therefore one HTTP connection pool of `pool_size`
+        connections) per event loop is shared by every concurrent
+        agenerate call across all sessions.
+        """
+        return self.clients.get_async_client(self.provider, self.model, self.pool_size)
+    
     async def agenerate(
         self,
         messages: List[Message],
         system_prompt: Optional[str] = None,
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
+        use_cache: bool = True,
+        request_timeout: Optional[float] = None,
+        priority: int = Priority.INTERACTIVE,
+        **kwargs
+    ) -> str:
+        """
+        Generate a response without blocking the event loop
+        
+        Args:
+            messages: List of conversation messages
+            system_prompt: Optional system prompt
+            temperature: Override default temperature
+            max_tokens: Override default max tokens
+            use_cache: Set to False to bypass the response cache for this call
+            request_timeout: Seconds to wait, including retries, before
+                cancelling the request (defaults to the service's request_timeout)
+            priority: Scheduling priority (interactive chat before background jobs)
+            
+        Returns:
+            Generated text response
+            
+        Raises:
+            asyncio.TimeoutError: If the provider does not answer in time
+        """
+        temp = temperature if temperature is not None else self.temperature
+        tokens = max_tokens if max_tokens is not None else self.max_tokens
+        timeout = request_timeout if request_timeout is not None else self.request_timeout
+        
+        cache_key = self._cache_key(messages, system_prompt, temp, tokens, use_cache, **kwargs)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        call = self.scheduler.acall(
+            lambda: self._acall_provider(messages, system_prompt, temp, tokens, **kwargs),
+            priority=priority,
+            tokens=self._estimate_input_tokens(messages, system_prompt)
+        )
+        
+        # wait_for cancels the in-flight request (or queued wait) on timeout,
+        # and cancelling the caller's task propagates into the provider call
+        response = await asyncio.wait_for(call, timeout=timeout)
+        self._charge_output(response)
+        
+        if cache_key is not None and response:
+            self.cache.set(cache_key, response)
+        
+        return response
+    
+    def _acall_provider(
+        self,
+        messages: List[Message],
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        **kwargs
+    ):
+        """Build one async request coroutine for the configured provider"""
+        if self.provider == LLMProvider.OPENAI:
+            return self._agenerate_openai(messages, system_prompt, temperature, max_tokens, **kwargs)
+        elif self.provider == LLMProvider.ANTHROPIC:
+            return self._agenerate_anthropic(messages, system_prompt, temperature, max_tokens, **kwargs)
+        elif self.provider == LLMProvider.GEMINI:
+            return self._agenerate_gemini(messages, system_prompt, temperature, max_tokens, **kwargs)
+    
+    async def _agenerate_openai(
+        self,
+        messages: List[Message],
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int,
         **kwargs
     ) -> str:
-        """Async version of generate (placeholder for future implementation)"""
-        # For now, just call the sync version
-        # TODO: Implement true async calls
-        return self.generate(messages, system_prompt, temperature, max_tokens, **kwargs)
+        """Generate using the async OpenAI client"""
+        response = await self._get_async_client().chat.completions.create(
+            model=self.model,
+            messages=self._format_openai_messages(messages, system_prompt),
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **kwargs
+        )
+        
+        return response.choices[0].message.content
+    
+    async def _agenerate_anthropic(
+        self,
+        messages: List[Message],
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        **kwargs
+    ) -> str:
+        """Generate using the async Anthropic client"""
+        response = await self._get_async_client().messages.create(
+            model=self.model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            system=self._anthropic_system(system_prompt),
+            messages=self._format_anthropic_messages(messages),
+            **kwargs
+        )
+        
+        self._record_cache_usage(response.usage)
+        return response.content[0].text
+    
+    async def _agenerate_gemini(
+        self,
+        messages: List[Message],
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        **kwargs
+    ) -> str:
+        """Generate using Gemini's async chat API"""
+        chat, final_message, generation_config = self._prepare_gemini_chat(
+            messages, system_prompt, temperature, max_tokens, self._get_async_client()
+        )
+        
+        response = await chat.send_message_async(
+            final_message,
+            generation_config=generation_config
+        )
+        
+        return response.text
+    
+    def stream(
+        self,
+        messages: List[Message],
+        system_prompt: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        use_cache: bool = True,
+        priority: int = Priority.INTERACTIVE,
+        **kwargs
+    ) -> Iterator[str]:
+        """
+        Stream a response from the LLM as text chunks
+        
+        Args:
+            messages: List of conversation messages
+            system_prompt: Optional system prompt
+            temperature: Override default temperature
+            max_tokens: Override default max tokens
+            use_cache: Set to False to bypass the response cache for this call
+            priority: Scheduling priority (interactive chat before background jobs)
+            
+        Yields:
+            Text chunks in the order the provider produces them
+        """
+        temp = temperature if temperature is not None else self.temperature
+        tokens = max_tokens if max_tokens is not None else self.max_tokens
+        
+        cache_key = self._cache_key(messages, system_prompt, temp, tokens, use_cache, **kwargs)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+        
+        chunks = self.scheduler.stream(
+            lambda: self._open_stream(messages, system_prompt, temp, tokens, **kwargs),
+            priority=priority,
+            tokens=self._estimate_input_tokens(messages, system_prompt)
+        )
+        
+        parts = []
+        for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+        self._charge_output("".join(parts))
+        
+        # Only complete responses are cached
+        if cache_key is not None and parts:
+            self.cache.set(cache_key, "".join(parts))
+    
+    def _open_stream(
+        self,
+        messages: List[Message],
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        **kwargs
+    ) -> Iterator[str]:
+        """Open a chunk stream from the configured provider"""
+        if self.provider == LLMProvider.OPENAI:
+            return self._stream_openai(messages, system_prompt, temperature, max_tokens, **kwargs)
+        elif self.provider == LLMProvider.ANTHROPIC:
+            return self._stream_anthropic(messages, system_prompt, temperature, max_tokens, **kwargs)
+        elif self.provider == LLMProvider.GEMINI:
+            return self._stream_gemini(messages, system_prompt, temperature, max_tokens, **kwargs)
+    
+    def _stream_openai(
+        self,
+        messages: List[Message],
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        **kwargs
+    ) -> Iterator[str]:
+        """Stream using OpenAI API"""
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=self._format_openai_messages(messages, system_prompt),
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            **kwargs
+        )
+        
+        for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    
+    def _stream_anthropic(
+        self,
+        messages: List[Message],
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        **kwargs
+    ) -> Iterator[str]:
+        """Stream using Anthropic API"""
+        with self.client.messages.stream(
+            model=self.model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            system=self._anthropic_system(system_prompt),
+            messages=self._format_anthropic_messages(messages),
+            **kwargs
+        ) as response:
+            for text in response.text_stream:
+                yield text
+            self._record_cache_usage(response.get_final_message().usage)
+    
+    def _stream_gemini(
+        self,
+        messages: List[Message],
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        **kwargs
+    ) -> Iterator[str]:
+        """Stream using Google Gemini API"""
+        chat, final_message, generation_config = self._prepare_gemini_chat(
+            messages, system_prompt, temperature, max_tokens
+        )
+        
+        response = chat.send_message(
+            final_message,
+            generation_config=generation_config,
+            stream=True
+        )
+        
+        for chunk in response:
+            if chunk.text:
+                yield chunk.text
+    
+    async def astream(
+        self,
+        messages: List[Message],
+        system_prompt: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        use_cache: bool = True,
+        priority: int = Priority.INTERACTIVE,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Async version of stream using the native async clients
+        
+        Args:
+            messages: List of conversation messages
+            system_prompt: Optional system prompt
+            temperature: Override default temperature
+            max_tokens: Override default max tokens
+            use_cache: Set to False to bypass the response cache for this call
+            priority: Scheduling priority (interactive chat before background jobs)
+            
+        Yields:
+            Text chunks in the order the provider produces them
+        """
+        temp = temperature if temperature is not None else self.temperature
+        tokens = max_tokens if max_tokens is not None else self.max_tokens
+        
+        cache_key = self._cache_key(messages, system_prompt, temp, tokens, use_cache, **kwargs)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+        
+        chunks = self.scheduler.astream(
+            lambda: self._aopen_stream(messages, system_prompt, temp, tokens, **kwargs),
+            priority=priority,
+            tokens=self._estimate_input_tokens(messages, system_prompt)
+        )
+        
+        parts = []
+        async for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+        self._charge_output("".join(parts))
+        
+        if cache_key is not None and parts:
+            self.cache.set(cache_key, "".join(parts))
+    
+    def _aopen_stream(
+        self,
+        messages: List[Message],
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Open an async chunk stream from the configured provider"""
+        if self.provider == LLMProvider.OPENAI:
+            return self._astream_openai(messages, system_prompt, temperature, max_tokens, **kwargs)
+        elif self.provider == LLMProvider.ANTHROPIC:
+            return self._astream_anthropic(messages, system_prompt, temperature, max_tokens, **kwargs)
+        elif self.provider == LLMProvider.GEMINI:
+            return self._astream_gemini(messages, system_prompt, temperature, max_tokens, **kwargs)
+    
+    async def _astream_openai(
+        self,
+        messages: List[Message],
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Stream using the async OpenAI client"""
+        response = await self._get_async_client().chat.completions.create(
+            model=self.model,
+            messages=self._format_openai_messages(messages, system_prompt),
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            **kwargs
+        )
+        
+        async for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    
+    async def _astream_anthropic(
+        self,
+        messages: List[Message],
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Stream using the async Anthropic client"""
+        async with self._get_async_client().messages.stream(
+            model=self.model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            system=self._anthropic_system(system_prompt),
+            messages=self._format_anthropic_messages(messages),
+            **kwargs
+        ) as response:
+            async for text in response.text_stream:
+                yield text
+            self._record_cache_usage((await response.get_final_message()).usage)
+    
+    async def _astream_gemini(
+        self,
+        messages: List[Message],
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Stream using Gemini's async chat API"""
+        chat, final_message, generation_config = self._prepare_gemini_chat(
+            messages, system_prompt, temperature, max_tokens, self._get_async_client()
+        )
+        
+        response = await chat.send_message_async(
+            final_message,
+            generation_config=generation_config,
+            stream=True
+        )
+        
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
     
     def count_tokens(self, text: str) -> int:
         """
         Estimate token count for text
         
+        Counting is offline and memoized: tiktoken for OpenAI (when
+        installed), a local approximation for Gemini and Anthropic.
+        
         Args:
             text: Input text
             
         Returns:
             Estimated token count
         """
-        if self.provider == LLMProvider.OPENAI:
-            import tiktoken
-            try:
-                encoding = tiktoken.encoding_for_model(self.model)
-            except KeyError:
-                encoding = tiktoken.get_encoding("cl100k_base")
-            return len(encoding.encode(text))
-        elif self.provider == LLMProvider.GEMINI:
-            # Gemini has built-in token counting
-            try:
-                return self.client.count_tokens(text).total_tokens
-            except:
-                # Fallback estimate
-                return len(text) // 4
-        else:
-            # Rough estimate for Anthropic and others: ~4 chars per token
-            return len(text) // 4
+        return self.token_counter.count(text)
+    
+    def count_tokens_many(self, texts: List[str]) -> List[int]:
+        """
+        Estimate token counts for several texts in one call
+        
+        Args:
+            texts: Input texts
+            
+        Returns:
+            Token counts in input order
+        """
+        return self.token_counter.count_many(texts)
 
 
 # Convenience function
@@ -238,5 +791,11 @@ def create_llm_service(
     model: Optional[str] = None,
     **kwargs
 ) -> LLMService:
-    """Create and return an LLM service instance"""
+    """
+    Create and return an LLM service instance
+    
+    Services are cheap: the provider client, its keep-alive connection
+    pool and the rate-limit scheduler are process-wide and shared by
+    every service for the same provider.
+    """
     return LLMService(provider=provider, model=model, **kwargs)
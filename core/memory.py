@@ -2,10 +2,19 @@
 Memory Management - User context, learning history, and knowledge tracking
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence, Deque, TYPE_CHECKING
+from collections import deque, OrderedDict
+from itertools import islice
 from datetime import datetime
 from pydantic import BaseModel
+import asyncio
 import json
+import threading
+import time
+import weakref
+
+if TYPE_CHECKING:
+    from core.memory_store import MemoryStore
 
 
 class ConversationMessage(BaseModel):
@@ -21,6 +30,65 @@ class ConversationMessage(BaseModel):
         }
 
 
+class MessageRecord:
+    """
+    Lightweight conversation message used on the hot path
+    
+    Memory and BaseAgent keep these instead of ConversationMessage to skip
+    pydantic validation per message; to_model() builds the pydantic model
+    at serialization boundaries. token_count caches the content's token
+    count once an agent has measured it for context budgeting.
+    """
+    
+    __slots__ = ("role", "content", "timestamp", "agent_type", "token_count")
+    
+    def __init__(
+        self,
+        role: str,
+        content: str,
+        timestamp: Optional[datetime] = None,
+        agent_type: Optional[str] = None
+    ):
+        self.role = role
+        self.content = content
+        self.timestamp = timestamp if timestamp is not None else datetime.now()
+        self.agent_type = agent_type
+        self.token_count: Optional[int] = None
+    
+    @classmethod
+    def from_model(cls, message: ConversationMessage) -> "MessageRecord":
+        return cls(message.role, message.content, message.timestamp, message.agent_type)
+    
+    def to_model(self) -> ConversationMessage:
+        return ConversationMessage(
+            role=self.role,
+            content=self.content,
+            timestamp=self.timestamp,
+            agent_type=self.agent_type
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "role": self.role,
+            "content": self.content,
+            "timestamp": self.timestamp,
+            "agent_type": self.agent_type
+        }
+    
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, MessageRecord):
+            return NotImplemented
+        return (
+            self.role == other.role
+            and self.content == other.content
+            and self.timestamp == other.timestamp
+            and self.agent_type == other.agent_type
+        )
+    
+    def __repr__(self) -> str:
+        return f"MessageRecord(role={self.role!r}, content={self.content!r}, agent_type={self.agent_type!r})"
+
+
 class LearningMetric(BaseModel):
     """Track learning progress for a specific topic"""
     topic: str
@@ -54,6 +122,37 @@ class UserProfile(BaseModel):
         }
 
 
+class HistoryTail(Sequence):
+    """Read-only view over the last N entries of a deque"""
+    
+    __slots__ = ("_buffer", "_last_n")
+    
+    def __init__(self, buffer: Deque, last_n: int):
+        self._buffer = buffer
+        self._last_n = max(last_n, 0)
+    
+    def __len__(self) -> int:
+        return min(self._last_n, len(self._buffer))
+    
+    def __getitem__(self, index):
+        size = len(self)
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(size))]
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("history index out of range")
+        # deque indexing is cheap near the ends, where the tail lives
+        return self._buffer[len(self._buffer) - size + index]
+    
+    def __iter__(self):
+        # Copy the tail in one C-level pass, walking back from the newest
+        # entry, so a concurrent append cannot invalidate the iterator
+        tail = list(islice(reversed(self._buffer), len(self)))
+        tail.reverse()
+        return iter(tail)
+
+
 class Memory:
     """
     Memory management system for CodeMentor AI
@@ -63,14 +162,58 @@ class Memory:
     - User profiles
     - Learning metrics
     - Context retrieval
+    - Optional write-through persistence to a MemoryStore
+    
+    Methods are safe to call from several threads. Hold `lock` to make a
+    sequence of calls atomic.
     """
     
-    def __init__(self, max_history: int = 50):
+    def __init__(
+        self,
+        max_history: int = 50,
+        store: Optional["MemoryStore"] = None,
+        user_id: Optional[str] = None
+    ):
+        if store is not None and not user_id:
+            raise ValueError("user_id is required when a store is provided")
+        
         self.max_history = max_history
-        self.conversation_history: List[ConversationMessage] = []
+        # Fixed-capacity ring buffer: appends are O(1) and evict the oldest
+        self.conversation_history: Deque[MessageRecord] = deque(maxlen=max_history)
         self.user_profile: Optional[UserProfile] = None
         self.learning_metrics: Dict[str, LearningMetric] = {}
         self.session_start = datetime.now()
+        self.store = store
+        self.user_id = user_id
+        self.lock = threading.RLock()
+        
+        # Rolling summary of messages older than the recent window.
+        # message_count numbers every message ever added; the summary
+        # covers messages before summarized_through.
+        self.message_count = 0
+        self.summary = ""
+        self.summarized_through = 0
+    
+    def load_from_store(self) -> None:
+        """Restore the recent history, profile and metrics from the store"""
+        if self.store is None:
+            return
+        
+        history = deque(
+            self.store.load_messages(self.user_id, last_n=self.max_history),
+            maxlen=self.max_history
+        )
+        profile = self.store.load_profile(self.user_id)
+        metrics = self.store.load_metrics(self.user_id)
+        
+        with self.lock:
+            self.conversation_history = history
+            self.user_profile = profile
+            self.learning_metrics = metrics
+            # The summary is rebuilt from the restored history
+            self.message_count = len(history)
+            self.summary = ""
+            self.summarized_through = 0
     
     def add_message(
         self,
@@ -79,32 +222,92 @@ class Memory:
         agent_type: Optional[str] = None
     ) -> None:
         """Add a message to conversation history"""
-        message = ConversationMessage(
-            role=role,
-            content=content,
-            agent_type=agent_type
-        )
-        self.conversation_history.append(message)
-        
-        # Trim history if needed
-        if len(self.conversation_history) > self.max_history:
-            self.conversation_history = self.conversation_history[-self.max_history:]
+        message = MessageRecord(role, content, agent_type=agent_type)
+        with self.lock:
+            self.conversation_history.append(message)
+            self.message_count += 1
+            
+            if self.store is not None:
+                self.store.append_message(self.user_id, message)
     
     def get_conversation_history(
         self,
         last_n: Optional[int] = None
     ) -> List[ConversationMessage]:
-        """Get conversation history"""
+        """Get conversation history as pydantic models"""
         if last_n:
-            return self.conversation_history[-last_n:]
-        return self.conversation_history
+            return [msg.to_model() for msg in self.get_recent_messages(last_n)]
+        return [msg.to_model() for msg in list(self.conversation_history)]
+    
+    def get_recent_messages(self, last_n: int) -> Sequence[MessageRecord]:
+        """
+        Get a zero-copy view of the last N message records
+        
+        The view reads through to the ring buffer, so it reflects later
+        appends; copy it with list() if a snapshot is needed.
+        """
+        return HistoryTail(self.conversation_history, last_n)
+    
+    def snapshot(self) -> "Memory":
+        """
+        Detached copy of the session for work whose writes are merged later
+        
+        The copy has its own history buffer and no store, so messages it
+        records go nowhere until the caller copies them back. Profile and
+        metric objects are shared and must be treated as read-only.
+        """
+        with self.lock:
+            copy = Memory(max_history=self.max_history)
+            copy.conversation_history.extend(self.conversation_history)
+            copy.user_profile = self.user_profile
+            copy.learning_metrics = dict(self.learning_metrics)
+            copy.session_start = self.session_start
+            copy.user_id = self.user_id
+            copy.message_count = self.message_count
+            copy.summary = self.summary
+            copy.summarized_through = self.summarized_through
+        return copy
+    
+    def get_unsummarized(self, window: int) -> List[MessageRecord]:
+        """
+        Get messages that have left the recent window but are not yet summarized
+        
+        Args:
+            window: Number of newest messages kept verbatim
+        
+        Returns:
+            Messages in chronological order (ones already evicted from the
+            ring buffer are skipped)
+        """
+        with self.lock:
+            end = self.message_count - window
+            first_buffered = self.message_count - len(self.conversation_history)
+            start = max(self.summarized_through, first_buffered)
+            if end <= start:
+                return []
+            return list(islice(self.conversation_history, start - first_buffered, end - first_buffered))
+    
+    def set_summary(self, summary: str, summarized_through: int) -> None:
+        """
+        Replace the rolling summary
+        
+        Args:
+            summary: Summary of the conversation before summarized_through
+            summarized_through: Message number the summary covers up to
+        """
+        with self.lock:
+            # A fold that finishes after clear_conversation is stale
+            if summarized_through < self.summarized_through:
+                return
+            self.summary = summary
+            self.summarized_through = summarized_through
     
     def get_context_messages(
         self,
         last_n: int = 10
     ) -> List[Dict[str, str]]:
         """Get recent messages formatted for LLM context"""
-        recent = self.conversation_history[-last_n:]
+        recent = self.get_recent_messages(last_n)
         return [
             {"role": msg.role, "content": msg.content}
             for msg in recent
@@ -112,7 +315,11 @@ class Memory:
     
     def set_user_profile(self, profile: UserProfile) -> None:
         """Set or update user profile"""
-        self.user_profile = profile
+        with self.lock:
+            self.user_profile = profile
+            
+            if self.store is not None:
+                self.store.save_profile(self.user_id, profile)
     
     def get_user_profile(self) -> Optional[UserProfile]:
         """Get user profile"""
@@ -132,28 +339,34 @@ class Memory:
             success: Whether the practice was successful
             practice_time: Time spent practicing (seconds)
         """
-        if topic not in self.learning_metrics:
-            self.learning_metrics[topic] = LearningMetric(
-                topic=topic,
-                skill_level=0.0,
-                last_practiced=datetime.now()
-            )
-        
-        metric = self.learning_metrics[topic]
-        metric.practice_count += 1
-        metric.last_practiced = datetime.now()
-        
-        # Update success rate
-        current_success = metric.success_rate * (metric.practice_count - 1)
-        new_success = current_success + (1.0 if success else 0.0)
-        metric.success_rate = new_success / metric.practice_count
-        
-        # Update skill level based on success rate
-        # Simple linear model: skill level approaches success rate
-        metric.skill_level = 0.7 * metric.skill_level + 0.3 * metric.success_rate
-        
-        if self.user_profile:
-            self.user_profile.total_practice_time += practice_time
+        with self.lock:
+            if topic not in self.learning_metrics:
+                self.learning_metrics[topic] = LearningMetric(
+                    topic=topic,
+                    skill_level=0.0,
+                    last_practiced=datetime.now()
+                )
+            
+            metric = self.learning_metrics[topic]
+            metric.practice_count += 1
+            metric.last_practiced = datetime.now()
+            
+            # Update success rate
+            current_success = metric.success_rate * (metric.practice_count - 1)
+            new_success = current_success + (1.0 if success else 0.0)
+            metric.success_rate = new_success / metric.practice_count
+            
+            # Update skill level based on success rate
+            # Simple linear model: skill level approaches success rate
+            metric.skill_level = 0.7 * metric.skill_level + 0.3 * metric.success_rate
+            
+            if self.user_profile:
+                self.user_profile.total_practice_time += practice_time
+            
+            if self.store is not None:
+                self.store.upsert_metric(self.user_id, metric)
+                if self.user_profile and practice_time:
+                    self.store.save_profile(self.user_id, self.user_profile)
     
     def get_learning_metric(self, topic: str) -> Optional[LearningMetric]:
         """Get learning metrics for a specific topic"""
@@ -165,44 +378,56 @@ class Memory:
     
     def get_weak_topics(self, threshold: float = 0.5) -> List[str]:
         """Get topics where user needs more practice"""
-        return [
-            topic for topic, metric in self.learning_metrics.items()
-            if metric.skill_level < threshold
-        ]
+        with self.lock:
+            return [
+                topic for topic, metric in self.learning_metrics.items()
+                if metric.skill_level < threshold
+            ]
     
     def get_strong_topics(self, threshold: float = 0.8) -> List[str]:
         """Get topics where user is proficient"""
-        return [
-            topic for topic, metric in self.learning_metrics.items()
-            if metric.skill_level >= threshold
-        ]
+        with self.lock:
+            return [
+                topic for topic, metric in self.learning_metrics.items()
+                if metric.skill_level >= threshold
+            ]
     
     def clear_conversation(self) -> None:
         """Clear conversation history"""
-        self.conversation_history = []
+        with self.lock:
+            self.conversation_history.clear()
+            self.summary = ""
+            self.summarized_through = self.message_count
     
     def export_session(self) -> Dict[str, Any]:
         """Export current session data"""
-        return {
-            "session_start": self.session_start.isoformat(),
-            "conversation_count": len(self.conversation_history),
-            "user_profile": self.user_profile.dict() if self.user_profile else None,
-            "learning_metrics": {
-                topic: metric.dict()
-                for topic, metric in self.learning_metrics.items()
+        with self.lock:
+            return {
+                "session_start": self.session_start.isoformat(),
+                "conversation_count": len(self.conversation_history),
+                "user_profile": self.user_profile.dict() if self.user_profile else None,
+                "learning_metrics": {
+                    topic: metric.dict()
+                    for topic, metric in self.learning_metrics.items()
+                }
             }
-        }
     
     def save_to_json(self, filepath: str) -> None:
         """Save memory state to JSON file"""
-        data = {
-            "conversation_history": [msg.dict() for msg in self.conversation_history],
-            "user_profile": self.user_profile.dict() if self.user_profile else None,
-            "learning_metrics": {
-                topic: metric.dict()
-                for topic, metric in self.learning_metrics.items()
+        with self.lock:
+            data = {
+                "conversation_history": [msg.to_dict() for msg in self.conversation_history],
+                "summary": self.summary,
+                # Leading history entries the summary already covers
+                "summarized_in_history": max(
+                    0, self.summarized_through - (self.message_count - len(self.conversation_history))
+                ),
+                "user_profile": self.user_profile.dict() if self.user_profile else None,
+                "learning_metrics": {
+                    topic: metric.dict()
+                    for topic, metric in self.learning_metrics.items()
+                }
             }
-        }
         
         with open(filepath, 'w') as f:
             json.dump(data, f, indent=2, default=str)
@@ -213,39 +438,296 @@ class Memory:
             data = json.load(f)
         
         # Load conversation history
-        self.conversation_history = [
-            ConversationMessage(**msg)
-            for msg in data.get("conversation_history", [])
-        ]
-        
-        # Load user profile
-        if data.get("user_profile"):
-            self.user_profile = UserProfile(**data["user_profile"])
+        history = deque(
+            (
+                MessageRecord.from_model(ConversationMessage(**msg))
+                for msg in data.get("conversation_history", [])
+            ),
+            maxlen=self.max_history
+        )
         
         # Load learning metrics
-        self.learning_metrics = {
+        metrics = {
             topic: LearningMetric(**metric)
             for topic, metric in data.get("learning_metrics", {}).items()
         }
+        
+        with self.lock:
+            self.conversation_history = history
+            # Restored history is renumbered from zero
+            self.message_count = len(history)
+            self.summary = data.get("summary", "")
+            self.summarized_through = data.get("summarized_in_history", 0)
+            
+            # Load user profile
+            if data.get("user_profile"):
+                self.user_profile = UserProfile(**data["user_profile"])
+            
+            self.learning_metrics = metrics
 
 
-class MemoryManager:
-    """Global memory manager for multiple user sessions"""
+class SessionStats:
+    """Residency, eviction and rehydration counters for a MemoryManager"""
     
     def __init__(self):
-        self.sessions: Dict[str, Memory] = {}
+        self.resident = 0
+        self.evictions = 0
+        self.idle_evictions = 0
+        self.rehydrations = 0
+        self.rehydration_time = 0.0
+    
+    @property
+    def avg_rehydration_ms(self) -> float:
+        return 1000 * self.rehydration_time / self.rehydrations if self.rehydrations else 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "resident": self.resident,
+            "evictions": self.evictions,
+            "idle_evictions": self.idle_evictions,
+            "rehydrations": self.rehydrations,
+            "avg_rehydration_ms": self.avg_rehydration_ms
+        }
+
+
+class MemoryManager:
+    """
+    Global memory manager for multiple user sessions
+    
+    Sessions are kept in least-recently-used order. With max_sessions or
+    idle_timeout set, the oldest sessions are evicted; since Memory writes
+    through to the store, eviction only drops the in-process copy and the
+    next get_or_create_session rehydrates it from the store. Without a
+    store, evicted sessions are lost.
+    
+    A request may still hold an evicted session. While it does, the same
+    object is handed back instead of a rehydrated copy, so there is never
+    more than one live Memory per user writing to the store.
+    
+    All methods are thread-safe. For many concurrent workers use
+    ShardedMemoryManager so unrelated users do not share one lock.
+    """
+    
+    def __init__(
+        self,
+        store: Optional["MemoryStore"] = None,
+        max_sessions: Optional[int] = None,
+        idle_timeout: Optional[float] = None
+    ):
+        """
+        Args:
+            store: Persistent store sessions write through to
+            max_sessions: Maximum resident sessions (None for unbounded)
+            idle_timeout: Seconds without access before a session is evicted
+        """
+        self.sessions: "OrderedDict[str, Memory]" = OrderedDict()
+        self.store = store
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.stats = SessionStats()
+        self._last_access: Dict[str, float] = {}
+        # Evicted sessions that are still referenced somewhere
+        self._evicted: "weakref.WeakValueDictionary[str, Memory]" = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
     
     def get_or_create_session(self, user_id: str) -> Memory:
-        """Get existing session or create new one"""
-        if user_id not in self.sessions:
-            self.sessions[user_id] = Memory()
-        return self.sessions[user_id]
+        """Get existing session or create new one (restored from the store if any)"""
+        with self._lock:
+            now = time.monotonic()
+            memory = self.sessions.get(user_id)
+            if memory is None:
+                memory = self._evicted.pop(user_id, None)
+            if memory is not None:
+                self.sessions[user_id] = memory
+                self.sessions.move_to_end(user_id)
+            else:
+                memory = Memory(store=self.store, user_id=user_id)
+                if self.store is not None:
+                    start = time.perf_counter()
+                    memory.load_from_store()
+                    self.stats.rehydrations += 1
+                    self.stats.rehydration_time += time.perf_counter() - start
+                self.sessions[user_id] = memory
+            self._last_access[user_id] = now
+            
+            self._evict(now, keep=user_id)
+            return memory
+    
+    def get_session(self, user_id: str, blocking: bool = True) -> Optional[Memory]:
+        """
+        Get a resident session without creating or rehydrating it
+        
+        Args:
+            user_id: User ID
+            blocking: Wait for the manager lock; if False, return None when
+                another thread holds it (e.g. during a rehydration)
+        """
+        if not self._lock.acquire(blocking=blocking):
+            return None
+        try:
+            memory = self.sessions.get(user_id)
+            if memory is not None:
+                self.sessions.move_to_end(user_id)
+                self._last_access[user_id] = time.monotonic()
+            return memory
+        finally:
+            self._lock.release()
+    
+    def evict_idle(self) -> int:
+        """
+        Evict sessions idle for longer than idle_timeout
+        
+        Returns:
+            Number of sessions evicted
+        """
+        with self._lock:
+            before = self.stats.evictions
+            self._evict(time.monotonic())
+            return self.stats.evictions - before
+    
+    def _evict(self, now: float, keep: Optional[str] = None) -> None:
+        # Least recently used sessions are at the front
+        while self.sessions:
+            user_id = next(iter(self.sessions))
+            if user_id == keep:
+                break
+            
+            idle = self.idle_timeout is not None and now - self._last_access[user_id] > self.idle_timeout
+            over_capacity = self.max_sessions is not None and len(self.sessions) > self.max_sessions
+            if not (idle or over_capacity):
+                break
+            
+            if idle:
+                self.stats.idle_evictions += 1
+            self._spill(user_id)
+        self.stats.resident = len(self.sessions)
+    
+    def _spill(self, user_id: str) -> None:
+        memory = self.sessions.pop(user_id)
+        del self._last_access[user_id]
+        # Profiles can be edited in place, so persist the latest copy
+        if self.store is not None and memory.user_profile is not None:
+            self.store.save_profile(user_id, memory.user_profile)
+        self._evicted[user_id] = memory
+        self.stats.evictions += 1
     
     def end_session(self, user_id: str) -> Optional[Dict[str, Any]]:
         """End a user session and return summary"""
-        if user_id in self.sessions:
-            session = self.sessions[user_id]
-            summary = session.export_session()
-            del self.sessions[user_id]
-            return summary
-        return None
+        with self._lock:
+            self._evicted.pop(user_id, None)
+            if user_id in self.sessions:
+                session = self.sessions[user_id]
+                summary = session.export_session()
+                del self.sessions[user_id]
+                del self._last_access[user_id]
+                self.stats.resident = len(self.sessions)
+                return summary
+            return None
+
+
+class ShardedMemoryManager:
+    """
+    Lock-striped session manager for concurrent request handling
+    
+    Users are hashed onto independent MemoryManager shards, each with its
+    own lock, so workers serving different users rarely contend; a slow
+    rehydration only blocks its own shard. Per-user consistency comes from
+    each Memory's own lock.
+    """
+    
+    def __init__(
+        self,
+        store: Optional["MemoryStore"] = None,
+        max_sessions: Optional[int] = None,
+        idle_timeout: Optional[float] = None,
+        shards: int = 16
+    ):
+        """
+        Args:
+            store: Persistent store sessions write through to
+            max_sessions: Maximum resident sessions, split evenly across shards
+            idle_timeout: Seconds without access before a session is evicted
+            shards: Number of independently locked shards
+        """
+        per_shard = -(-max_sessions // shards) if max_sessions is not None else None
+        self.store = store
+        self.shards = [MemoryManager(store, per_shard, idle_timeout) for _ in range(shards)]
+    
+    def _shard(self, user_id: str) -> MemoryManager:
+        return self.shards[hash(user_id) % len(self.shards)]
+    
+    def get_or_create_session(self, user_id: str) -> Memory:
+        """Get existing session or create new one (restored from the store if any)"""
+        return self._shard(user_id).get_or_create_session(user_id)
+    
+    def get_session(self, user_id: str, blocking: bool = True) -> Optional[Memory]:
+        """Get a resident session without creating or rehydrating it"""
+        return self._shard(user_id).get_session(user_id, blocking)
+    
+    def end_session(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """End a user session and return summary"""
+        return self._shard(user_id).end_session(user_id)
+    
+    def evict_idle(self) -> int:
+        """Evict idle sessions from every shard and return how many were evicted"""
+        return sum(shard.evict_idle() for shard in self.shards)
+    
+    @property
+    def stats(self) -> SessionStats:
+        """Counters summed across shards"""
+        total = SessionStats()
+        for shard in self.shards:
+            total.resident += shard.stats.resident
+            total.evictions += shard.stats.evictions
+            total.idle_evictions += shard.stats.idle_evictions
+            total.rehydrations += shard.stats.rehydrations
+            total.rehydration_time += shard.stats.rehydration_time
+        return total
+    
+    def __len__(self) -> int:
+        return sum(len(shard.sessions) for shard in self.shards)
+
+
+class AsyncMemoryManager:
+    """
+    asyncio front end for ShardedMemoryManager
+    
+    Resident sessions are returned directly when their shard is free;
+    anything that has to wait for a shard lock (held during rehydration
+    from the store) runs in a worker thread, so the event loop never
+    blocks. Use
+    session_lock() to serialize a whole request for one user across
+    awaits (e.g. read history, await the LLM, record the reply).
+    """
+    
+    def __init__(self, manager: Optional[ShardedMemoryManager] = None, **kwargs):
+        """
+        Args:
+            manager: Manager to wrap (built from kwargs if omitted)
+            **kwargs: Arguments for ShardedMemoryManager
+        """
+        self.manager = manager or ShardedMemoryManager(**kwargs)
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+    
+    async def get_or_create_session(self, user_id: str) -> Memory:
+        """Get existing session or create new one (restored from the store if any)"""
+        memory = self.manager.get_session(user_id, blocking=False)
+        if memory is None:
+            memory = await asyncio.to_thread(self.manager.get_or_create_session, user_id)
+        return memory
+    
+    def session_lock(self, user_id: str) -> asyncio.Lock:
+        """Get the asyncio lock for a user (kept alive while anyone holds it)"""
+        lock = self._locks.get(user_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[user_id] = lock
+        return lock
+    
+    async def end_session(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """End a user session and return summary"""
+        return await asyncio.to_thread(self.manager.end_session, user_id)
+    
+    @property
+    def stats(self) -> SessionStats:
+        return self.manager.stats
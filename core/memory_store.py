@@ -0,0 +1,394 @@
+"""
+Memory Store - Persistent backends for Memory and MemoryManager
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import quote
+
+from core.memory import LearningMetric, MessageRecord, UserProfile
+
+
+class MemoryStore(ABC):
+    """
+    Base class for persistent memory backends
+    
+    Memory writes through to a store on every change, so implementations
+    should make each call an O(1) append or upsert.
+    """
+    
+    @abstractmethod
+    def append_message(self, user_id: str, message: MessageRecord) -> None:
+        """Append one message to a user's conversation history"""
+        pass
+    
+    @abstractmethod
+    def upsert_metric(self, user_id: str, metric: LearningMetric) -> None:
+        """Insert or update one learning metric"""
+        pass
+    
+    @abstractmethod
+    def save_profile(self, user_id: str, profile: UserProfile) -> None:
+        """Insert or update a user profile"""
+        pass
+    
+    @abstractmethod
+    def load_messages(self, user_id: str, last_n: Optional[int] = None) -> List[MessageRecord]:
+        """Load a user's messages in chronological order (optionally only the last N)"""
+        pass
+    
+    @abstractmethod
+    def load_metrics(self, user_id: str) -> Dict[str, LearningMetric]:
+        """Load all learning metrics for a user"""
+        pass
+    
+    @abstractmethod
+    def load_profile(self, user_id: str) -> Optional[UserProfile]:
+        """Load a user profile if one was saved"""
+        pass
+    
+    def close(self) -> None:
+        """Release any resources held by the store"""
+        pass
+
+
+class SQLiteMemoryStore(MemoryStore):
+    """
+    SQLite-backed memory store
+    
+    Features:
+    - WAL mode for concurrent readers alongside a writer
+    - Append-only message inserts
+    - Upserted metrics and profiles
+    - Indexed lookups by user_id and topic
+    """
+    
+    def __init__(self, path: str = "codementor_memory.sqlite3"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                agent_type TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_messages_user ON messages (user_id, id);
+            
+            CREATE TABLE IF NOT EXISTS learning_metrics (
+                user_id TEXT NOT NULL,
+                topic TEXT NOT NULL,
+                skill_level REAL NOT NULL,
+                last_practiced TEXT NOT NULL,
+                practice_count INTEGER NOT NULL,
+                success_rate REAL NOT NULL,
+                PRIMARY KEY (user_id, topic)
+            );
+            
+            CREATE TABLE IF NOT EXISTS user_profiles (
+                user_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+    
+    def append_message(self, user_id: str, message: MessageRecord) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO messages (user_id, role, content, timestamp, agent_type) VALUES (?, ?, ?, ?, ?)",
+                (user_id, message.role, message.content, message.timestamp.isoformat(), message.agent_type)
+            )
+            self._conn.commit()
+    
+    def upsert_metric(self, user_id: str, metric: LearningMetric) -> None:
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO learning_metrics
+                    (user_id, topic, skill_level, last_practiced, practice_count, success_rate)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(user_id, topic) DO UPDATE SET
+                    skill_level = excluded.skill_level,
+                    last_practiced = excluded.last_practiced,
+                    practice_count = excluded.practice_count,
+                    success_rate = excluded.success_rate""",
+                (
+                    user_id,
+                    metric.topic,
+                    metric.skill_level,
+                    metric.last_practiced.isoformat(),
+                    metric.practice_count,
+                    metric.success_rate
+                )
+            )
+            self._conn.commit()
+    
+    def save_profile(self, user_id: str, profile: UserProfile) -> None:
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO user_profiles (user_id, data) VALUES (?, ?)
+                ON CONFLICT(user_id) DO UPDATE SET data = excluded.data""",
+                (user_id, profile.model_dump_json())
+            )
+            self._conn.commit()
+    
+    def load_messages(self, user_id: str, last_n: Optional[int] = None) -> List[MessageRecord]:
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT role, content, timestamp, agent_type FROM messages
+                WHERE user_id = ?
+                ORDER BY id DESC
+                LIMIT ?""",
+                (user_id, last_n if last_n is not None else -1)
+            ).fetchall()
+        
+        return [
+            MessageRecord(role, content, datetime.fromisoformat(timestamp), agent_type)
+            for role, content, timestamp, agent_type in reversed(rows)
+        ]
+    
+    def load_metrics(self, user_id: str) -> Dict[str, LearningMetric]:
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT topic, skill_level, last_practiced, practice_count, success_rate
+                FROM learning_metrics WHERE user_id = ?""",
+                (user_id,)
+            ).fetchall()
+        
+        return {
+            topic: LearningMetric(
+                topic=topic,
+                skill_level=skill_level,
+                last_practiced=datetime.fromisoformat(last_practiced),
+                practice_count=practice_count,
+                success_rate=success_rate
+            )
+            for topic, skill_level, last_practiced, practice_count, success_rate in rows
+        }
+    
+    def load_profile(self, user_id: str) -> Optional[UserProfile]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM user_profiles WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        return UserProfile.model_validate_json(row[0]) if row else None
+    
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _read_tail_lines(path: str, last_n: int, block_size: int = 8192) -> List[bytes]:
+    """Read the last N lines of a file by scanning backwards from the end"""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        buffer = b""
+        # N complete lines need N + 1 newlines unless we reach the start
+        while position > 0 and buffer.count(b"\n") <= last_n:
+            size = min(block_size, position)
+            position -= size
+            f.seek(position)
+            buffer = f.read(size) + buffer
+    
+    lines = buffer.splitlines()
+    if position > 0:
+        lines = lines[1:]  # Partial line before the first newline read
+    return lines[-last_n:]
+
+
+class JournalMemoryStore(MemoryStore):
+    """
+    Append-only JSON Lines store with one journal per user
+    
+    Layout under `directory`:
+    - <user>.messages.jsonl: one line per message, appended; once it holds
+      `max_messages + compact_every` lines it is trimmed to the newest
+      `max_messages` (None keeps every message)
+    - <user>.state.jsonl: metric and profile deltas; once `compact_every`
+      deltas accumulate it is rewritten as a single snapshot line
+    
+    load_messages(last_n) reads the message journal backwards from the end,
+    so restoring a session only parses the lines it returns. A torn final
+    line (e.g. after a crash mid-write) is skipped.
+    """
+    
+    def __init__(
+        self,
+        directory: str = "codementor_journal",
+        compact_every: int = 200,
+        max_messages: Optional[int] = 1000
+    ):
+        self.directory = directory
+        self.compact_every = compact_every
+        self.max_messages = max_messages
+        self._lock = threading.Lock()
+        self._pending: Dict[str, int] = {}
+        self._message_lines: Dict[str, int] = {}
+        self._opened: set = set()
+        os.makedirs(directory, exist_ok=True)
+    
+    def _path(self, user_id: str, kind: str) -> str:
+        return os.path.join(self.directory, f"{quote(user_id, safe='')}.{kind}.jsonl")
+    
+    def _append(self, path: str, record: dict) -> None:
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with open(path, "a+b") as f:
+            if path not in self._opened:
+                # Terminate a torn line left by an earlier process so it
+                # cannot swallow this record
+                self._opened.add(path)
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        line = "\n" + line
+            f.write(line.encode("utf-8"))
+    
+    @staticmethod
+    def _parse(lines) -> List[dict]:
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+        return records
+    
+    def append_message(self, user_id: str, message: MessageRecord) -> None:
+        record = {
+            "role": message.role,
+            "content": message.content,
+            "timestamp": message.timestamp.isoformat(),
+            "agent_type": message.agent_type
+        }
+        with self._lock:
+            path = self._path(user_id, "messages")
+            if self.max_messages is None:
+                self._append(path, record)
+                return
+            
+            if user_id not in self._message_lines:
+                self._message_lines[user_id] = self._count_lines(path)
+            self._append(path, record)
+            
+            lines = self._message_lines[user_id] + 1
+            if lines >= self.max_messages + self.compact_every:
+                self._trim_messages(path)
+                lines = self.max_messages
+            self._message_lines[user_id] = lines
+    
+    def _trim_messages(self, path: str) -> None:
+        # Trimming in batches keeps the rewrite cost amortized O(1) per append
+        lines = _read_tail_lines(path, self.max_messages)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(b"".join(line + b"\n" for line in lines))
+        os.replace(tmp_path, path)
+    
+    def upsert_metric(self, user_id: str, metric: LearningMetric) -> None:
+        self._append_state(user_id, {"type": "metric", "data": metric.model_dump(mode="json")})
+    
+    def save_profile(self, user_id: str, profile: UserProfile) -> None:
+        self._append_state(user_id, {"type": "profile", "data": profile.model_dump(mode="json")})
+    
+    def _append_state(self, user_id: str, record: dict) -> None:
+        with self._lock:
+            path = self._path(user_id, "state")
+            if user_id not in self._pending:
+                self._pending[user_id] = self._count_lines(path)
+            self._append(path, record)
+            
+            pending = self._pending[user_id] + 1
+            if pending >= self.compact_every:
+                self._compact(user_id)
+                pending = 0
+            self._pending[user_id] = pending
+    
+    @staticmethod
+    def _count_lines(path: str) -> int:
+        if not os.path.exists(path):
+            return 0
+        with open(path, "rb") as f:
+            return sum(1 for _ in f)
+    
+    def _read_state(self, user_id: str) -> tuple:
+        path = self._path(user_id, "state")
+        profile = None
+        metrics: Dict[str, dict] = {}
+        if not os.path.exists(path):
+            return profile, metrics
+        
+        with open(path, "rb") as f:
+            records = self._parse(f)
+        
+        # Replay the snapshot and every later delta in order
+        for record in records:
+            if record["type"] == "snapshot":
+                profile = record["profile"]
+                metrics = dict(record["metrics"])
+            elif record["type"] == "metric":
+                metrics[record["data"]["topic"]] = record["data"]
+            elif record["type"] == "profile":
+                profile = record["data"]
+        return profile, metrics
+    
+    def _compact(self, user_id: str) -> None:
+        profile, metrics = self._read_state(user_id)
+        path = self._path(user_id, "state")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"type": "snapshot", "profile": profile, "metrics": metrics}) + "\n")
+        os.replace(tmp_path, path)
+    
+    def compact(self, user_id: str) -> None:
+        """Rewrite a user's state journal as a single snapshot line"""
+        with self._lock:
+            self._compact(user_id)
+            self._pending[user_id] = 0
+    
+    def load_messages(self, user_id: str, last_n: Optional[int] = None) -> List[MessageRecord]:
+        path = self._path(user_id, "messages")
+        if not os.path.exists(path) or last_n == 0:
+            return []
+        
+        with self._lock:
+            if last_n is None:
+                with open(path, "rb") as f:
+                    lines = f.read().splitlines()
+            else:
+                # One extra line covers a torn final write
+                lines = _read_tail_lines(path, last_n + 1)
+        
+        records = self._parse(lines)
+        if last_n is not None:
+            records = records[-last_n:]
+        return [
+            MessageRecord(
+                record["role"],
+                record["content"],
+                datetime.fromisoformat(record["timestamp"]),
+                record["agent_type"]
+            )
+            for record in records
+        ]
+    
+    def load_metrics(self, user_id: str) -> Dict[str, LearningMetric]:
+        with self._lock:
+            _, metrics = self._read_state(user_id)
+        return {topic: LearningMetric.model_validate(data) for topic, data in metrics.items()}
+    
+    def load_profile(self, user_id: str) -> Optional[UserProfile]:
+        with self._lock:
+            profile, _ = self._read_state(user_id)
+        return UserProfile.model_validate(profile) if profile else None
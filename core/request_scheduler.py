@@ -0,0 +1,437 @@
+"""
+Request Scheduler - Client-side rate limiting, prioritisation and retries for LLM calls
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from enum import IntEnum
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional, Tuple
+
+
+class Priority(IntEnum):
+    """Scheduling priority; lower values are admitted first"""
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the scheduler's wait queue is at capacity"""
+    pass
+
+
+# Status codes and exception names that indicate a transient failure
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+RETRYABLE_ERRORS = {
+    "RateLimitError",        # openai / anthropic
+    "APITimeoutError",
+    "APIConnectionError",
+    "InternalServerError",
+    "OverloadedError",
+    "ResourceExhausted",     # google.api_core
+    "ServiceUnavailable",
+    "DeadlineExceeded",
+    "TooManyRequests",
+}
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Decide whether a provider error is worth retrying
+    
+    Args:
+        error: Exception raised by a provider SDK
+    
+    Returns:
+        True for rate limits, overloads, timeouts and 5xx errors
+    """
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    if type(error).__name__ in RETRYABLE_ERRORS:
+        return True
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    return isinstance(status, int) and status in RETRYABLE_STATUS
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Read a Retry-After hint (seconds) from a provider error, if present"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter"""
+    
+    def __init__(self, max_retries: int = 4, base_delay: float = 1.0, max_delay: float = 30.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+    
+    def delay(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        """
+        Seconds to wait before retry number `attempt` (0-based)
+        
+        A provider's Retry-After hint is honoured when it is longer than
+        the jittered backoff.
+        """
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        hint = retry_after(error) if error is not None else None
+        if hint is not None:
+            backoff = max(backoff, min(hint, self.max_delay))
+        return backoff
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `rate_per_minute`
+    
+    Not thread-safe on its own; RequestScheduler guards it with its lock.
+    """
+    
+    def __init__(self, rate_per_minute: float, burst: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = burst if burst is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+    
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def delay(self, amount: float, now: float) -> float:
+        """Seconds until `amount` tokens are available (0 if they are now)"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+    
+    def take(self, amount: float) -> None:
+        self.tokens -= min(amount, self.capacity)
+    
+    def charge(self, amount: float, now: float) -> None:
+        """Consume tokens after the fact (may go into debt)"""
+        self._refill(now)
+        self.tokens -= amount
+
+
+class _Entry:
+    __slots__ = ("priority", "seq", "tokens")
+    
+    def __init__(self, priority: int, seq: int, tokens: int):
+        self.priority = priority
+        self.seq = seq
+        self.tokens = tokens
+    
+    def __lt__(self, other: "_Entry") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class RequestScheduler:
+    """
+    Admission control for calls to one provider/model
+    
+    Features:
+    - Token buckets for requests and tokens per minute
+    - Optional cap on in-flight requests
+    - Bounded wait queue ordered by priority, then arrival
+    - Jittered exponential backoff on retryable errors
+    
+    Waiters are admitted strictly from the head of the queue, so an
+    interactive request never waits behind queued background work.
+    """
+    
+    _POLL_INTERVAL = 0.02
+    
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        max_queue: int = 256,
+        retry: Optional[RetryPolicy] = None,
+        burst: Optional[float] = None
+    ):
+        """
+        Args:
+            requests_per_minute: Request quota (None for unlimited)
+            tokens_per_minute: Token quota (None for unlimited)
+            max_concurrency: Maximum in-flight requests (None for unlimited)
+            max_queue: Maximum waiting requests before QueueFullError
+            retry: Backoff policy for retryable errors
+            burst: Request bucket capacity (defaults to one minute's quota)
+        """
+        self.requests = TokenBucket(requests_per_minute, burst) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.retry = retry or RetryPolicy()
+        self.active = 0
+        self.retries = 0
+        self._queue: list = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+    
+    @property
+    def limits_tokens(self) -> bool:
+        return self.tokens is not None
+    
+    # Admission
+    
+    def _enqueue(self, priority: int, tokens: int, seq: Optional[int] = None) -> _Entry:
+        with self._lock:
+            if len(self._queue) >= self.max_queue:
+                raise QueueFullError(f"LLM request queue is full ({self.max_queue} waiting)")
+            entry = _Entry(priority, next(self._seq) if seq is None else seq, tokens)
+            heapq.heappush(self._queue, entry)
+            return entry
+    
+    def _try_admit(self, entry: _Entry) -> Optional[float]:
+        """Admit entry if possible; otherwise return how long to wait (None: until notified)"""
+        if self._queue[0] is not entry:
+            return None
+        if self.max_concurrency is not None and self.active >= self.max_concurrency:
+            return None
+        
+        now = time.monotonic()
+        delay = 0.0
+        if self.requests is not None:
+            delay = max(delay, self.requests.delay(1, now))
+        if self.tokens is not None:
+            delay = max(delay, self.tokens.delay(entry.tokens, now))
+        if delay > 0:
+            return delay
+        
+        heapq.heappop(self._queue)
+        if self.requests is not None:
+            self.requests.take(1)
+        if self.tokens is not None:
+            self.tokens.take(entry.tokens)
+        self.active += 1
+        # The next waiter may now be at the head
+        self._cond.notify_all()
+        return 0.0
+    
+    def _acquire(self, entry: _Entry) -> None:
+        with self._cond:
+            while True:
+                wait = self._try_admit(entry)
+                if wait == 0.0:
+                    return
+                self._cond.wait(wait)
+    
+    async def _aacquire(self, entry: _Entry) -> None:
+        try:
+            while True:
+                with self._lock:
+                    wait = self._try_admit(entry)
+                if wait == 0.0:
+                    return
+                await asyncio.sleep(min(wait or self._POLL_INTERVAL, self._POLL_INTERVAL * 5))
+        except asyncio.CancelledError:
+            with self._lock:
+                if entry in self._queue:
+                    self._queue.remove(entry)
+                    heapq.heapify(self._queue)
+                    self._cond.notify_all()
+            raise
+    
+    def _release(self) -> None:
+        with self._cond:
+            self.active -= 1
+            self._cond.notify_all()
+    
+    @contextmanager
+    def slot(self, priority: int = Priority.INTERACTIVE, tokens: int = 0, seq: Optional[int] = None):
+        """Hold an admitted request slot for the duration of the block"""
+        self._acquire(self._enqueue(priority, tokens, seq))
+        try:
+            yield
+        finally:
+            self._release()
+    
+    @asynccontextmanager
+    async def aslot(self, priority: int = Priority.INTERACTIVE, tokens: int = 0, seq: Optional[int] = None):
+        """Async version of slot"""
+        await self._aacquire(self._enqueue(priority, tokens, seq))
+        try:
+            yield
+        finally:
+            self._release()
+    
+    def charge(self, tokens: int) -> None:
+        """Account for tokens only known after the call (e.g. generated output)"""
+        if self.tokens is not None and tokens:
+            with self._lock:
+                self.tokens.charge(tokens, time.monotonic())
+    
+    def next_seq(self) -> int:
+        """Reserve an arrival number so retries keep their place in line"""
+        return next(self._seq)
+    
+    # Execution with retries
+    
+    def call(self, fn: Callable[[], Any], priority: int = Priority.INTERACTIVE, tokens: int = 0) -> Any:
+        """
+        Run fn once admitted, retrying retryable errors with backoff
+        
+        Args:
+            fn: Zero-argument callable performing the request
+            priority: Priority.INTERACTIVE or Priority.BACKGROUND
+            tokens: Estimated tokens the request consumes
+        
+        Returns:
+            fn's result
+        """
+        seq = self.next_seq()
+        for attempt in itertools.count():
+            try:
+                with self.slot(priority, tokens, seq):
+                    return fn()
+            except Exception as error:
+                if attempt >= self.retry.max_retries or not is_retryable(error):
+                    raise
+                self.retries += 1
+                time.sleep(self.retry.delay(attempt, error))
+    
+    async def acall(
+        self,
+        fn: Callable[[], Awaitable[Any]],
+        priority: int = Priority.INTERACTIVE,
+        tokens: int = 0
+    ) -> Any:
+        """Async version of call; fn returns a fresh awaitable per attempt"""
+        seq = self.next_seq()
+        for attempt in itertools.count():
+            try:
+                async with self.aslot(priority, tokens, seq):
+                    return await fn()
+            except Exception as error:
+                if attempt >= self.retry.max_retries or not is_retryable(error):
+                    raise
+                self.retries += 1
+                await asyncio.sleep(self.retry.delay(attempt, error))
+    
+    def stream(
+        self,
+        open_stream: Callable[[], Iterator[str]],
+        priority: int = Priority.INTERACTIVE,
+        tokens: int = 0
+    ) -> Iterator[str]:
+        """
+        Stream chunks while holding a slot for the whole response
+        
+        Errors before the first chunk are retried; once text has been
+        yielded a retry would duplicate it, so later errors propagate.
+        
+        Args:
+            open_stream: Zero-argument callable returning a chunk iterator
+            priority: Priority.INTERACTIVE or Priority.BACKGROUND
+            tokens: Estimated tokens the request consumes
+        
+        Yields:
+            Text chunks
+        """
+        seq = self.next_seq()
+        for attempt in itertools.count():
+            with self.slot(priority, tokens, seq):
+                chunks = iter(open_stream())
+                try:
+                    first = next(chunks)
+                except StopIteration:
+                    return
+                except Exception as error:
+                    if attempt >= self.retry.max_retries or not is_retryable(error):
+                        raise
+                    delay = self.retry.delay(attempt, error)
+                else:
+                    yield first
+                    yield from chunks
+                    return
+            self.retries += 1
+            time.sleep(delay)
+    
+    async def astream(
+        self,
+        open_stream: Callable[[], AsyncIterator[str]],
+        priority: int = Priority.INTERACTIVE,
+        tokens: int = 0
+    ) -> AsyncIterator[str]:
+        """Async version of stream"""
+        seq = self.next_seq()
+        for attempt in itertools.count():
+            async with self.aslot(priority, tokens, seq):
+                chunks = open_stream().__aiter__()
+                try:
+                    first = await chunks.__anext__()
+                except StopAsyncIteration:
+                    return
+                except Exception as error:
+                    if attempt >= self.retry.max_retries or not is_retryable(error):
+                        raise
+                    delay = self.retry.delay(attempt, error)
+                else:
+                    yield first
+                    async for chunk in chunks:
+                        yield chunk
+                    return
+            self.retries += 1
+            await asyncio.sleep(delay)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "active": self.active,
+                "queued": len(self._queue),
+                "retries": self.retries
+            }
+
+
+def _env_number(name: str) -> Optional[float]:
+    value = os.getenv(name)
+    return float(value) if value else None
+
+
+_schedulers: Dict[Tuple[str, str], RequestScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(provider: str, model: str) -> RequestScheduler:
+    """
+    Get the process-wide scheduler for a provider/model
+    
+    Quotas come from LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE,
+    LLM_MAX_CONCURRENCY and LLM_MAX_RETRIES, and are shared by every
+    LLMService for that model in this process.
+    
+    Args:
+        provider: LLM provider name
+        model: Model name
+    
+    Returns:
+        Shared RequestScheduler
+    """
+    # Accept LLMProvider members as well as plain strings
+    key = (getattr(provider, "value", provider), model)
+    with _schedulers_lock:
+        if key not in _schedulers:
+            concurrency = _env_number("LLM_MAX_CONCURRENCY")
+            _schedulers[key] = RequestScheduler(
+                requests_per_minute=_env_number("LLM_REQUESTS_PER_MINUTE"),
+                tokens_per_minute=_env_number("LLM_TOKENS_PER_MINUTE"),
+                max_concurrency=int(concurrency) if concurrency else None,
+                retry=RetryPolicy(max_retries=int(os.getenv("LLM_MAX_RETRIES", "4")))
+            )
+        return _schedulers[key]
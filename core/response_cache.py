@@ -0,0 +1,386 @@
+"""
+Response Cache - Content-addressed caching for LLM completions
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def make_cache_key(
+    provider: str,
+    model: str,
+    system_prompt: Optional[str],
+    messages: List[Any],
+    temperature: float,
+    max_tokens: int,
+    **kwargs
+) -> str:
+    """
+    Build a stable hash for an LLM request
+
+    Args:
+        provider: LLM provider name
+        model: Model name
+        system_prompt: System prompt (if any)
+        messages: Conversation messages (objects with role/content or dicts)
+        temperature: Sampling temperature
+        max_tokens: Maximum tokens to generate
+        **kwargs: Extra provider arguments that affect the output
+
+    Returns:
+        Hex digest identifying the request
+    """
+    payload = {
+        # LLMProvider members and plain strings share entries
+        "provider": getattr(provider, "value", provider),
+        "model": model,
+        "system_prompt": system_prompt or "",
+        "messages": [
+            [msg["role"], msg["content"]] if isinstance(msg, dict) else [msg.role, msg.content]
+            for msg in messages
+        ],
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "kwargs": kwargs,
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class CacheStats:
+    """Hit/miss counters for a response cache"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hit_rate
+        }
+
+
+class ResponseCache(ABC):
+    """
+    Base class for response caches
+
+    Subclasses store generated text keyed by `make_cache_key` digests.
+    """
+
+    def __init__(self):
+        self.stats = CacheStats()
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None"""
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: str) -> None:
+        """Store a response under key"""
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all cached responses"""
+        pass
+
+
+class InMemoryResponseCache(ResponseCache):
+    """
+    Thread-safe in-process LRU cache with optional TTL
+
+    Features:
+    - LRU eviction once max_entries is reached
+    - Per-entry time-to-live
+    - Hit/miss/eviction counters
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: Optional[float] = 3600.0
+    ):
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+
+            value, stored_at = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return value
+
+    def set(self, key: str, value: str, age: float = 0.0) -> None:
+        """
+        Store a response under key
+
+        Args:
+            key: Cache key
+            value: Response text
+            age: Seconds since the response was generated (when copied
+                from another tier), so it still expires on time
+        """
+        if self.ttl is not None and age >= self.ttl:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() - age)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+
+class SQLiteResponseCache(ResponseCache):
+    """
+    Disk-backed response cache shared by worker processes on one host
+
+    Uses SQLite in WAL mode so several processes can read concurrently
+    while one writes. Entries are evicted least-recently-used first once
+    max_entries is exceeded. The size is checked every `evict_every`
+    inserts and trimmed a batch below the cap, so most writes stay a
+    single upsert; between checks the cap may be exceeded by up to
+    `evict_every` entries per process.
+    """
+
+    def __init__(
+        self,
+        path: str = "llm_cache.sqlite3",
+        max_entries: int = 10000,
+        ttl: Optional[float] = 7 * 24 * 3600.0,
+        evict_every: int = 100
+    ):
+        super().__init__()
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.evict_every = max(1, evict_every)
+        self._inserts = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_last_accessed ON responses (last_accessed)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str) -> Optional[Tuple[str, float]]:
+        """
+        Look up a response along with its age
+
+        Args:
+            key: Cache key
+
+        Returns:
+            (value, seconds since it was stored), or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats.misses += 1
+                return None
+
+            value, created_at = row
+            if self.ttl is not None and now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE responses SET last_accessed = ?, hits = hits + 1 WHERE key = ?",
+                (now, key)
+            )
+            self._conn.commit()
+            self.stats.hits += 1
+            return value, now - created_at
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO responses (key, value, created_at, last_accessed, hits)
+                VALUES (?, ?, ?, ?, 0)
+                ON CONFLICT(key) DO UPDATE SET
+                    value = excluded.value,
+                    created_at = excluded.created_at,
+                    last_accessed = excluded.last_accessed""",
+                (key, value, now, now)
+            )
+            self._inserts += 1
+            if self._inserts % self.evict_every == 0:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        if count <= self.max_entries:
+            return
+        # Leave room for the next batch of inserts before checking again
+        target = max(self.max_entries - self.evict_every + 1, 0)
+        cursor = self._conn.execute(
+            """DELETE FROM responses WHERE key IN (
+                SELECT key FROM responses
+                ORDER BY last_accessed ASC
+                LIMIT ?
+            )""",
+            (count - target,)
+        )
+        self.stats.evictions += max(cursor.rowcount, 0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def hottest(self, limit: int) -> List[Tuple[str, str, float]]:
+        """
+        Get the most frequently used live entries
+
+        Args:
+            limit: Maximum number of entries to return
+
+        Returns:
+            List of (key, value, age in seconds), hottest first
+        """
+        now = time.time()
+        cutoff = now - self.ttl if self.ttl is not None else float("-inf")
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT key, value, created_at FROM responses
+                WHERE created_at >= ?
+                ORDER BY hits DESC, last_accessed DESC
+                LIMIT ?""",
+                (cutoff, limit)
+            ).fetchall()
+        return [(key, value, now - created_at) for key, value, created_at in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+class TieredResponseCache(ResponseCache):
+    """
+    Two-level cache: in-memory LRU in front of a shared disk tier
+
+    Disk hits are promoted into memory. With warm_start > 0 the hottest
+    disk entries are loaded into memory at construction. Copied entries
+    keep their age, so they expire when the original would have.
+    """
+
+    def __init__(
+        self,
+        memory: InMemoryResponseCache,
+        disk: SQLiteResponseCache,
+        warm_start: int = 0
+    ):
+        super().__init__()
+        self.memory = memory
+        self.disk = disk
+        if warm_start:
+            self.warm_start(warm_start)
+
+    def warm_start(self, limit: int) -> int:
+        """
+        Load the hottest disk entries into the memory tier
+
+        Args:
+            limit: Maximum number of entries to load
+
+        Returns:
+            Number of entries loaded
+        """
+        entries = self.disk.hottest(min(limit, self.memory.max_entries))
+        # Insert coldest first so the hottest end up most recently used
+        for key, value, age in reversed(entries):
+            self.memory.set(key, value, age)
+        return len(entries)
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is None:
+            entry = self.disk.get_entry(key)
+            if entry is not None:
+                value, age = entry
+                self.memory.set(key, value, age)
+
+        if value is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        self.memory.set(key, value)
+        self.disk.set(key, value)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        self.disk.clear()
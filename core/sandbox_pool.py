@@ -0,0 +1,270 @@
+"""
+Sandbox Worker Pool - Pre-forked processes for resource-limited code execution
+"""
+
+import marshal
+import multiprocessing
+import os
+import queue
+import threading
+from typing import Dict, Optional, Tuple
+
+from core.code_sandbox import (
+    CaseResult,
+    ExecutionResult,
+    SuiteResult,
+    get_globals_template,
+    run_restricted,
+    run_test_cases
+)
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+def _set_cpu_budget(seconds: int) -> None:
+    """Allow the current process `seconds` more CPU time before SIGXCPU"""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = int(usage.ru_utime + usage.ru_stime)
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = used + seconds
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _address_space_used() -> int:
+    """Bytes of virtual address space the current process has mapped"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def _set_memory_budget(megabytes: int) -> None:
+    """Allow the current process `megabytes` more address space before MemoryError"""
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    soft = _address_space_used() + megabytes * 1024 * 1024
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+
+
+def _worker_main(conn, allowed_modules: list, cpu_time_limit: int, memory_limit_mb: int) -> None:
+    """
+    Worker loop: receive jobs with marshalled code objects, execute, send results
+    
+    The worker is killed by the kernel when it exceeds its CPU budget
+    (SIGXCPU) and gets MemoryError once user code allocates more than
+    `memory_limit_mb` on top of what the warmed-up worker already maps.
+    """
+    # Warm up: build builtins and import allowed modules before any job
+    get_globals_template(allowed_modules)
+    
+    if resource is not None and memory_limit_mb:
+        _set_memory_budget(memory_limit_mb)
+    
+    while True:
+        try:
+            payload = conn.recv()
+        except EOFError:
+            break
+        if payload is None:
+            break
+        
+        if resource is not None and cpu_time_limit:
+            _set_cpu_budget(cpu_time_limit)
+        
+        kind, code_bytes, cases = payload
+        byte_code = marshal.loads(code_bytes)
+        if kind == "tests":
+            cases = [
+                (index, case_input, case_code if isinstance(case_code, str) else marshal.loads(case_code), expected)
+                for index, case_input, case_code, expected in cases
+            ]
+            conn.send(run_test_cases(byte_code, cases, allowed_modules))
+        else:
+            conn.send(run_restricted(byte_code, allowed_modules))
+
+
+class _Worker:
+    """Handle for one sandbox worker process"""
+    
+    def __init__(self, context, allowed_modules: list, cpu_time_limit: int, memory_limit_mb: int):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, allowed_modules, cpu_time_limit, memory_limit_mb),
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+    
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class SandboxWorkerPool:
+    """
+    Pool of pre-started worker processes for sandboxed execution
+    
+    Features:
+    - Wall-clock timeout per execution
+    - CPU-time and memory limits via `resource`
+    - Runaway workers are killed and replaced
+    """
+    
+    def __init__(
+        self,
+        size: int = 2,
+        allowed_modules: Optional[list] = None,
+        cpu_time_limit: Optional[int] = None,
+        memory_limit_mb: Optional[int] = None
+    ):
+        self.size = size
+        self.allowed_modules = allowed_modules or ['math', 'random', 'datetime', 'json']
+        self.cpu_time_limit = cpu_time_limit if cpu_time_limit is not None else int(os.getenv("MAX_CPU_TIME", "10"))
+        self.memory_limit_mb = memory_limit_mb if memory_limit_mb is not None else int(os.getenv("MAX_MEMORY_MB", "512"))
+        self.restarts = 0
+        
+        # Never fork the app process itself: it is multithreaded (Streamlit,
+        # grpc) and its address space would count against the workers'
+        # memory limit. Workers are forked from a small forkserver instead
+        methods = multiprocessing.get_all_start_methods()
+        self._context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        if "forkserver" in methods:
+            self._context.set_forkserver_preload([__name__])
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._closed = False
+        
+        for _ in range(size):
+            self._idle.put(self._spawn())
+    
+    def _spawn(self) -> _Worker:
+        return _Worker(self._context, self.allowed_modules, self.cpu_time_limit, self.memory_limit_mb)
+    
+    def run(self, byte_code, timeout: float = 30) -> ExecutionResult:
+        """
+        Execute a compiled restricted code object in a worker
+        
+        Args:
+            byte_code: Code object from compile_restricted
+            timeout: Wall-clock limit in seconds
+        
+        Returns:
+            ExecutionResult with output/errors
+        """
+        return self._submit(("exec", marshal.dumps(byte_code), None), timeout, ExecutionResult)
+    
+    def run_tests(self, byte_code, cases: list, timeout: float = 30) -> SuiteResult:
+        """
+        Execute a submission and evaluate test cases in one worker call
+        
+        Args:
+            byte_code: Code object for the submission
+            cases: (index, input, case_code, expected_output) tuples
+            timeout: Wall-clock limit in seconds for the whole batch
+            
+        Returns:
+            SuiteResult with per-case results
+        """
+        payload_cases = [
+            (index, case_input, case_code if isinstance(case_code, str) else marshal.dumps(case_code), expected)
+            for index, case_input, case_code, expected in cases
+        ]
+        result = self._submit(("tests", marshal.dumps(byte_code), payload_cases), timeout, SuiteResult)
+        if not result.cases:
+            # The worker was killed; report every case as failed
+            result.cases = [
+                CaseResult(index, case_input, expected, False, error=result.error)
+                for index, case_input, _, expected in cases
+            ]
+        return result
+    
+    def _submit(self, payload: tuple, timeout: float, result_class):
+        if self._closed:
+            raise RuntimeError("Sandbox worker pool is closed")
+        
+        try:
+            # Wait no longer than the run itself may take, even if a worker was lost
+            worker = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            return result_class(
+                success=False,
+                error=f"Execution timed out after {timeout} seconds",
+                execution_time=timeout
+            )
+        
+        try:
+            worker.conn.send(payload)
+            if worker.conn.poll(timeout):
+                return worker.conn.recv()
+            
+            worker = self._replace(worker)
+            return result_class(
+                success=False,
+                error=f"Execution timed out after {timeout} seconds",
+                execution_time=timeout
+            )
+        except (EOFError, OSError):
+            # Worker died mid-run: CPU limit (SIGXCPU) or a hard crash
+            worker = self._replace(worker)
+            return result_class(
+                success=False,
+                error="Execution terminated: CPU time or memory limit exceeded"
+            )
+        finally:
+            if self._closed:
+                # close() ran while this worker was busy
+                worker.kill()
+            else:
+                self._idle.put(worker)
+    
+    def _replace(self, worker: _Worker) -> _Worker:
+        worker.kill()
+        self.restarts += 1
+        return self._spawn()
+    
+    def close(self) -> None:
+        """Stop all worker processes"""
+        self._closed = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                worker.conn.send(None)
+            except OSError:
+                pass
+            worker.kill()
+
+
+_shared_pools: Dict[Tuple[str, ...], SandboxWorkerPool] = {}
+_shared_pools_lock = threading.Lock()
+
+
+def get_shared_pool(allowed_modules: list, size: Optional[int] = None) -> SandboxWorkerPool:
+    """
+    Get the process-wide worker pool for a set of allowed modules
+    
+    Args:
+        allowed_modules: Modules user code may import
+        size: Number of workers (defaults to SANDBOX_WORKERS or 2)
+    
+    Returns:
+        Shared SandboxWorkerPool
+    """
+    key = tuple(sorted(allowed_modules))
+    with _shared_pools_lock:
+        if key not in _shared_pools:
+            _shared_pools[key] = SandboxWorkerPool(
+                size=size or int(os.getenv("SANDBOX_WORKERS", "2")),
+                allowed_modules=list(allowed_modules)
+            )
+        return _shared_pools[key]
@@ -0,0 +1,243 @@
+"""
+Semantic Cache - Serve stored responses for near-duplicate requests
+"""
+
+import re
+import threading
+from typing import Any, Dict, FrozenSet, Hashable, List, Optional
+
+import numpy as np
+
+from core.embeddings import HashedNgramEmbedder
+
+# Request phrasing that does not change what is being asked about
+_BOILERPLATE = re.compile(
+    r"\b(?:please|can you|could you|would you|i want to|i'd like to|help me|"
+    r"explain|describe|teach me|tell me|show me|learn|understand|"
+    r"what is|what are|what's|how do|how does|how to|"
+    r"about|in programming|a|an|the|me|to|work|works)\b"
+)
+_NON_WORD = re.compile(r"[^a-z0-9_+#]+")
+
+# Fixed instruction blocks appended to requests (e.g. app.py's "Please
+# include: ..." list); they are the same for every topic and would
+# otherwise dominate the embedding
+_INSTRUCTIONS = re.compile(r"\n\s*\n\s*(?:please include|important)\b.*", re.DOTALL)
+
+# Words that point back into the conversation; such requests depend on
+# history and must not be answered from another conversation's response
+_CONTEXTUAL = frozenset({
+    "it", "this", "that", "these", "those", "again", "above", "previous",
+    "earlier", "my", "mine", "another", "more", "differently", "instead"
+})
+
+
+def normalize_request(text: str) -> str:
+    """
+    Reduce a request to what it is about
+    
+    Args:
+        text: Learner request
+    
+    Returns:
+        Lowercased request without punctuation, request boilerplate and
+        instruction blocks, e.g. "What is a for loop?" -> "for loop"
+    """
+    return " ".join(_singular(word) for word in _request_words(text))
+
+
+def _request_words(text: str) -> List[str]:
+    # Lowercased words without instruction blocks or boilerplate
+    text = _INSTRUCTIONS.sub(" ", text.lower())
+    text = _NON_WORD.sub(" ", text)
+    return _BOILERPLATE.sub(" ", text).split()
+
+
+def _singular(word: str) -> str:
+    # "loops" and "loop" ask about the same thing
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+class SemanticCache:
+    """
+    In-memory cache keyed by request meaning instead of exact text
+    
+    Requests are normalized, embedded locally and compared by cosine
+    similarity against stored requests in the same bucket (e.g. learner
+    profile). Vectors live in one preallocated NumPy matrix searched by
+    brute force; with `n_lists` set, an IVF index (k-means partitions)
+    limits each search to the `n_probe` closest partitions. The oldest
+    entry is overwritten once `max_entries` is reached.
+    
+    Similar wording is not enough for a hit: "explain for loops" and
+    "explain while loops" embed close together but ask different things,
+    so a candidate must also have the same topic words as the request.
+    """
+    
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        max_entries: int = 4096,
+        n_lists: int = 0,
+        n_probe: int = 2,
+        embedder: Optional[HashedNgramEmbedder] = None
+    ):
+        """
+        Args:
+            threshold: Minimum cosine similarity for a hit
+            max_entries: Maximum stored responses
+            n_lists: IVF partitions (0 for brute-force search)
+            n_probe: Partitions searched per lookup when IVF is on
+            embedder: Text embedder
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.embedder = embedder or HashedNgramEmbedder()
+        
+        self._vectors = np.zeros((max_entries, self.embedder.dim), dtype=np.float32)
+        self._bucket_ids = np.full(max_entries, -1, dtype=np.int64)
+        self._responses: List[Optional[str]] = [None] * max_entries
+        self._topics: List[Optional[FrozenSet[str]]] = [None] * max_entries
+        self._buckets: Dict[Hashable, int] = {}
+        self._size = 0
+        self._next = 0
+        
+        self._centroids: Optional[np.ndarray] = None
+        self._list_ids = np.full(max_entries, -1, dtype=np.int64)
+        self._trained_at = 0
+        
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def cacheable(text: str) -> bool:
+        """
+        Whether a request can be answered without its conversation
+        
+        Args:
+            text: Learner request
+        
+        Returns:
+            False for empty or context-dependent requests ("explain it again")
+        """
+        # Checked before singularizing, which turns "this" into "thi"
+        words = _request_words(text)
+        return bool(words) and not _CONTEXTUAL.intersection(words)
+    
+    def _bucket_id(self, bucket: Hashable) -> int:
+        return self._buckets.setdefault(bucket, len(self._buckets))
+    
+    def _candidates(self, query: np.ndarray) -> np.ndarray:
+        """Rows to compare against the query"""
+        if self._centroids is None:
+            return np.arange(self._size)
+        nearest = np.argsort(self._centroids @ query)[-self.n_probe:]
+        return np.flatnonzero(np.isin(self._list_ids[:self._size], nearest))
+    
+    def get(self, text: str, bucket: Hashable = None) -> Optional[str]:
+        """
+        Find a stored response for a near-duplicate request
+        
+        Args:
+            text: Learner request (or just its topic)
+            bucket: Only entries stored with an equal bucket can match
+        
+        Returns:
+            Stored response, or None on a miss
+        """
+        if not self.cacheable(text):
+            return None
+        normalized = normalize_request(text)
+        query = self.embedder.embed(normalized)
+        topic = frozenset(normalized.split())
+        
+        with self._lock:
+            bucket_id = self._buckets.get(bucket)
+            if bucket_id is not None and self._size:
+                rows = self._candidates(query)
+                rows = rows[self._bucket_ids[rows] == bucket_id]
+                similarities = self._vectors[rows] @ query
+                for i in np.argsort(similarities)[::-1]:
+                    if similarities[i] < self.threshold:
+                        break
+                    if self._topics[rows[i]] == topic:
+                        self.hits += 1
+                        return self._responses[rows[i]]
+            self.misses += 1
+            return None
+    
+    def put(self, text: str, response: str, bucket: Hashable = None) -> None:
+        """
+        Store a response
+        
+        Args:
+            text: Learner request (or just its topic)
+            response: Response to serve for similar requests
+            bucket: Bucket the response applies to
+        """
+        if not response or not self.cacheable(text):
+            return
+        normalized = normalize_request(text)
+        vector = self.embedder.embed(normalized)
+        
+        with self._lock:
+            row = self._next
+            self._vectors[row] = vector
+            self._bucket_ids[row] = self._bucket_id(bucket)
+            self._responses[row] = response
+            self._topics[row] = frozenset(normalized.split())
+            self._next = (row + 1) % self.max_entries
+            self._size = max(self._size, row + 1)
+            
+            if self._centroids is not None:
+                self._list_ids[row] = int(np.argmax(self._centroids @ vector))
+            self._maybe_train()
+    
+    def _maybe_train(self) -> None:
+        """(Re)build the IVF partitions whenever the cache has doubled"""
+        if not self.n_lists or self._size < self.n_lists * 8:
+            return
+        if self._trained_at and self._size < self._trained_at * 2:
+            return
+        
+        vectors = self._vectors[:self._size]
+        rng = np.random.default_rng(0)
+        centroids = vectors[rng.choice(self._size, self.n_lists, replace=False)].copy()
+        for _ in range(10):
+            assignment = np.argmax(vectors @ centroids.T, axis=1)
+            for i in range(self.n_lists):
+                members = vectors[assignment == i]
+                if len(members):
+                    mean = members.mean(axis=0)
+                    norm = np.linalg.norm(mean)
+                    centroids[i] = mean / norm if norm else centroids[i]
+        
+        self._centroids = centroids
+        self._list_ids[:self._size] = np.argmax(vectors @ centroids.T, axis=1)
+        self._trained_at = self._size
+    
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._lock:
+            self._responses = [None] * self.max_entries
+            self._topics = [None] * self.max_entries
+            self._bucket_ids[:] = -1
+            self._buckets.clear()
+            self._size = 0
+            self._next = 0
+            self._centroids = None
+            self._trained_at = 0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": self._size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "ivf_lists": 0 if self._centroids is None else self.n_lists
+            }
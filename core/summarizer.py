@@ -0,0 +1,126 @@
+"""
+Conversation Summarizer - Rolling summaries of older conversation turns
+"""
+
+import logging
+import threading
+from typing import List
+
+from core.memory import Memory, MessageRecord
+from core.request_scheduler import Priority
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_SYSTEM_PROMPT = """You maintain a running summary of a programming tutoring conversation.
+Merge the new messages into the existing summary. Keep what the learner is working on,
+concepts covered, mistakes they made, code they shared (described, not copied) and any
+preferences they stated. Drop greetings and filler. Reply with the updated summary only."""
+
+
+class ConversationSummarizer:
+    """
+    Folds messages that leave the recent window into Memory.summary
+    
+    Work happens only when at least `fold_every` messages have left the
+    window, so most turns cost nothing; each fold is one small LLM call
+    that merges the new messages into the previous summary.
+    """
+    
+    def __init__(
+        self,
+        llm_service,
+        window: int = 10,
+        fold_every: int = 4,
+        max_tokens: int = 300,
+        background: bool = True
+    ):
+        """
+        Args:
+            llm_service: LLMService used to write summaries
+            window: Newest messages kept verbatim (not summarized); match
+                the largest agent history window (2 * history_count) so no
+                turn is sent both verbatim and in the summary
+            fold_every: Minimum number of messages to fold at once
+            max_tokens: Maximum summary length
+            background: Fold in a daemon thread instead of the caller's
+        """
+        self.llm_service = llm_service
+        self.window = window
+        self.fold_every = fold_every
+        self.max_tokens = max_tokens
+        self.background = background
+        self.failures = 0
+        self._active = set()
+        self._lock = threading.Lock()
+    
+    def maybe_update(self, memory: Memory) -> bool:
+        """
+        Start a fold if enough messages have left the window
+        
+        Args:
+            memory: Session memory
+        
+        Returns:
+            True if a fold was started
+        """
+        if len(memory.get_unsummarized(self.window)) < self.fold_every:
+            return False
+        
+        with self._lock:
+            if id(memory) in self._active:
+                return False
+            self._active.add(id(memory))
+        
+        if self.background:
+            threading.Thread(target=self._run, args=(memory,), daemon=True).start()
+        else:
+            self._run(memory)
+        return True
+    
+    def _run(self, memory: Memory) -> None:
+        try:
+            self.update(memory)
+        except Exception:
+            # A failed fold is retried when the window next advances
+            self.failures += 1
+            logger.exception("Conversation summary update failed")
+        finally:
+            with self._lock:
+                self._active.discard(id(memory))
+    
+    def update(self, memory: Memory) -> str:
+        """
+        Fold all pending messages into the summary now
+        
+        Args:
+            memory: Session memory
+        
+        Returns:
+            The updated summary
+        """
+        with memory.lock:
+            pending = memory.get_unsummarized(self.window)
+            summarized_through = memory.message_count - self.window
+            previous = memory.summary
+        
+        if not pending:
+            return previous
+        
+        summary = self.llm_service.generate(
+            messages=[MessageRecord("user", self._build_request(previous, pending))],
+            system_prompt=SUMMARY_SYSTEM_PROMPT,
+            temperature=0.2,
+            max_tokens=self.max_tokens,
+            priority=Priority.BACKGROUND
+        ).strip()
+        
+        memory.set_summary(summary, summarized_through)
+        return summary
+    
+    @staticmethod
+    def _build_request(previous: str, pending: List[MessageRecord]) -> str:
+        transcript = "\n\n".join(f"{msg.role}: {msg.content}" for msg in pending)
+        return (
+            f"Existing summary:\n{previous or '(none yet)'}\n\n"
+            f"New messages:\n{transcript}"
+        )
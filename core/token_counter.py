@@ -0,0 +1,197 @@
+"""
+Token Counter - Offline token counting for context budgeting
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+# Python port of the cl100k_base pre-tokenizer split. BPE merges almost
+# every piece it produces into a single token, so counting pieces is a
+# close, dependency-free estimate for BPE-style tokenizers.
+_PRETOKEN = re.compile(
+    r"""(?i:'s|'t|'re|'ve|'m|'ll|'d)"""
+    r"""|(?:[^\r\n\w]|_)?[^\W\d_]+"""
+    r"""|\d{1,3}"""
+    r"""| ?(?:[^\s\w]|_)+[\r\n]*"""
+    r"""|\s*[\r\n]+"""
+    r"""|\s+(?!\S)"""
+    r"""|\s+"""
+)
+
+# Pieces up to this length are usually one token; longer (rarer) words
+# split into roughly one token per _CHARS_PER_SUBTOKEN characters
+_SINGLE_TOKEN_CHARS = 10
+_CHARS_PER_SUBTOKEN = 5
+
+
+def approximate_token_count(text: str) -> int:
+    """
+    Estimate the token count of text without a tokenizer
+    
+    Args:
+        text: Input text
+    
+    Returns:
+        Estimated token count
+    """
+    count = 0
+    for piece in _PRETOKEN.findall(text):
+        length = len(piece)
+        if length <= _SINGLE_TOKEN_CHARS:
+            count += 1
+        else:
+            count += -(-length // _CHARS_PER_SUBTOKEN)
+    return count
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str):
+    """
+    Load the tiktoken encoding for a model once per process
+    
+    Args:
+        model: OpenAI model name
+    
+    Returns:
+        tiktoken Encoding, or None if tiktoken (or its BPE data) is unavailable
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # BPE files are fetched on first use; stay offline if that fails
+        return None
+
+
+class TokenCounter:
+    """
+    Memoized token counter for one provider/model
+    
+    Features:
+    - tiktoken for OpenAI models, loaded once and shared process-wide
+    - Offline approximate counting for Gemini, Anthropic and as a fallback
+    - LRU memoization keyed by text hash
+    - Optional calibration of the approximation against reference counts
+    """
+    
+    def __init__(
+        self,
+        provider: str,
+        model: str,
+        max_entries: int = 8192,
+        scale: float = 1.0
+    ):
+        """
+        Args:
+            provider: LLM provider name
+            model: Model name
+            max_entries: Maximum memoized counts
+            scale: Multiplier applied to approximate counts
+        """
+        # Accept LLMProvider members as well as plain strings
+        self.provider = getattr(provider, "value", provider)
+        self.model = model
+        self.max_entries = max_entries
+        self.scale = scale
+        self._counts: "OrderedDict[Tuple[int, int], int]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @property
+    def encoding(self):
+        """The exact encoder for this model, or None when approximating"""
+        if self.provider != "openai":
+            return None
+        return get_encoding(self.model)
+    
+    def warm_up(self) -> None:
+        """Load the encoder now rather than on the first count"""
+        _ = self.encoding
+    
+    @staticmethod
+    def _key(text: str) -> Tuple[int, int]:
+        # str caches its hash, so repeat lookups for the same message are O(1)
+        return hash(text), len(text)
+    
+    def _compute(self, texts: Sequence[str]) -> List[int]:
+        encoding = self.encoding
+        if encoding is not None:
+            return [len(tokens) for tokens in encoding.encode_ordinary_batch(list(texts))]
+        return [round(approximate_token_count(text) * self.scale) for text in texts]
+    
+    def count(self, text: str) -> int:
+        """
+        Count tokens in text
+        
+        Args:
+            text: Input text
+        
+        Returns:
+            Token count (exact for OpenAI with tiktoken, otherwise estimated)
+        """
+        return self.count_many([text])[0]
+    
+    def count_many(self, texts: Iterable[str]) -> List[int]:
+        """
+        Count tokens for several texts, computing only uncached ones
+        
+        Args:
+            texts: Input texts
+        
+        Returns:
+            Token counts in input order
+        """
+        texts = list(texts)
+        keys = [self._key(text) for text in texts]
+        counts: List[Optional[int]] = [None] * len(texts)
+        
+        with self._lock:
+            for i, key in enumerate(keys):
+                cached = self._counts.get(key)
+                if cached is not None:
+                    self._counts.move_to_end(key)
+                    counts[i] = cached
+        
+        missing = [i for i, count in enumerate(counts) if count is None]
+        if missing:
+            computed = self._compute([texts[i] for i in missing])
+            with self._lock:
+                for i, count in zip(missing, computed):
+                    counts[i] = count
+                    self._counts[keys[i]] = count
+                while len(self._counts) > self.max_entries:
+                    self._counts.popitem(last=False)
+        
+        return counts
+    
+    def calibrate(self, samples: Iterable[Tuple[str, int]]) -> float:
+        """
+        Fit the approximation scale to reference token counts
+        
+        Args:
+            samples: (text, true_token_count) pairs, e.g. from provider
+                usage metadata or the provider's count-tokens endpoint
+        
+        Returns:
+            The new scale factor
+        """
+        approximate = 0
+        reference = 0
+        for text, true_count in samples:
+            approximate += approximate_token_count(text)
+            reference += true_count
+        
+        if approximate:
+            self.scale = reference / approximate
+            with self._lock:
+                self._counts.clear()
+        return self.scale
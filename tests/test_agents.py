@@ -0,0 +1,421 @@
+"""
+Tests for agents and the orchestrator (LLM calls are faked)
+"""
+
+import time
+import pytest
+from unittest.mock import patch
+from core.memory import Memory
+from core.summarizer import ConversationSummarizer
+from agents.orchestrator import Orchestrator, AgentType
+
+
+class FakeLLMService:
+    """Minimal stand-in for LLMService that records requests"""
+    
+    def __init__(self, reply: str = "Sure, here you go"):
+        self.reply = reply
+        self.calls = []
+    
+    def generate(self, messages, system_prompt=None, temperature=None, max_tokens=None, **kwargs):
+        self.calls.append({"messages": messages, "system_prompt": system_prompt})
+        return self.reply
+    
+    def stream(self, messages, system_prompt=None, temperature=None, max_tokens=None, **kwargs):
+        self.calls.append({"messages": messages, "system_prompt": system_prompt})
+        for word in self.reply.split(" "):
+            yield word + " "
+    
+    def count_tokens(self, text: str) -> int:
+        return len(text) // 4
+    
+    def count_tokens_many(self, texts):
+        return [self.count_tokens(text) for text in texts]
+
+
+@pytest.fixture
+def orchestrator():
+    return Orchestrator(FakeLLMService(), Memory())
+
+
+class TestStreaming:
+    """Test streaming through agents and orchestrator"""
+    
+    def test_process_stream_records_memory_after_completion(self, orchestrator):
+        result = orchestrator.process("explain loops", AgentType.TUTOR, stream=True)
+        chunks = result["response"]
+        
+        assert orchestrator.memory.get_conversation_history() == []
+        text = "".join(chunks)
+        
+        history = orchestrator.memory.get_conversation_history()
+        assert text == "Sure, here you go "
+        assert [msg.role for msg in history] == ["user", "assistant"]
+        assert history[1].content == text
+    
+    def test_process_without_stream_returns_string(self, orchestrator):
+        result = orchestrator.process("explain loops", AgentType.TUTOR)
+        assert result["response"] == "Sure, here you go"
+        assert len(orchestrator.memory.get_conversation_history()) == 2
+    
+    def test_history_records_are_sent_without_copies(self, orchestrator):
+        orchestrator.process("explain loops", AgentType.TUTOR)
+        stored = list(orchestrator.memory.get_recent_messages(2))
+        orchestrator.process("and recursion?", AgentType.TUTOR)
+        
+        sent = orchestrator.llm_service.calls[-1]["messages"]
+        assert sent[:2] == stored
+        assert sent[0] is stored[0]
+        assert sent[-1].content == "and recursion?"
+
+
+class SlowLLMService(FakeLLMService):
+    """Fake LLM whose calls take a fixed amount of time"""
+    
+    def __init__(self, delay: float):
+        super().__init__()
+        self.delay = delay
+    
+    def generate(self, *args, **kwargs):
+        time.sleep(self.delay)
+        return super().generate(*args, **kwargs)
+
+
+class TestConcurrentFanOut:
+    """Test parallel multi-agent execution"""
+    
+    def test_multi_agent_response_runs_in_parallel(self):
+        orchestrator = Orchestrator(SlowLLMService(0.2), Memory(), max_concurrency=4)
+        agent_types = [AgentType.TUTOR, AgentType.DEBUG, AgentType.ASSESSMENT, AgentType.MOTIVATION]
+        
+        start = time.monotonic()
+        responses = orchestrator.multi_agent_response("help with loops", agent_types)
+        elapsed = time.monotonic() - start
+        
+        assert list(responses) == ["tutor", "debug", "assessment", "motivation"]
+        assert elapsed < 0.6
+    
+    def test_slow_agents_are_dropped_after_timeout(self):
+        orchestrator = Orchestrator(SlowLLMService(0.5), Memory(), agent_timeout=0.05)
+        responses = orchestrator.multi_agent_response("hi", [AgentType.TUTOR, AgentType.DEBUG])
+        assert responses == {}
+    
+    def test_parallel_agents_see_history_snapshot_and_record_in_order(self):
+        llm = SlowLLMService(0.05)
+        orchestrator = Orchestrator(llm, Memory())
+        orchestrator.process("explain loops", AgentType.TUTOR)
+        
+        agent_types = [AgentType.TUTOR, AgentType.DEBUG, AgentType.MOTIVATION]
+        orchestrator.multi_agent_response("help with loops", agent_types)
+        
+        # Every agent was sent the same history: the earlier exchange only
+        for call in llm.calls[1:]:
+            assert [msg.content for msg in call["messages"]] == [
+                "explain loops", "Sure, here you go", "help with loops"
+            ]
+        history = orchestrator.memory.get_conversation_history()
+        assert [(msg.role, msg.agent_type) for msg in history[2:]] == [
+            ("user", "tutor"), ("assistant", "tutor"),
+            ("user", "debug"), ("assistant", "debug"),
+            ("user", "motivation"), ("assistant", "motivation"),
+        ]
+    
+    def test_timed_out_agents_leave_memory_untouched(self):
+        llm = SlowLLMService(0.2)
+        orchestrator = Orchestrator(llm, Memory(), max_concurrency=1, agent_timeout=0.05)
+        
+        responses = orchestrator.multi_agent_response("hi", [AgentType.TUTOR, AgentType.DEBUG])
+        time.sleep(0.4)
+        
+        assert responses == {}
+        assert orchestrator.memory.get_conversation_history() == []
+        # The queued agent was never started
+        assert len(llm.calls) == 1
+    
+    def test_smart_assist_adds_encouragement_for_debugging(self):
+        orchestrator = Orchestrator(SlowLLMService(0.2), Memory())
+        
+        start = time.monotonic()
+        result = orchestrator.smart_assist("I get an error in my code")
+        elapsed = time.monotonic() - start
+        
+        assert result["primary_agent"] == "debug"
+        assert "encouragement" in result["additional_support"]
+        assert elapsed < 0.35
+        # Encouragement is stored after the primary exchange
+        history = orchestrator.memory.get_conversation_history()
+        assert [msg.agent_type for msg in history] == ["debug", "debug", "motivation", "motivation"]
+    
+    def test_failed_agent_is_left_out(self):
+        orchestrator = Orchestrator(SlowLLMService(0.05), Memory())
+        agent_types = [AgentType.TUTOR, AgentType.DEBUG, AgentType.MOTIVATION]
+        
+        with patch.object(orchestrator.debugger, "process", side_effect=RuntimeError("boom")):
+            responses = orchestrator.multi_agent_response("help with loops", agent_types)
+        
+        assert list(responses) == ["tutor", "motivation"]
+        history = orchestrator.memory.get_conversation_history()
+        assert [msg.agent_type for msg in history] == ["tutor", "tutor", "motivation", "motivation"]
+    
+    def test_failed_primary_abandons_encouragement(self):
+        llm = SlowLLMService(0.05)
+        orchestrator = Orchestrator(llm, Memory(), max_concurrency=1)
+        
+        # Hold the only slot so the encouragement is still queued
+        orchestrator._slots.acquire()
+        try:
+            with patch.object(orchestrator.debugger, "process", side_effect=RuntimeError("boom")):
+                with pytest.raises(RuntimeError):
+                    orchestrator.smart_assist("I get an error in my code")
+        finally:
+            orchestrator._slots.release()
+        time.sleep(0.1)
+        
+        assert llm.calls == []
+    
+    def test_failed_encouragement_keeps_primary_response(self):
+        orchestrator = Orchestrator(SlowLLMService(0.05), Memory())
+        
+        with patch.object(orchestrator.motivator, "process", side_effect=RuntimeError("boom")):
+            result = orchestrator.smart_assist("I get an error in my code")
+        
+        assert result["primary_response"] == "Sure, here you go"
+        assert "encouragement" not in result["additional_support"]
+        history = orchestrator.memory.get_conversation_history()
+        assert [msg.agent_type for msg in history] == ["debug", "debug"]
+
+
+class TestAssessmentGrading:
+    """Test deterministic grading with test cases"""
+    
+    def test_evaluate_code_with_tests_skips_llm(self, orchestrator):
+        feedback = orchestrator.assessor.evaluate_code(
+            "Write add(a, b)",
+            "def add(a, b):\n    return a + b",
+            test_cases=[
+                {"input": "add(1, 2)", "expected_output": 3},
+                {"input": "add(2, 2)", "expected_output": 4},
+            ],
+            review=False
+        )
+        
+        assert feedback["passed_tests"] == 2
+        assert feedback["total_tests"] == 2
+        assert feedback["score"] == 10
+        assert orchestrator.llm_service.calls == []
+        assert orchestrator.memory.get_learning_metric("general").success_rate == 1.0
+
+
+class TestContextBudget:
+    """Test token-budgeted history packing"""
+    
+    def test_oversized_history_entry_is_truncated(self, orchestrator):
+        tutor = orchestrator.tutor
+        script = "\n".join(f"line_{i} = {i}" for i in range(500))
+        tutor.memory.add_message("user", script)
+        tutor.memory.add_message("assistant", "Looks good")
+        
+        messages = tutor._build_messages("what next?")
+        
+        assert len(messages) == 3
+        assert "lines omitted" in messages[0].content
+        assert len(messages[0].content) < len(script) // 2
+        assert tutor.memory.get_recent_messages(2)[0].content == script
+    
+    def test_packs_newest_first_within_budget(self, orchestrator):
+        tutor = orchestrator.tutor
+        tutor.history_token_budget = 50
+        for i in range(6):
+            tutor.memory.add_message("user", f"question {i} " + "x" * 60)
+            tutor.memory.add_message("assistant", f"answer {i} " + "y" * 60)
+        
+        messages = tutor._build_messages("latest", history_count=5)
+        
+        # Each entry is ~17 tokens, so only the newest exchange fits
+        assert [msg.content.split(" ")[0] for msg in messages] == ["question", "answer", "latest"]
+        assert messages[0].content.startswith("question 5")
+    
+    def test_window_opens_with_user_turn(self, orchestrator):
+        tutor = orchestrator.tutor
+        tutor.history_token_budget = 20
+        tutor.memory.add_message("user", "q" * 60)
+        tutor.memory.add_message("assistant", "a" * 60)
+        
+        messages = tutor._build_messages("latest")
+        assert [msg.role for msg in messages] == ["user"]
+    
+    def test_token_counts_are_cached_on_records(self, orchestrator):
+        counted = []
+        orchestrator.llm_service.count_tokens = lambda text: counted.append(text) or len(text) // 4
+        tutor = orchestrator.tutor
+        tutor.memory.add_message("user", "explain loops")
+        tutor.memory.add_message("assistant", "Loops repeat code")
+        
+        tutor._build_messages("first")
+        tutor._build_messages("second")
+        
+        assert len(counted) == 2
+        assert tutor.memory.get_recent_messages(1)[0].token_count == len("Loops repeat code") // 4
+
+
+class TestRollingSummary:
+    """Test folding older turns into the summary"""
+    
+    @pytest.fixture
+    def orchestrator(self):
+        llm = FakeLLMService()
+        summarizer = ConversationSummarizer(llm, window=4, fold_every=4, background=False)
+        return Orchestrator(llm, Memory(), summarizer=summarizer)
+    
+    def test_summary_folds_only_when_window_advances(self, orchestrator):
+        llm = orchestrator.llm_service
+        for i in range(3):
+            orchestrator.process(f"question {i}", AgentType.TUTOR)
+        
+        # 6 messages: only 2 have left the 4-message window, so no fold yet
+        assert len(llm.calls) == 3
+        assert orchestrator.memory.summary == ""
+        
+        orchestrator.process("question 3", AgentType.TUTOR)
+        
+        assert len(llm.calls) == 5
+        assert "question 0" in llm.calls[-1]["messages"][0].content
+        assert orchestrator.memory.summary == "Sure, here you go"
+        assert orchestrator.memory.summarized_through == 4
+    
+    def test_summary_is_injected_into_system_prompt(self, orchestrator):
+        orchestrator.memory.set_summary("Learner is writing a bubble sort", 0)
+        orchestrator.process("why is it slow?", AgentType.TUTOR)
+        
+        assert "Learner is writing a bubble sort" in orchestrator.llm_service.calls[-1]["system_prompt"]
+    
+    def test_failed_fold_is_logged_and_counted(self, orchestrator, caplog):
+        summarizer = orchestrator.summarizer
+        for i in range(8):
+            orchestrator.memory.add_message("user", f"question {i}")
+        
+        with patch.object(orchestrator.llm_service, "generate", side_effect=RuntimeError("quota")):
+            assert summarizer.maybe_update(orchestrator.memory)
+        
+        assert summarizer.failures == 1
+        assert "summary update failed" in caplog.text
+        assert orchestrator.memory.summary == ""
+    
+    def test_default_window_matches_longest_agent_history(self):
+        orchestrator = Orchestrator(FakeLLMService(), Memory())
+        longest = max(agent.history_count for agent in orchestrator.agents.values())
+        
+        assert orchestrator.summarizer.window == 2 * longest == 10
+
+
+# Held-out messages (not in INTENT_EXAMPLES) with the agent that should answer
+ROUTING_CASES = [
+    ("how do I fix a KeyError", "debug"),
+    ("I am stuck on this error", "debug"),
+    ("why does my test fail", "debug"),
+    ("I get a ZeroDivisionError in my average function", "debug"),
+    ("my function returns None but it should return a list", "debug"),
+    ("the program crashes when the input is empty", "debug"),
+    ("why is my output off by one", "debug"),
+    ("can you help me fix this IndexError", "debug"),
+    ("I'm stuck, my loop never ends", "debug"),
+    ("how do I get rid of this AttributeError", "debug"),
+    ("explain how generators work", "tutor"),
+    ("what is a closure", "tutor"),
+    ("how do dictionaries work in python", "tutor"),
+    ("teach me about list slicing", "tutor"),
+    ("what's the difference between a set and a list", "tutor"),
+    ("how do I open a file in python", "tutor"),
+    ("when should I use a class instead of a function", "tutor"),
+    ("can you show me an example of inheritance", "tutor"),
+    ("what does the with statement do", "tutor"),
+    ("explain what an exception is", "tutor"),
+    ("quiz me on decorators", "assessment"),
+    ("give me a practice problem on recursion", "assessment"),
+    ("can you grade my solution", "assessment"),
+    ("test me on string methods", "assessment"),
+    ("I want a challenge about sorting", "assessment"),
+    ("check whether my answer is correct", "assessment"),
+    ("give me an exercise with dictionaries", "assessment"),
+    ("I'm really frustrated, nothing makes sense", "motivation"),
+    ("I want to give up on programming", "motivation"),
+    ("I finally got my program working!", "motivation"),
+    ("how is my progress so far", "motivation"),
+    ("I feel like I'm too slow at learning this", "motivation"),
+    ("coding is too hard for me", "motivation"),
+    ("I'm exhausted and losing confidence", "motivation"),
+]
+
+
+class TestIntentRouting:
+    """Test embedding-based intent detection"""
+    
+    @pytest.mark.parametrize("message, expected", [
+        ("why does my test fail", AgentType.DEBUG),
+        ("I get a ZeroDivisionError in my average function", AgentType.DEBUG),
+        ("explain how generators work", AgentType.TUTOR),
+        ("quiz me on decorators", AgentType.ASSESSMENT),
+        ("I'm really frustrated, nothing makes sense", AgentType.MOTIVATION),
+        ("how do I fix a KeyError", AgentType.DEBUG),
+        ("I am stuck on this error", AgentType.DEBUG),
+    ])
+    def test_routes_by_meaning(self, orchestrator, message, expected):
+        assert orchestrator._detect_intent(message) == expected
+    
+    def test_accuracy_not_worse_than_keywords(self, orchestrator):
+        routed = sum(
+            orchestrator._detect_intent(message) == AgentType(label)
+            for message, label in ROUTING_CASES
+        )
+        keywords = sum(
+            orchestrator._detect_intent_keywords(message) == AgentType(label)
+            for message, label in ROUTING_CASES
+        )
+        assert routed >= keywords
+        assert routed / len(ROUTING_CASES) >= 0.9
+    
+    def test_unclear_messages_fall_back_to_keywords(self, orchestrator):
+        assert orchestrator.intent_router.route("hello") is None
+        assert orchestrator._detect_intent("hello") == AgentType.TUTOR
+        assert orchestrator._detect_intent("hi\n```\nx = 1\n```", {"has_code": True}) == AgentType.DEBUG
+    
+    def test_router_is_fast(self, orchestrator):
+        router = orchestrator.intent_router
+        start = time.perf_counter()
+        for _ in range(200):
+            router.route("why does my function return None when the list is empty")
+        assert (time.perf_counter() - start) / 200 < 0.001
+    
+    def test_emotion_detection_shares_keyword_matcher(self, orchestrator):
+        motivator = orchestrator.motivator
+        with patch.object(motivator, "handle_frustration", return_value="frustration") as frustrated, \
+                patch.object(motivator, "celebrate_achievement", return_value="celebrate") as celebrate:
+            assert motivator.detect_emotion_from_message("I'm STUCK on this") == "frustration"
+            assert motivator.detect_emotion_from_message("yay it works") == "celebrate"
+        assert frustrated.call_count == 1 and celebrate.call_count == 1
+
+
+
+class TestSystemPromptAssembly:
+    """Test stable prompt prefixes for provider prompt caching"""
+    
+    def test_tutor_prefix_is_shared_across_learners(self, orchestrator):
+        tutor = orchestrator.tutor
+        first = tutor._enhance_prompt_with_context(
+            {"learning_style": "visual", "pace": "slow", "accessibility_needs": ["adhd"], "current_topic": "loops"}, None
+        )
+        second = tutor._enhance_prompt_with_context(
+            {"learning_style": "visual", "pace": "slow", "accessibility_needs": ["adhd"], "weak_topics": ["recursion"]}, None
+        )
+        
+        assert first.prefix is second.prefix
+        assert first.suffix == "\n\nCurrent topic focus: loops"
+        assert second.suffix == "\n\nTopics needing more practice: recursion"
+    
+    def test_summary_goes_in_volatile_suffix(self, orchestrator):
+        orchestrator.memory.set_summary("Learner is writing a bubble sort", 0)
+        orchestrator.process("explain recursion", AgentType.DEBUG)
+        
+        prompt = orchestrator.llm_service.calls[-1]["system_prompt"]
+        assert prompt.prefix == orchestrator.debugger.SYSTEM_PROMPT
+        assert "bubble sort" in prompt.suffix
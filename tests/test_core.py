@@ -2,9 +2,14 @@
 Basic tests for CodeMentor AI components
 """
 
+import mmap
+import threading
+
 import pytest
-from core.code_sandbox import CodeSandbox, execute_code
-from core.memory import Memory, UserProfile, LearningMetric
+from core.code_sandbox import CodeSandbox, CompileCache, execute_code
+from core.sandbox_pool import SandboxWorkerPool
+from core.keyword_matcher import KeywordMatcher
+from core.memory import ConversationMessage, Memory, MessageRecord, UserProfile, LearningMetric
 from datetime import datetime
 
 
@@ -46,6 +51,15 @@ print(result)
         
         assert result.success is False
         assert "ZeroDivisionError" in result.error or "division" in result.error.lower()
+    
+    def test_runs_do_not_share_state(self):
+        """Test each run gets a fresh namespace from the shared template"""
+        sandbox = CodeSandbox()
+        assert sandbox.execute("leaked = 1").success is True
+        
+        result = sandbox.execute("print(leaked)")
+        assert result.success is False
+        assert "NameError" in result.error
 
 
 class TestMemory:
@@ -102,6 +116,83 @@ class TestMemory:
         
         weak = memory.get_weak_topics(threshold=0.5)
         assert "topic2" in weak
+    
+    def test_history_evicts_oldest_at_capacity(self):
+        """Test the ring buffer keeps only the newest max_history messages"""
+        memory = Memory(max_history=3)
+        for i in range(5):
+            memory.add_message("user", f"msg {i}")
+        
+        history = memory.get_conversation_history()
+        assert [m.content for m in history] == ["msg 2", "msg 3", "msg 4"]
+    
+    def test_recent_messages_view(self):
+        """Test the last-N view supports indexing, slicing and sees new appends"""
+        memory = Memory(max_history=10)
+        for i in range(6):
+            memory.add_message("user", f"msg {i}")
+        
+        recent = memory.get_recent_messages(3)
+        assert len(recent) == 3
+        assert recent[0].content == "msg 3"
+        assert recent[-1].content == "msg 5"
+        assert [m.content for m in recent[1:]] == ["msg 4", "msg 5"]
+        
+        memory.add_message("user", "msg 6")
+        assert [m.content for m in recent] == ["msg 4", "msg 5", "msg 6"]
+        
+        with pytest.raises(IndexError):
+            recent[3]
+    
+    def test_history_materializes_pydantic_models(self):
+        """Test records are stored internally and converted at the API boundary"""
+        memory = Memory()
+        memory.add_message("user", "Hello", agent_type="tutor")
+        
+        assert isinstance(memory.get_recent_messages(1)[0], MessageRecord)
+        message = memory.get_conversation_history()[0]
+        assert isinstance(message, ConversationMessage)
+        assert message.agent_type == "tutor"
+    
+    def test_json_round_trip(self, tmp_path):
+        """Test saving and loading history through JSON"""
+        memory = Memory()
+        memory.add_message("user", "Hello", agent_type="tutor")
+        memory.add_message("assistant", "Hi there!", agent_type="tutor")
+        path = str(tmp_path / "memory.json")
+        memory.save_to_json(path)
+        
+        restored = Memory()
+        restored.load_from_json(path)
+        assert list(restored.conversation_history) == list(memory.conversation_history)
+    
+    def test_unsummarized_messages_outside_window(self):
+        """Test which messages are pending summarization"""
+        memory = Memory(max_history=10)
+        for i in range(8):
+            memory.add_message("user", f"msg {i}")
+        
+        assert [m.content for m in memory.get_unsummarized(window=5)] == ["msg 0", "msg 1", "msg 2"]
+        
+        memory.set_summary("first three", 3)
+        assert memory.get_unsummarized(window=5) == []
+        
+        memory.add_message("user", "msg 8")
+        assert [m.content for m in memory.get_unsummarized(window=5)] == ["msg 3"]
+    
+    def test_summary_survives_json_round_trip(self, tmp_path):
+        """Test the summary and its coverage are saved with the history"""
+        memory = Memory(max_history=4)
+        for i in range(6):
+            memory.add_message("user", f"msg {i}")
+        memory.set_summary("covers msg 0-2", 3)
+        path = str(tmp_path / "memory.json")
+        memory.save_to_json(path)
+        
+        restored = Memory(max_history=4)
+        restored.load_from_json(path)
+        assert restored.summary == "covers msg 0-2"
+        assert [m.content for m in restored.get_unsummarized(window=1)] == ["msg 3", "msg 4"]
 
 
 class TestSandboxValidation:
@@ -122,5 +213,210 @@ class TestSandboxValidation:
         assert error is not None
 
 
+class TestCompileCache:
+    """Test the restricted bytecode cache"""
+    
+    def test_repeated_source_hits_cache(self):
+        cache = CompileCache()
+        first = cache.compile("x = 1")
+        second = cache.compile("x = 1")
+        
+        assert first is second
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+    
+    def test_syntax_errors_are_cached(self):
+        cache = CompileCache()
+        for _ in range(2):
+            with pytest.raises(SyntaxError):
+                cache.compile("if True print('missing colon')")
+        
+        assert cache.stats()["hits"] == 1
+    
+    def test_lru_bound(self):
+        cache = CompileCache(max_entries=2)
+        cache.compile("a = 1")
+        cache.compile("b = 2")
+        cache.compile("c = 3")
+        
+        assert cache.stats()["entries"] == 2
+
+
+class TestBatchedTestRunner:
+    """Test running submissions against input/expected_output cases"""
+    
+    SUBMISSION = "def add(a, b):\n    return a + b\n\ndef greet(name):\n    print('Hi ' + name)"
+    
+    def test_all_cases_in_one_run(self):
+        sandbox = CodeSandbox()
+        result = sandbox.run_tests(self.SUBMISSION, [
+            {"input": "add(2, 3)", "expected_output": 5},
+            {"input": "add('a', 'b')", "expected_output": "ab"},
+            {"input": "greet('Ada')", "expected_output": "Hi Ada"},
+            {"input": "add(1, 1)", "expected_output": 3},
+        ])
+        
+        assert result.success is True
+        assert [case.passed for case in result.cases] == [True, True, True, False]
+        assert result.passed == 3
+        assert result.total == 4
+    
+    def test_case_errors_are_reported(self):
+        sandbox = CodeSandbox()
+        result = sandbox.run_tests(self.SUBMISSION, [
+            {"input": "add(1)", "expected_output": 1},
+            {"input": "add(1,", "expected_output": 1},
+        ])
+        
+        assert result.passed == 0
+        assert "TypeError" in result.cases[0].error
+        assert "Syntax Error" in result.cases[1].error
+    
+    def test_broken_submission_fails_every_case(self):
+        sandbox = CodeSandbox()
+        result = sandbox.run_tests("def add(a, b)\n    return a + b", [
+            {"input": "add(1, 2)", "expected_output": 3},
+        ])
+        
+        assert result.success is False
+        assert result.cases[0].passed is False
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = SandboxWorkerPool(size=1, cpu_time_limit=1)
+    yield pool
+    pool.close()
+
+
+class TestProcessSandbox:
+    """Test the process-pool execution backend"""
+    
+    def test_executes_in_worker(self, pool):
+        sandbox = CodeSandbox(backend="process", pool=pool)
+        result = sandbox.execute("import math\ntotal = 0\nfor i in range(3):\n    total += i\nprint(total, math.sqrt(16))")
+        
+        assert result.success is True
+        assert "3 4.0" in result.output
+    
+    def test_wall_clock_timeout_respawns_worker(self, pool):
+        sandbox = CodeSandbox(timeout=0.3, backend="process", pool=pool)
+        restarts = pool.restarts
+        
+        result = sandbox.execute("while True:\n    pass")
+        
+        assert result.success is False
+        assert pool.restarts == restarts + 1
+        assert sandbox.execute("print('still alive')").output == "still alive\n"
+    
+    def test_cpu_limit_kills_runaway_code(self, pool):
+        sandbox = CodeSandbox(timeout=10, backend="process", pool=pool)
+        result = sandbox.execute("while True:\n    pass")
+        
+        assert result.success is False
+        assert "limit" in result.error
+    
+    def test_disallowed_import(self, pool):
+        sandbox = CodeSandbox(backend="process", pool=pool)
+        result = sandbox.execute("import os")
+        
+        assert result.success is False
+        assert "ImportError" in result.error
+    
+    def test_large_suite_is_split_across_workers(self, pool):
+        sandbox = CodeSandbox(backend="process", pool=pool)
+        cases = [{"input": f"square({i})", "expected_output": i * i} for i in range(60)]
+        result = sandbox.run_tests("def square(x):\n    return x * x", cases, chunk_size=25)
+        
+        assert result.total == 60
+        assert result.passed == 60
+        assert [case.index for case in result.cases] == list(range(60))
+    
+    def test_memory_limit_ignores_threaded_parent(self):
+        # A busy app process: many threads plus 1 GB of reserved address space
+        stop = threading.Event()
+        threads = [threading.Thread(target=stop.wait) for _ in range(40)]
+        for thread in threads:
+            thread.start()
+        reserved = mmap.mmap(-1, 1 << 30)
+        
+        pool = SandboxWorkerPool(size=1, memory_limit_mb=256)
+        try:
+            sandbox = CodeSandbox(backend="process", pool=pool)
+            fits = sandbox.execute("x = [0] * (10 ** 7)\nprint(len(x))")
+            too_big = sandbox.execute("x = [0] * (10 ** 9)")
+        finally:
+            pool.close()
+            reserved.close()
+            stop.set()
+            for thread in threads:
+                thread.join()
+        
+        assert fits.success is True
+        assert fits.output == "10000000\n"
+        assert too_big.success is False
+        assert "MemoryError" in too_big.error
+    
+    def test_no_free_worker_times_out(self, pool):
+        sandbox = CodeSandbox(timeout=0.2, backend="process", pool=pool)
+        worker = pool._idle.get()
+        try:
+            result = sandbox.execute("print('queued')")
+        finally:
+            pool._idle.put(worker)
+        
+        assert result.success is False
+        assert "timed out" in result.error
+        assert sandbox.execute("print('queued')").output == "queued\n"
+    
+    def test_close_while_busy_stops_worker(self):
+        pool = SandboxWorkerPool(size=1)
+        sandbox = CodeSandbox(timeout=5, backend="process", pool=pool)
+        result = []
+        runner = threading.Thread(
+            target=lambda: result.append(sandbox.execute("for i in range(3000000):\n    pass"))
+        )
+        runner.start()
+        while pool._idle.qsize():
+            pass
+        pool.close()
+        runner.join()
+        
+        assert pool._idle.qsize() == 0
+        assert result[0].success is True
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
+
+
+class TestKeywordMatcher:
+    """Test the single-pass keyword matcher"""
+    
+    def test_finds_overlapping_matches_with_positions(self):
+        matcher = KeywordMatcher({"debug": ["bug", "debug"], "motivation": ["don't understand"], "tutor": ["understand"]})
+        matches = matcher.scan("Debug this, I DON'T UNDERSTAND")
+        
+        found = [(m.category, m.keyword, m.start, m.end) for m in matches]
+        assert ("debug", "debug", 0, 5) in found
+        assert ("debug", "bug", 2, 5) in found
+        assert ("motivation", "don't understand", 14, 30) in found
+        assert ("tutor", "understand", 20, 30) in found
+    
+    def test_agrees_with_substring_search(self):
+        import random
+        
+        keywords = {"a": ["ab", "abc", "bca", "c"], "b": ["abcab", "bc", "cab"]}
+        matcher = KeywordMatcher(keywords)
+        rng = random.Random(0)
+        for _ in range(500):
+            text = "".join(rng.choice("abcx") for _ in range(rng.randint(0, 25)))
+            expected = {c for c, words in keywords.items() if any(w in text for w in words)}
+            assert matcher.categories(text) == expected
+    
+    def test_best_uses_category_priority(self):
+        matcher = KeywordMatcher({"debug": ["error"], "assessment": ["test"], "tutor": ["why"]})
+        assert matcher.best("why does this test raise an error") == "debug"
+        assert matcher.best("why does this test fail", ["tutor"]) == "tutor"
+        assert matcher.best("hello") is None
+
@@ -17,3 +17,223 @@ def test_generate(mock_generate, llm_service):
     result = llm_service.generate([{"role": "user", "content": "test"}])
     assert isinstance(result, str)
     assert len(result) > 0
+
+
+def test_agenerate_runs_concurrently(llm_service):
+    import asyncio
+    import time
+    from core.llm_service import Message
+    
+    async def fake_call(*args, **kwargs):
+        await asyncio.sleep(0.1)
+        return "Async response"
+    
+    async def run_many():
+        messages = [Message(role="user", content="test")]
+        return await asyncio.gather(*[llm_service.agenerate(messages) for _ in range(20)])
+    
+    with patch.object(llm_service, "_agenerate_gemini", side_effect=fake_call):
+        start = time.monotonic()
+        results = asyncio.run(run_many())
+        elapsed = time.monotonic() - start
+    
+    assert results == ["Async response"] * 20
+    assert elapsed < 1.0
+
+
+def test_agenerate_timeout(llm_service):
+    import asyncio
+    from core.llm_service import Message
+    
+    async def slow_call(*args, **kwargs):
+        await asyncio.sleep(5)
+        return "too late"
+    
+    with patch.object(llm_service, "_agenerate_gemini", side_effect=slow_call):
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(llm_service.agenerate(
+                [Message(role="user", content="test")],
+                request_timeout=0.05
+            ))
+
+
+def test_stream_yields_chunks_and_caches_result():
+    from core.llm_service import Message
+    from core.response_cache import InMemoryResponseCache
+    
+    with patch.dict('os.environ', {'GOOGLE_API_KEY': 'dummy'}):
+        service = create_llm_service(provider="gemini", cache=InMemoryResponseCache())
+    messages = [Message(role="user", content="test")]
+    
+    with patch.object(service, "_stream_gemini", return_value=iter(["Hel", "lo"])) as mock_stream:
+        assert list(service.stream(messages)) == ["Hel", "lo"]
+        assert list(service.stream(messages)) == ["Hello"]
+    
+    assert mock_stream.call_count == 1
+
+
+def test_services_share_pooled_clients():
+    from core.client_registry import ClientRegistry
+    
+    registry = ClientRegistry()
+    with patch.dict('os.environ', {'GOOGLE_API_KEY': 'dummy'}):
+        first = create_llm_service(provider="gemini", clients=registry)
+        second = create_llm_service(provider="gemini", clients=registry)
+    with patch.dict('os.environ', {'GOOGLE_API_KEY': 'other'}):
+        other_key = create_llm_service(provider="gemini", clients=registry)
+    
+    assert first.client is second.client
+    assert other_key.client is not first.client
+    assert registry.created == 2
+
+
+def test_async_clients_are_per_event_loop():
+    import asyncio
+    from core.client_registry import ClientRegistry
+    
+    registry = ClientRegistry()
+    
+    async def get_twice():
+        return (
+            registry.get_async_client("openai", "gpt", 4),
+            registry.get_async_client("openai", "gpt", 4)
+        )
+    
+    with patch.object(ClientRegistry, "_build_async_client", side_effect=lambda *args: object()):
+        first, again = asyncio.run(get_twice())
+        other_loop, _ = asyncio.run(get_twice())
+    
+    assert first is again
+    assert other_loop is not first
+
+
+def test_async_clients_are_closed_with_their_loop():
+    import asyncio
+    from core.client_registry import ClientRegistry
+    
+    registry = ClientRegistry()
+    clients = []
+    
+    def build(*args):
+        client = MagicMock()
+        client.close.side_effect = lambda: asyncio.sleep(0)
+        clients.append(client)
+        return client
+    
+    async def use_client():
+        registry.get_async_client("openai", "gpt", 4)
+        return registry.to_dict()["async_loops"]
+    
+    with patch.object(ClientRegistry, "_build_async_client", side_effect=build):
+        assert asyncio.run(use_client()) == 1
+        assert asyncio.run(use_client()) == 1
+    
+    assert registry.to_dict()["async_loops"] == 0
+    assert all(client.close.call_count == 1 for client in clients)
+
+
+def test_clear_closes_async_clients():
+    import asyncio
+    from core.client_registry import ClientRegistry
+    
+    registry = ClientRegistry()
+    
+    async def use_then_clear():
+        client = registry.get_async_client("openai", "gpt", 4)
+        registry.clear()
+        for _ in range(3):
+            await asyncio.sleep(0)
+        return client
+    
+    with patch.object(ClientRegistry, "_build_async_client", side_effect=lambda *args: MagicMock()):
+        client = asyncio.run(use_then_clear())
+    
+    client.close.assert_called_once()
+    assert registry.to_dict()["async_loops"] == 0
+
+
+def test_gemini_async_calls_use_the_loop_client(llm_service):
+    import asyncio
+    from types import SimpleNamespace
+    from core.client_registry import ClientRegistry
+    from core.llm_service import Message
+    
+    models = []
+    
+    def build(provider, model, pool_size):
+        chat = MagicMock()
+        chat.send_message_async.side_effect = lambda *args, **kwargs: asyncio.sleep(0, SimpleNamespace(text="Async response"))
+        model = MagicMock()
+        model.start_chat.return_value = chat
+        models.append(model)
+        return model
+    
+    llm_service.clients = ClientRegistry()
+    messages = [Message(role="user", content="test")]
+    with patch.object(ClientRegistry, "_build_async_client", side_effect=build):
+        assert asyncio.run(llm_service.agenerate(messages, use_cache=False)) == "Async response"
+        assert asyncio.run(llm_service.agenerate(messages, use_cache=False)) == "Async response"
+    
+    # Gemini's async channel is bound to a loop, so each loop gets its own model
+    assert len(models) == 2
+    assert all(model.start_chat.call_count == 1 for model in models)
+
+
+def _anthropic_service(client):
+    from core.llm_service import LLMService
+    
+    registry = MagicMock()
+    registry.get_client.return_value = client
+    return LLMService(provider="anthropic", model="claude-3-5-sonnet-20241022", clients=registry)
+
+
+def test_anthropic_system_marks_stable_prefix_for_caching():
+    from core.llm_service import SystemPrompt
+    
+    service = _anthropic_service(MagicMock())
+    stable = "You are a tutor. " * 300
+    prompt = SystemPrompt(stable, "\n\nCurrent topic focus: loops")
+    assert prompt == stable + "\n\nCurrent topic focus: loops"
+    assert service._anthropic_system(prompt) == [
+        {"type": "text", "text": stable, "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": "\n\nCurrent topic focus: loops"}
+    ]
+    assert service._anthropic_system("plain") == "plain"
+    assert service._anthropic_system(None) == ""
+
+
+def test_anthropic_short_prefix_is_sent_unmarked():
+    from core.llm_service import SystemPrompt
+    
+    service = _anthropic_service(MagicMock())
+    prompt = SystemPrompt("You are a tutor.", "\n\nCurrent topic focus: loops")
+    # Below the provider's minimum, cache_control would never be honoured
+    assert service._anthropic_system(prompt) == "You are a tutor.\n\nCurrent topic focus: loops"
+
+
+def test_anthropic_cache_reads_are_counted():
+    from types import SimpleNamespace
+    from core.llm_service import Message, SystemPrompt
+    
+    client = MagicMock()
+    client.messages.create.side_effect = [
+        SimpleNamespace(
+            content=[SimpleNamespace(text="first")],
+            usage=SimpleNamespace(input_tokens=20, cache_creation_input_tokens=1200, cache_read_input_tokens=0)
+        ),
+        SimpleNamespace(
+            content=[SimpleNamespace(text="second")],
+            usage=SimpleNamespace(input_tokens=20, cache_creation_input_tokens=0, cache_read_input_tokens=1200)
+        ),
+    ]
+    service = _anthropic_service(client)
+    prompt = SystemPrompt("You are a tutor. " * 300, "\n\nCurrent topic focus: loops")
+    messages = [Message(role="user", content="explain loops")]
+    
+    assert service.generate(messages, system_prompt=prompt) == "first"
+    assert service.generate(messages, system_prompt=prompt.with_suffix(" and lists")) == "second"
+    
+    system = client.messages.create.call_args.kwargs["system"]
+    assert system[0]["cache_control"] == {"type": "ephemeral"}
+    assert service.prompt_cache_writes == 1200
+    assert service.prompt_cache_reads == 1200
@@ -0,0 +1,195 @@
+"""
+Tests for multi-provider LLM routing
+"""
+
+import asyncio
+import time
+import pytest
+from unittest.mock import patch
+from core.llm_router import LLMRouter, ProviderStats, create_llm_router
+from core.llm_service import LLMProvider, Message
+from core.request_scheduler import Priority
+from core.response_cache import InMemoryResponseCache
+
+
+class FakeService:
+    """Minimal LLMService stand-in with scripted behaviour"""
+    
+    def __init__(self, provider, reply="ok", delay=0.0, error=None):
+        self.provider = provider
+        self.model = f"{provider}-model"
+        self.temperature = 0.7
+        self.max_tokens = 100
+        self.reply = reply
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+    
+    def generate(self, messages, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.reply
+    
+    async def agenerate(self, messages, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.reply
+    
+    def stream(self, messages, **kwargs):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        yield from self.reply.split(" ")
+    
+    def count_tokens_many(self, texts):
+        return [len(text) for text in texts]
+
+
+MESSAGES = [Message(role="user", content="hello")]
+
+
+def warm(router, service, latency, samples=10):
+    stats = router.stats[router._name(service)]
+    for _ in range(samples):
+        stats.record_success(latency)
+
+
+class TestRouting:
+    """Test ranking and failover"""
+    
+    def test_prefers_first_service_until_measured(self):
+        first, second = FakeService("gemini", "a"), FakeService("openai", "b")
+        router = LLMRouter([first, second], hedge=False)
+        assert router.generate(MESSAGES) == "a"
+        assert second.calls == 0
+    
+    def test_ranks_by_latency_and_cost(self):
+        slow, fast = FakeService("gemini"), FakeService("openai")
+        router = LLMRouter([slow, fast], hedge=False)
+        warm(router, slow, 3.0)
+        warm(router, fast, 1.0)
+        assert router.ranked() == [fast, slow]
+        
+        router.costs = {"openai": 5.0}
+        assert router.ranked() == [slow, fast]
+    
+    def test_fails_over_on_error(self):
+        broken = FakeService("gemini", error=RuntimeError("down"))
+        backup = FakeService("openai", "backup")
+        router = LLMRouter([broken, backup], hedge=False)
+        
+        assert router.generate(MESSAGES) == "backup"
+        assert router.stats["gemini:gemini-model"].failures == 1
+    
+    def test_raises_last_error_when_all_fail(self):
+        router = LLMRouter([
+            FakeService("gemini", error=RuntimeError("one")),
+            FakeService("openai", error=RuntimeError("two"))
+        ], hedge=False)
+        with pytest.raises(RuntimeError, match="two"):
+            router.generate(MESSAGES)
+    
+    def test_circuit_breaker_skips_failing_provider(self):
+        broken = FakeService("gemini", error=RuntimeError("down"))
+        backup = FakeService("openai", "backup")
+        router = LLMRouter([broken, backup], hedge=False)
+        warm(router, backup, 60.0)
+        
+        stats = router.stats["gemini:gemini-model"]
+        for _ in range(stats.failure_threshold):
+            stats.record_failure()
+        assert not stats.available
+        assert router.ranked() == [backup, broken]
+        
+        assert router.generate(MESSAGES) == "backup"
+        assert broken.calls == 0
+    
+    def test_stream_fails_over_before_first_chunk(self):
+        broken = FakeService("gemini", error=RuntimeError("down"))
+        backup = FakeService("openai", "hello there")
+        router = LLMRouter([broken, backup])
+        assert list(router.stream(MESSAGES)) == ["hello", "there"]
+    
+    def test_router_cache_short_circuits_providers(self):
+        service = FakeService("gemini", "cached answer")
+        router = LLMRouter([service], cache=InMemoryResponseCache())
+        router.generate(MESSAGES)
+        assert router.generate(MESSAGES) == "cached answer"
+        assert service.calls == 1
+
+
+class TestHedging:
+    """Test hedged interactive requests"""
+    
+    def test_slow_primary_is_hedged(self):
+        slow = FakeService("gemini", "slow", delay=0.5)
+        fast = FakeService("openai", "fast")
+        router = LLMRouter([slow, fast])
+        warm(router, slow, 0.02)
+        warm(router, fast, 0.5)
+        
+        start = time.monotonic()
+        assert router.generate(MESSAGES) == "fast"
+        assert time.monotonic() - start < 0.4
+    
+    def test_background_requests_are_not_hedged(self):
+        slow = FakeService("gemini", "slow", delay=0.1)
+        fast = FakeService("openai", "fast")
+        router = LLMRouter([slow, fast])
+        warm(router, slow, 0.01)
+        warm(router, fast, 0.5)
+        
+        assert router.generate(MESSAGES, priority=Priority.BACKGROUND) == "slow"
+        assert fast.calls == 0
+    
+    def test_async_hedge_cancels_loser(self):
+        slow = FakeService("gemini", "slow", delay=1.0)
+        fast = FakeService("openai", "fast")
+        router = LLMRouter([slow, fast])
+        warm(router, slow, 0.02)
+        warm(router, fast, 0.5)
+        
+        assert asyncio.run(router.agenerate(MESSAGES)) == "fast"
+        # The cancelled request is not counted against the slow provider
+        assert router.stats["gemini:gemini-model"].failures == 0
+    
+    def test_async_fails_over(self):
+        router = LLMRouter([
+            FakeService("gemini", error=RuntimeError("down")),
+            FakeService("openai", "backup")
+        ])
+        assert asyncio.run(router.agenerate(MESSAGES)) == "backup"
+
+
+def test_provider_stats_percentile():
+    stats = ProviderStats()
+    assert stats.percentile(0.95) is None
+    for latency in range(1, 21):
+        stats.record_success(float(latency))
+    assert stats.percentile(0.95) == 20.0
+
+
+def test_create_llm_router_from_env():
+    env = {
+        'GOOGLE_API_KEY': 'dummy',
+        'LLM_PROVIDER': 'gemini',
+        'LLM_FALLBACK_PROVIDERS': 'gemini, gemini',
+        'LLM_PROVIDER_COSTS': 'gemini=0.5'
+    }
+    with patch.dict('os.environ', env):
+        router = create_llm_router()
+    assert [service.provider for service in router.services] == ["gemini"]
+    assert router.costs == {"gemini": 0.5}
+
+
+def test_costs_apply_to_llm_services():
+    with patch.dict('os.environ', {'GOOGLE_API_KEY': 'dummy'}):
+        router = create_llm_router(providers=[LLMProvider.GEMINI], costs={"gemini": 2.0})
+    service = router.services[0]
+    
+    assert router._name(service) == f"gemini:{service.model}"
+    assert router._score(service) == pytest.approx(router.default_latency + router.cost_weight * 2.0)
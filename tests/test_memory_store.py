@@ -0,0 +1,298 @@
+"""
+Tests for persistent memory stores
+"""
+
+import asyncio
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from core.memory import AsyncMemoryManager, Memory, MemoryManager, ShardedMemoryManager, UserProfile
+from core.memory_store import JournalMemoryStore, MemoryStore, SQLiteMemoryStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteMemoryStore(str(tmp_path / "memory.sqlite3"))
+    yield store
+    store.close()
+
+
+class TestSQLiteMemoryStore:
+    """Test SQLite write-through persistence"""
+    
+    def test_session_survives_restart(self, tmp_path):
+        path = str(tmp_path / "memory.sqlite3")
+        
+        store = SQLiteMemoryStore(path)
+        memory = MemoryManager(store=store).get_or_create_session("ada")
+        memory.set_user_profile(UserProfile(user_id="ada", learning_style="visual"))
+        memory.add_message("user", "explain loops", agent_type="tutor")
+        memory.add_message("assistant", "Loops repeat code", agent_type="tutor")
+        memory.update_learning_metric("loops", success=True, practice_time=30.0)
+        store.close()
+        
+        restored = MemoryManager(store=SQLiteMemoryStore(path)).get_or_create_session("ada")
+        history = restored.get_conversation_history()
+        assert [msg.content for msg in history] == ["explain loops", "Loops repeat code"]
+        assert history[0].agent_type == "tutor"
+        assert restored.get_user_profile().learning_style == "visual"
+        assert restored.get_user_profile().total_practice_time == 30.0
+        assert restored.get_learning_metric("loops").practice_count == 1
+    
+    def test_metrics_are_upserted(self, store):
+        memory = Memory(store=store, user_id="ada")
+        for success in (True, False, True):
+            memory.update_learning_metric("loops", success=success)
+        
+        metrics = store.load_metrics("ada")
+        assert list(metrics) == ["loops"]
+        assert metrics["loops"].practice_count == 3
+    
+    def test_load_respects_max_history(self, store):
+        memory = Memory(store=store, user_id="ada")
+        for i in range(10):
+            memory.add_message("user", f"message {i}")
+        
+        restored = Memory(max_history=3, store=store, user_id="ada")
+        restored.load_from_store()
+        assert [msg.content for msg in restored.get_conversation_history()] == [
+            "message 7", "message 8", "message 9"
+        ]
+    
+    def test_users_are_isolated(self, store):
+        Memory(store=store, user_id="ada").add_message("user", "hi from ada")
+        Memory(store=store, user_id="bob").add_message("user", "hi from bob")
+        
+        assert [msg.content for msg in store.load_messages("bob")] == ["hi from bob"]
+    
+    def test_store_requires_user_id(self, store):
+        with pytest.raises(ValueError):
+            Memory(store=store)
+    
+    def test_base_class_is_abstract(self):
+        with pytest.raises(TypeError):
+            MemoryStore()
+
+
+class TestJournalMemoryStore:
+    """Test the append-only JSON Lines journal"""
+    
+    def test_session_survives_restart(self, tmp_path):
+        directory = str(tmp_path / "journal")
+        
+        memory = MemoryManager(store=JournalMemoryStore(directory)).get_or_create_session("ada")
+        memory.set_user_profile(UserProfile(user_id="ada", learning_style="visual"))
+        memory.add_message("user", "explain loops", agent_type="tutor")
+        memory.add_message("assistant", "Loops repeat code", agent_type="tutor")
+        memory.update_learning_metric("loops", success=True, practice_time=30.0)
+        
+        restored = MemoryManager(store=JournalMemoryStore(directory)).get_or_create_session("ada")
+        history = restored.get_conversation_history()
+        assert [msg.content for msg in history] == ["explain loops", "Loops repeat code"]
+        assert history[0].agent_type == "tutor"
+        assert restored.get_user_profile().total_practice_time == 30.0
+        assert restored.get_learning_metric("loops").practice_count == 1
+    
+    def test_last_n_reads_from_the_tail(self, tmp_path):
+        store = JournalMemoryStore(str(tmp_path), max_messages=None)
+        memory = Memory(store=store, user_id="ada")
+        for i in range(2000):
+            memory.add_message("user", f"message {i}")
+        
+        assert [msg.content for msg in store.load_messages("ada", last_n=3)] == [
+            "message 1997", "message 1998", "message 1999"
+        ]
+        assert len(store.load_messages("ada")) == 2000
+    
+    def test_state_is_compacted_into_snapshot(self, tmp_path):
+        store = JournalMemoryStore(str(tmp_path), compact_every=5)
+        memory = Memory(store=store, user_id="ada")
+        for i in range(12):
+            memory.update_learning_metric("loops" if i % 2 else "lists", success=True)
+        
+        with open(store._path("ada", "state")) as f:
+            assert len(f.readlines()) == 3  # Snapshot plus two deltas
+        
+        metrics = store.load_metrics("ada")
+        assert metrics["loops"].practice_count == 6
+        assert metrics["lists"].practice_count == 6
+    
+    def test_message_journal_is_trimmed(self, tmp_path):
+        store = JournalMemoryStore(str(tmp_path), compact_every=5, max_messages=10)
+        memory = Memory(store=store, user_id="ada")
+        for i in range(23):
+            memory.add_message("user", f"message {i}")
+        
+        with open(store._path("ada", "messages")) as f:
+            assert len(f.readlines()) == 13  # Trimmed to 10 at 15 and 20 lines
+        assert [msg.content for msg in store.load_messages("ada")] == [f"message {i}" for i in range(10, 23)]
+        
+        # A new process picks up the existing line count
+        store = JournalMemoryStore(str(tmp_path), compact_every=5, max_messages=10)
+        Memory(store=store, user_id="ada").add_message("user", "message 23")
+        Memory(store=store, user_id="ada").add_message("user", "message 24")
+        assert len(store.load_messages("ada")) == 10
+    
+    def test_torn_final_line_is_skipped(self, tmp_path):
+        store = JournalMemoryStore(str(tmp_path))
+        Memory(store=store, user_id="ada").add_message("user", "first")
+        with open(store._path("ada", "messages"), "a") as f:
+            f.write('{"role": "user", "cont')
+        
+        assert [msg.content for msg in store.load_messages("ada", last_n=5)] == ["first"]
+        
+        # A new process terminates the torn line before appending
+        store = JournalMemoryStore(str(tmp_path))
+        Memory(store=store, user_id="ada").add_message("user", "second")
+        assert [msg.content for msg in store.load_messages("ada")] == ["first", "second"]
+
+
+class TestBoundedMemoryManager:
+    """Test LRU/idle eviction with spill to the store"""
+    
+    def test_lru_session_is_evicted_and_rehydrated(self, store):
+        manager = MemoryManager(store=store, max_sessions=2)
+        manager.get_or_create_session("ada").add_message("user", "hi from ada")
+        manager.get_or_create_session("bob")
+        manager.get_or_create_session("ada")  # ada is now most recent
+        manager.get_or_create_session("cy")
+        
+        assert list(manager.sessions) == ["ada", "cy"]
+        assert manager.stats.evictions == 1
+        
+        manager.get_or_create_session("bob")
+        ada = manager.get_or_create_session("ada")
+        assert [msg.content for msg in ada.get_conversation_history()] == ["hi from ada"]
+        assert manager.stats.resident == 2
+        assert manager.stats.rehydrations == 5
+    
+    def test_idle_sessions_are_evicted(self, store, monkeypatch):
+        clock = [1000.0]
+        monkeypatch.setattr("core.memory.time.monotonic", lambda: clock[0])
+        manager = MemoryManager(store=store, idle_timeout=60)
+        manager.get_or_create_session("ada")
+        manager.get_or_create_session("bob")
+        
+        clock[0] += 30
+        manager.get_or_create_session("bob")
+        clock[0] += 45
+        
+        assert manager.evict_idle() == 1
+        assert list(manager.sessions) == ["bob"]
+        assert manager.stats.idle_evictions == 1
+    
+    def test_profile_edits_are_saved_on_eviction(self, store):
+        manager = MemoryManager(store=store, max_sessions=1)
+        ada = manager.get_or_create_session("ada")
+        ada.set_user_profile(UserProfile(user_id="ada"))
+        ada.get_user_profile().current_topic = "recursion"
+        
+        manager.get_or_create_session("bob")
+        assert manager.get_or_create_session("ada").get_user_profile().current_topic == "recursion"
+    
+    def test_session_held_across_eviction_is_handed_back(self, store):
+        manager = MemoryManager(store=store, max_sessions=1)
+        stale = manager.get_or_create_session("ada")
+        stale.update_learning_metric("loops", success=True)
+        manager.get_or_create_session("bob")  # evicts ada mid-request
+        
+        fresh = manager.get_or_create_session("ada")
+        fresh.update_learning_metric("loops", success=False)
+        # The in-flight request keeps writing after the new one started
+        stale.update_learning_metric("loops", success=True)
+        
+        assert fresh is stale
+        assert manager.stats.rehydrations == 2
+        assert store.load_metrics("ada")["loops"].practice_count == 3
+
+
+class TestConcurrentMemoryManager:
+    """Stress the sharded manager and per-session locks from many workers"""
+    
+    USERS = 2000
+    ROUNDS = 5
+    
+    def _hammer(self, manager, user_index: int) -> None:
+        for _ in range(self.ROUNDS):
+            memory = manager.get_or_create_session(f"user{user_index}")
+            memory.update_learning_metric("loops", success=True)
+            memory.update_learning_metric("shared", success=user_index % 2 == 0)
+            memory.add_message("user", f"hello from {user_index}")
+    
+    def test_no_lost_updates_across_threads(self):
+        manager = ShardedMemoryManager(shards=8)
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            # Every user is touched by several workers at once
+            list(pool.map(lambda i: self._hammer(manager, i % self.USERS), range(self.USERS * 3)))
+        
+        assert len(manager) == self.USERS
+        for i in range(self.USERS):
+            memory = manager.get_session(f"user{i}")
+            assert memory.get_learning_metric("loops").practice_count == 3 * self.ROUNDS
+            assert memory.get_learning_metric("shared").practice_count == 3 * self.ROUNDS
+            assert len(memory.get_conversation_history()) == 3 * self.ROUNDS
+    
+    def test_store_writes_are_serialized_per_session(self, store):
+        manager = ShardedMemoryManager(store=store, shards=4)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda i: self._hammer(manager, i % 50), range(200)))
+        
+        assert manager.stats.rehydrations == 50
+        metrics = store.load_metrics("user7")
+        assert metrics["loops"].practice_count == 4 * self.ROUNDS
+    
+    def test_async_sessions_share_one_memory(self, store):
+        manager = AsyncMemoryManager(store=store, shards=4)
+        
+        async def handle(user_id: str):
+            async with manager.session_lock(user_id):
+                memory = await manager.get_or_create_session(user_id)
+                seen = len(memory.get_conversation_history())
+                await asyncio.sleep(0)  # Stand-in for the LLM call
+                memory.add_message("user", f"turn {seen}")
+        
+        async def main():
+            await asyncio.gather(*(handle(f"user{i % 20}") for i in range(200)))
+        
+        asyncio.run(main())
+        
+        for i in range(20):
+            history = store.load_messages(f"user{i}")
+            # Each turn saw every earlier turn, so none raced
+            assert [msg.content for msg in history] == [f"turn {n}" for n in range(10)]
+        assert manager.stats.rehydrations == 20
+    
+    def test_event_loop_runs_while_shard_lock_is_held(self):
+        manager = AsyncMemoryManager(shards=1)
+        resident = manager.manager.get_or_create_session("ada")
+        shard = manager.manager.shards[0]
+        
+        def hold_lock():
+            # e.g. another worker rehydrating a session from a slow store
+            with shard._lock:
+                time.sleep(0.3)
+        
+        async def main():
+            ticks = 0
+            
+            async def tick():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+            
+            holder = threading.Thread(target=hold_lock)
+            holder.start()
+            await asyncio.sleep(0.01)
+            ticker = asyncio.create_task(tick())
+            memory = await manager.get_or_create_session("ada")
+            summary = await manager.end_session("ada")
+            ticker.cancel()
+            holder.join()
+            return memory, summary, ticks
+        
+        memory, summary, ticks = asyncio.run(main())
+        assert memory is resident
+        assert summary is not None
+        assert ticks >= 10
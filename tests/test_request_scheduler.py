@@ -0,0 +1,173 @@
+"""
+Tests for the LLM request scheduler
+"""
+
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from core.llm_service import LLMProvider, create_llm_service, Message
+from core.request_scheduler import (
+    Priority,
+    QueueFullError,
+    RequestScheduler,
+    RetryPolicy,
+    get_scheduler,
+    is_retryable
+)
+
+
+class RateLimitError(Exception):
+    """Stand-in for a provider 429"""
+    status_code = 429
+
+
+FAST_RETRY = RetryPolicy(max_retries=3, base_delay=0.001, max_delay=0.01)
+
+
+class TestRetries:
+    """Test backoff on retryable errors"""
+    
+    def test_retryable_errors_are_retried(self):
+        scheduler = RequestScheduler(retry=FAST_RETRY)
+        attempts = []
+        
+        def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise RateLimitError()
+            return "ok"
+        
+        assert scheduler.call(flaky) == "ok"
+        assert len(attempts) == 3
+        assert scheduler.retries == 2
+    
+    def test_other_errors_raise_immediately(self):
+        scheduler = RequestScheduler(retry=FAST_RETRY)
+        attempts = []
+        
+        def broken():
+            attempts.append(1)
+            raise ValueError("bad request")
+        
+        with pytest.raises(ValueError):
+            scheduler.call(broken)
+        assert len(attempts) == 1
+    
+    def test_gives_up_after_max_retries(self):
+        scheduler = RequestScheduler(retry=FAST_RETRY)
+        with pytest.raises(RateLimitError):
+            scheduler.call(lambda: (_ for _ in ()).throw(RateLimitError()))
+        assert scheduler.retries == 3
+    
+    def test_classification(self):
+        assert is_retryable(RateLimitError())
+        assert is_retryable(TimeoutError())
+        assert not is_retryable(KeyError("x"))
+    
+    def test_stream_retries_only_before_first_chunk(self):
+        scheduler = RequestScheduler(retry=FAST_RETRY)
+        opened = []
+        
+        def open_stream():
+            opened.append(1)
+            if len(opened) == 1:
+                raise RateLimitError()
+            yield "Hel"
+            yield "lo"
+        
+        assert list(scheduler.stream(open_stream)) == ["Hel", "lo"]
+        assert len(opened) == 2
+
+
+class TestAdmission:
+    """Test rate limiting, priorities and the bounded queue"""
+    
+    def test_request_rate_is_limited(self):
+        # 1200/min with no burst: one request every 50ms
+        scheduler = RequestScheduler(requests_per_minute=1200, burst=1)
+        start = time.monotonic()
+        for _ in range(5):
+            scheduler.call(lambda: None)
+        assert time.monotonic() - start >= 0.19
+    
+    def test_token_rate_is_limited(self):
+        scheduler = RequestScheduler(tokens_per_minute=6000)
+        scheduler.call(lambda: None, tokens=6000)
+        
+        start = time.monotonic()
+        scheduler.call(lambda: None, tokens=10)  # Needs 100ms of refill
+        assert time.monotonic() - start >= 0.09
+    
+    def test_interactive_requests_jump_background_queue(self):
+        scheduler = RequestScheduler(max_concurrency=1)
+        release = threading.Event()
+        order = []
+        
+        blocker = threading.Thread(target=scheduler.call, args=(release.wait,))
+        blocker.start()
+        while scheduler.active == 0:
+            time.sleep(0.001)
+        
+        threads = [
+            threading.Thread(target=scheduler.call, args=(lambda: order.append("background"), Priority.BACKGROUND)),
+            threading.Thread(target=scheduler.call, args=(lambda: order.append("interactive"), Priority.INTERACTIVE)),
+        ]
+        for thread in threads:
+            thread.start()
+            while len(scheduler._queue) < threads.index(thread) + 1:
+                time.sleep(0.001)
+        
+        release.set()
+        for thread in [blocker] + threads:
+            thread.join()
+        assert order == ["interactive", "background"]
+    
+    def test_full_queue_rejects(self):
+        scheduler = RequestScheduler(max_concurrency=1, max_queue=1)
+        release = threading.Event()
+        blocker = threading.Thread(target=scheduler.call, args=(release.wait,))
+        blocker.start()
+        while scheduler.active == 0:
+            time.sleep(0.001)
+        waiter = threading.Thread(target=scheduler.call, args=(lambda: None,))
+        waiter.start()
+        while not scheduler._queue:
+            time.sleep(0.001)
+        
+        with pytest.raises(QueueFullError):
+            scheduler.call(lambda: None)
+        
+        release.set()
+        blocker.join()
+        waiter.join()
+    
+    def test_async_calls_share_the_limits(self):
+        scheduler = RequestScheduler(max_concurrency=2)
+        peak = [0]
+        
+        async def call():
+            peak[0] = max(peak[0], scheduler.active)
+            await asyncio.sleep(0.01)
+            return "ok"
+        
+        async def main():
+            return await asyncio.gather(*(scheduler.acall(call) for _ in range(6)))
+        
+        assert asyncio.run(main()) == ["ok"] * 6
+        assert peak[0] == 2
+
+
+def test_llm_service_retries_rate_limits():
+    with patch.dict('os.environ', {'GOOGLE_API_KEY': 'dummy'}):
+        service = create_llm_service(provider="gemini", scheduler=RequestScheduler(retry=FAST_RETRY))
+    
+    with patch.object(service, "_generate_gemini", side_effect=[RateLimitError(), "Recovered"]) as call:
+        assert service.generate([Message(role="user", content="test")]) == "Recovered"
+    assert call.call_count == 2
+
+
+def test_enum_and_string_providers_share_a_scheduler():
+    scheduler = get_scheduler(LLMProvider.OPENAI, "gpt-4-turbo-preview")
+    assert get_scheduler("openai", "gpt-4-turbo-preview") is scheduler
@@ -0,0 +1,177 @@
+"""
+Tests for the LLM response cache
+"""
+
+import time
+import pytest
+from unittest.mock import patch
+from core.llm_service import LLMProvider, create_llm_service, Message
+from core.response_cache import (
+    InMemoryResponseCache,
+    ResponseCache,
+    SQLiteResponseCache,
+    TieredResponseCache,
+    make_cache_key
+)
+
+
+class TestCacheKey:
+    """Test request hashing"""
+    
+    def test_key_is_stable(self):
+        messages = [Message(role="user", content="explain loops")]
+        key1 = make_cache_key("gemini", "m", "sys", messages, 0.7, 100)
+        key2 = make_cache_key("gemini", "m", "sys", [{"role": "user", "content": "explain loops"}], 0.7, 100)
+        assert key1 == key2
+    
+    def test_key_depends_on_parameters(self):
+        messages = [Message(role="user", content="explain loops")]
+        base = make_cache_key("gemini", "m", "sys", messages, 0.7, 100)
+        assert base != make_cache_key("openai", "m", "sys", messages, 0.7, 100)
+        assert base != make_cache_key("gemini", "m", "other", messages, 0.7, 100)
+        assert base != make_cache_key("gemini", "m", "sys", messages, 0.2, 100)
+        assert base != make_cache_key("gemini", "m", "sys", messages, 0.7, 200)
+    
+    def test_enum_and_string_providers_share_keys(self):
+        messages = [Message(role="user", content="explain loops")]
+        assert make_cache_key(LLMProvider.GEMINI, "m", "sys", messages, 0.7, 100) == \
+            make_cache_key("gemini", "m", "sys", messages, 0.7, 100)
+    
+    def test_base_class_is_abstract(self):
+        with pytest.raises(TypeError):
+            ResponseCache()
+
+
+class TestInMemoryResponseCache:
+    """Test LRU + TTL behaviour"""
+    
+    def test_hit_and_miss(self):
+        cache = InMemoryResponseCache()
+        assert cache.get("a") is None
+        cache.set("a", "answer")
+        assert cache.get("a") == "answer"
+        assert cache.stats.hits == 1
+        assert cache.stats.misses == 1
+    
+    def test_lru_eviction(self):
+        cache = InMemoryResponseCache(max_entries=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", "3")
+        
+        assert "a" in cache
+        assert "b" not in cache
+        assert cache.stats.evictions == 1
+    
+    def test_ttl_expiry(self):
+        cache = InMemoryResponseCache(ttl=10)
+        with patch("core.response_cache.time.monotonic", return_value=100.0):
+            cache.set("a", "1")
+        with patch("core.response_cache.time.monotonic", return_value=111.0):
+            assert cache.get("a") is None
+        assert cache.stats.expirations == 1
+
+
+class TestLLMServiceCaching:
+    """Test cache integration in LLMService.generate"""
+    
+    @pytest.fixture
+    def llm_service(self):
+        with patch.dict('os.environ', {'GOOGLE_API_KEY': 'dummy'}):
+            return create_llm_service(provider="gemini", cache=InMemoryResponseCache())
+    
+    def test_repeated_request_served_from_cache(self, llm_service):
+        messages = [Message(role="user", content="explain loops")]
+        with patch.object(llm_service, "_generate_gemini", return_value="Loops repeat") as mock_gen:
+            assert llm_service.generate(messages) == "Loops repeat"
+            assert llm_service.generate(messages) == "Loops repeat"
+        
+        assert mock_gen.call_count == 1
+        assert llm_service.cache.stats.hits == 1
+    
+    def test_opt_out_per_call(self, llm_service):
+        messages = [Message(role="user", content="explain loops")]
+        with patch.object(llm_service, "_generate_gemini", return_value="Loops repeat") as mock_gen:
+            llm_service.generate(messages)
+            llm_service.generate(messages, use_cache=False)
+        
+        assert mock_gen.call_count == 2
+
+
+class TestSQLiteResponseCache:
+    """Test the persistent disk tier"""
+    
+    def test_persists_across_instances(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        cache = SQLiteResponseCache(path)
+        cache.set("a", "answer")
+        cache.close()
+        
+        reopened = SQLiteResponseCache(path)
+        assert reopened.get("a") == "answer"
+    
+    def test_size_cap_evicts_least_recently_used(self, tmp_path):
+        cache = SQLiteResponseCache(str(tmp_path / "cache.sqlite3"), max_entries=2, ttl=None, evict_every=1)
+        with patch("core.response_cache.time.time", side_effect=[1.0, 2.0, 3.0, 4.0]):
+            cache.set("a", "1")
+            cache.set("b", "2")
+            cache.get("a")
+            cache.set("c", "3")
+        
+        assert len(cache) == 2
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+    
+    def test_evicts_in_batches(self, tmp_path):
+        cache = SQLiteResponseCache(str(tmp_path / "cache.sqlite3"), max_entries=10, ttl=None, evict_every=5)
+        with patch("core.response_cache.time.time", side_effect=[float(i) for i in range(20)]):
+            for i in range(20):
+                cache.set(str(i), str(i))
+        
+        # Checked every 5 inserts; over the cap it trims to 6 entries
+        assert len(cache) == 6
+        assert cache.stats.evictions == 14
+        assert cache.get("13") is None
+        assert cache.get("14") == "14"
+    
+    def test_warm_start_loads_hottest_entries(self, tmp_path):
+        disk = SQLiteResponseCache(str(tmp_path / "cache.sqlite3"))
+        disk.set("hot", "h")
+        disk.set("cold", "c")
+        for _ in range(3):
+            disk.get("hot")
+        
+        tiered = TieredResponseCache(InMemoryResponseCache(max_entries=1), disk, warm_start=10)
+        assert "hot" in tiered.memory
+        assert "cold" not in tiered.memory
+    
+    def test_disk_hit_promotes_to_memory(self, tmp_path):
+        disk = SQLiteResponseCache(str(tmp_path / "cache.sqlite3"))
+        disk.set("a", "answer")
+        tiered = TieredResponseCache(InMemoryResponseCache(), disk)
+        
+        assert tiered.get("a") == "answer"
+        assert "a" in tiered.memory
+        assert tiered.stats.hits == 1
+    
+    def test_promoted_entry_keeps_its_age(self, tmp_path):
+        disk = SQLiteResponseCache(str(tmp_path / "cache.sqlite3"))
+        with patch("core.response_cache.time.time", return_value=1000.0):
+            disk.set("a", "answer")
+        tiered = TieredResponseCache(InMemoryResponseCache(ttl=60), disk)
+        
+        with patch("core.response_cache.time.time", return_value=1050.0):
+            assert tiered.get("a") == "answer"
+        with patch("core.response_cache.time.monotonic", return_value=time.monotonic() + 20):
+            assert tiered.memory.get("a") is None
+    
+    def test_warm_start_skips_entries_past_memory_ttl(self, tmp_path):
+        disk = SQLiteResponseCache(str(tmp_path / "cache.sqlite3"))
+        with patch("core.response_cache.time.time", return_value=time.time() - 120):
+            disk.set("old", "o")
+        disk.set("new", "n")
+        
+        tiered = TieredResponseCache(InMemoryResponseCache(ttl=60), disk, warm_start=10)
+        assert "new" in tiered.memory
+        assert "old" not in tiered.memory
@@ -0,0 +1,148 @@
+"""
+Tests for the semantic near-duplicate cache
+"""
+
+from core.memory import Memory, UserProfile
+from core.semantic_cache import SemanticCache, normalize_request
+from agents.tutor_agent import TutorAgent
+
+
+class CountingLLMService:
+    """LLMService stand-in that counts generate calls"""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def generate(self, messages, **kwargs):
+        self.calls += 1
+        return f"Explanation {self.calls}"
+    
+    def count_tokens_many(self, texts):
+        return [len(text) // 4 for text in texts]
+
+
+class TestSemanticCache:
+    """Test similarity lookups"""
+    
+    def test_normalize_strips_request_phrasing(self):
+        assert normalize_request("What is a for loop?") == "for loop"
+        assert normalize_request("Teach me for loops") == "for loop"
+        assert normalize_request("explain list comprehensions") == "list comprehension"
+    
+    def test_paraphrases_hit(self):
+        cache = SemanticCache()
+        cache.put("explain for loops", "For loops repeat code")
+        
+        assert cache.get("what is a for loop?") == "For loops repeat code"
+        assert cache.get("teach me for loops") == "For loops repeat code"
+        assert cache.hits == 2
+    
+    def test_different_topics_miss(self):
+        cache = SemanticCache()
+        cache.put("explain for loops", "For loops repeat code")
+        
+        assert cache.get("explain while loops") is None
+        assert cache.get("for loops vs while loops") is None
+    
+    def test_shared_instruction_template_misses(self):
+        suffix = (
+            "\n\nPlease include:\n1. Clear explanation\n"
+            "2. At least 2 practical examples with code\n3. Common use cases"
+        )
+        cache = SemanticCache()
+        cache.put("explain recursion" + suffix, "Recursion answer")
+        cache.put("explain for loops" + suffix, "For loop answer")
+        
+        assert cache.get("explain classes" + suffix) is None
+        assert cache.get("explain while loops" + suffix) is None
+        assert cache.get("what is recursion?" + suffix) == "Recursion answer"
+    
+    def test_similar_topics_need_the_same_words(self):
+        cache = SemanticCache(threshold=0.5)
+        cache.put("explain lists", "Lists answer")
+        
+        assert cache.get("explain tuples") is None
+        assert cache.get("explain nested lists") is None
+        assert cache.get("what are lists") == "Lists answer"
+    
+    def test_buckets_are_separate(self):
+        cache = SemanticCache()
+        cache.put("explain for loops", "Visual answer", bucket=("visual",))
+        
+        assert cache.get("explain for loops", bucket=("auditory",)) is None
+        assert cache.get("explain for loops", bucket=("visual",)) == "Visual answer"
+    
+    def test_contextual_requests_are_not_cached(self):
+        cache = SemanticCache()
+        cache.put("explain it again", "Depends on the conversation")
+        
+        assert not cache.cacheable("can you explain that differently")
+        assert not cache.cacheable("explain this")
+        assert not cache.cacheable("explain the previous example")
+        assert not cache.cacheable("what did you say earlier")
+        assert not cache.cacheable("use a dictionary instead")
+        assert cache.cacheable("explain classes")
+        assert cache.get("explain it again") is None
+    
+    def test_oldest_entries_are_overwritten(self):
+        cache = SemanticCache(max_entries=2)
+        cache.put("explain for loops", "loops")
+        cache.put("explain recursion", "recursion")
+        cache.put("explain decorators", "decorators")
+        
+        assert cache.get("explain for loops") is None
+        assert cache.get("explain decorators") == "decorators"
+    
+    def test_ivf_index_finds_entries(self):
+        cache = SemanticCache(n_lists=4, n_probe=1)
+        topics = [f"topic number {i} of the course" for i in range(64)]
+        for topic in topics:
+            cache.put(f"explain {topic}", topic)
+        
+        assert cache.to_dict()["ivf_lists"] == 4
+        assert all(cache.get(f"what is {topic}") == topic for topic in topics)
+
+
+class TestTutorCache:
+    """Test the cache in front of TutorAgent"""
+    
+    def test_paraphrased_request_skips_llm(self):
+        llm = CountingLLMService()
+        memory = Memory()
+        tutor = TutorAgent(llm, memory, SemanticCache())
+        
+        first = tutor.process("explain for loops")
+        assert tutor.process("What is a for loop?") == first
+        assert llm.calls == 1
+        # The cached answer is still part of the conversation
+        assert len(memory.get_recent_messages(10)) == 4
+    
+    def test_profile_changes_bucket(self):
+        llm = CountingLLMService()
+        memory = Memory()
+        tutor = TutorAgent(llm, memory, SemanticCache())
+        
+        tutor.process("explain for loops")
+        memory.set_user_profile(UserProfile(user_id="u1", learning_style="visual"))
+        tutor.process("explain for loops")
+        assert llm.calls == 2
+    
+    def test_explain_concept_keys_on_concept(self):
+        llm = CountingLLMService()
+        tutor = TutorAgent(llm, Memory(), SemanticCache())
+        
+        for level in ("simple", "detailed"):
+            lists = tutor.explain_concept("lists", level)
+            assert tutor.explain_concept("tuples", level) != lists
+            assert tutor.explain_concept("lists", level) == lists
+        # Each detail level has its own template, so its own answer
+        assert llm.calls == 4
+    
+    def test_streamed_response_is_cached(self):
+        llm = CountingLLMService()
+        llm.stream = lambda messages, **kwargs: iter(["For ", "loops"])
+        tutor = TutorAgent(llm, Memory(), SemanticCache())
+        
+        assert "".join(tutor.process("explain for loops", stream=True)) == "For loops"
+        assert "".join(tutor.process("teach me for loops", stream=True)) == "For loops"
+        assert llm.calls == 0
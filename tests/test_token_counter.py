@@ -0,0 +1,86 @@
+"""
+Tests for offline token counting
+"""
+
+import pytest
+from unittest.mock import patch
+from core.llm_service import LLMProvider, create_llm_service
+from core.token_counter import TokenCounter, approximate_token_count
+
+
+class TestApproximateCount:
+    """Test the cl100k-style approximate counter"""
+    
+    @pytest.mark.parametrize("text, tokens", [
+        ("hello world", 2),
+        ("Hello, world!", 4),
+        ("The quick brown fox jumps over the lazy dog.", 10),
+        ("", 0),
+    ])
+    def test_matches_reference_counts(self, text, tokens):
+        assert approximate_token_count(text) == tokens
+    
+    def test_long_words_split(self):
+        assert approximate_token_count("pneumonoultramicroscopicsilicovolcanoconiosis") > 1
+
+
+class TestTokenCounter:
+    """Test memoization, batching and calibration"""
+    
+    def test_counts_are_memoized(self):
+        counter = TokenCounter("gemini", "gemini-2.5-flash")
+        with patch.object(counter, "_compute", wraps=counter._compute) as compute:
+            first = counter.count("explain recursion")
+            second = counter.count("explain recursion")
+        
+        assert first == second
+        assert compute.call_count == 1
+    
+    def test_count_many_only_computes_misses(self):
+        counter = TokenCounter("anthropic", "claude-3-sonnet-20240229")
+        counter.count("hello world")
+        
+        with patch.object(counter, "_compute", wraps=counter._compute) as compute:
+            counts = counter.count_many(["Hello, world!", "hello world", "Hello, world!"])
+        
+        assert counts == [4, 2, 4]
+        compute.assert_called_once_with(["Hello, world!", "Hello, world!"])
+    
+    def test_memo_is_bounded(self):
+        counter = TokenCounter("gemini", "gemini-2.5-flash", max_entries=3)
+        counter.count_many([f"message {i}" for i in range(10)])
+        assert len(counter._counts) == 3
+    
+    def test_calibrate_scales_estimates(self):
+        counter = TokenCounter("gemini", "gemini-2.5-flash")
+        assert counter.count("hello world") == 2
+        
+        scale = counter.calibrate([("hello world", 3), ("Hello, world!", 6)])
+        
+        assert scale == pytest.approx(1.5)
+        assert counter.count("hello world") == 3
+    
+    def test_openai_without_tiktoken_falls_back(self):
+        counter = TokenCounter("openai", "gpt-4-turbo-preview")
+        with patch("core.token_counter.get_encoding", return_value=None):
+            assert counter.count("hello world") == 2
+    
+    def test_openai_enum_uses_tiktoken(self):
+        counter = TokenCounter(LLMProvider.OPENAI, "gpt-4-turbo-preview")
+        encoding = type("Encoding", (), {
+            "encode_ordinary_batch": lambda self, texts: [[0] * 7 for _ in texts]
+        })()
+        with patch("core.token_counter.get_encoding", return_value=encoding) as get:
+            assert counter.provider == "openai"
+            assert counter.count("hello world") == 7
+        get.assert_called_once_with("gpt-4-turbo-preview")
+
+
+def test_gemini_count_tokens_is_offline():
+    with patch.dict('os.environ', {'GOOGLE_API_KEY': 'dummy'}):
+        service = create_llm_service(provider="gemini")
+    
+    with patch.object(service.client, "count_tokens") as remote:
+        assert service.count_tokens("Hello, world!") == 4
+        assert service.count_tokens_many(["hello world", "Hello, world!"]) == [2, 4]
+    remote.assert_not_called()